@@ -1,3 +1,6 @@
+import time
+_start_time = time.perf_counter()
+
 import adsk.core
 import adsk.fusion
 import traceback
@@ -9,38 +12,76 @@ script_dir = os.path.dirname(os.path.realpath(__file__))
 if script_dir not in sys.path:
     sys.path.append(script_dir)
 
-import jitter_processor
-
-# This annoying bit is because Fusion won't reload modules otherwise during dev. Ugh
 import importlib
-import shapes.rectangle as rectangle
-import shapes.hemi_circle as hemi_circle
-import shapes.triangle as triangle
-import shapes.shape_factory as shape_factory
-import handlers as handlers
-import utils as utils
-importlib.reload(jitter_processor)
-importlib.reload(rectangle)
-importlib.reload(hemi_circle)
-importlib.reload(triangle)
-importlib.reload(shape_factory)
-importlib.reload(handlers)
-importlib.reload(utils)
+from constants import DEV_MODE
+
+# In dev mode every module is reloaded on every run, so edits are picked up without restarting
+# Fusion, and the command is opened straight away and closes the add-in with it. In production,
+# nothing but this file and constants.py is loaded until the command is first created, and the
+# add-in stays loaded until Fusion stops it.
+
+# Every module of the add-in, in the order they have to be reloaded in, dependencies first, so
+# names imported with `from module import name` are bound to the reloaded module's
+DEV_MODULES = (
+    'constants', 'geometry', 'instrumentation', 'cut_index', 'sampler', 'planner', 'utils',
+    'plan_cache', 'plan_format', 'layout_score', 'parallel', 'outline', 'export', 'sketch_index',
+    'curve_graph', 'curve_proxy', 'stamp', 'shapes.rectangle', 'shapes.hemi_circle', 'shapes.triangle',
+    'shapes.shape_factory', 'emitter', 'jitter_processor', 'background', 'graphics_preview', 'handlers',
+)
 
 
 # ----- GLOBAL CONSTANTS -----
 cmdId = 'JitterProcessor'
 handler_holder = []
+# The panel the command's button is added to, the add-ins panel of the Design workspace
+panelId = 'SolidScriptsAddinsPanel'
 
 
 # ----- METHODS -----
 
+def _reload_modules():
+    # This annoying bit is because Fusion won't reload modules otherwise during dev. Ugh
+    for name in DEV_MODULES:
+        importlib.reload(importlib.import_module(name))
+
+def _log_timing(event, seconds):
+    """Logs how long startup took, to the text commands window and the run log."""
+    mode = 'dev' if DEV_MODE else 'production'
+    adsk.core.Application.get().log(f'EdgeJitter {event} took {seconds * 1000:.1f} ms ({mode} mode).')
+    instrumentation = importlib.import_module('instrumentation')
+    record = instrumentation.Instrumentation()
+    record.timings[event] = seconds
+    record.write(event=event, mode=mode)
+
+
+class LazyCommandCreatedHandler(adsk.core.CommandCreatedEventHandler):
+    """
+    Stands in for handlers.MyCommandCreatedHandler until the command is first created, so the
+    handlers, the jitter processor and everything they import are only loaded when needed.
+    """
+    def __init__(self):
+        super().__init__()
+        self._handler = None
+
+    def notify(self, args: adsk.core.CommandCreatedEventArgs):
+        if self._handler is None:
+            start_time = time.perf_counter()
+            handlers = importlib.import_module('handlers')
+            self._handler = handlers.MyCommandCreatedHandler()
+            handler_holder.append(self._handler)
+            _log_timing('first_command_load', time.perf_counter() - start_time)
+        self._handler.notify(args)
+
+
 def run(context):
     global cmdId, handler_holder
 
     """ This is Fusion 360's main method """
     ui = adsk.core.Application.get().userInterface
 
+    if DEV_MODE:
+        _reload_modules()
+
     cmd_def = ui.commandDefinitions.itemById(cmdId)
     if not cmd_def:
         cmd_def = ui.commandDefinitions.addButtonDefinition(
@@ -52,11 +93,20 @@ def run(context):
     iconPath = os.path.join(filePath,os.path.join(filePath,"Resources"),"icon")
     cmd_def.resourceFolder = iconPath
 
-    on_command_created = handlers.MyCommandCreatedHandler()
+    on_command_created = LazyCommandCreatedHandler()
     cmd_def.commandCreated.add(on_command_created)
     handler_holder.append(on_command_created)
 
-    cmd_def.execute()
+    # The command is opened from its button, which is when everything else gets loaded
+    panel = ui.allToolbarPanels.itemById(panelId)
+    if panel and not panel.controls.itemById(cmdId):
+        panel.controls.addCommand(cmd_def)
+
+    _log_timing('startup', time.perf_counter() - _start_time)
+
+    if DEV_MODE:
+        # Everything has just been reloaded anyway, so open the command straight away
+        cmd_def.execute()
     adsk.autoTerminate(False)
 
 def stop(context):
@@ -66,9 +116,17 @@ def stop(context):
     try:
         # Clean up the UI.
         ui = adsk.core.Application.get().userInterface
+        panel = ui.allToolbarPanels.itemById(panelId)
+        control = panel.controls.itemById(cmdId) if panel else None
+        if control:
+            control.deleteMe()
         cmd_def = ui.commandDefinitions.itemById(cmdId)
         if cmd_def:
             cmd_def.deleteMe()
+        # Worker processes are only ever started once parallel has been loaded
+        parallel = sys.modules.get('parallel')
+        if parallel is not None:
+            parallel.shutdown()
     except Exception:
         if ui:
             ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
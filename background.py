@@ -0,0 +1,119 @@
+import threading
+import traceback
+from typing import NamedTuple
+
+# How long the inputs have to stay unchanged before planning starts
+DEBOUNCE_SECONDS = 0.3
+
+
+class PlanResult(NamedTuple):
+    """
+    What a background planning run handed back.
+
+    Attributes:
+        generation (int): The request the plans were made for, see BackgroundPlanner.request().
+        plans (list): The JitterPlan of each selected curve, None if planning failed.
+        complete (bool): False for the first cuts of a progressive run, with the rest to follow.
+        error (str): The traceback of a failed run.
+    """
+    generation: int
+    plans: list
+    complete: bool
+    error: str = None
+
+
+class BackgroundPlanner:
+    """
+    Plans jitter on a worker thread, so the command dialog stays responsive.
+
+    Every request starts a debounce timer, and a new request cancels the timer and the planning
+    of the one before it, so a run of edits only plans once, for the last of them. When plans are
+    ready, hand_back is called with their generation, on the worker thread. It's only meant to
+    fire a Fusion custom event, which gets back onto the main thread for the emission, see
+    handlers.py. Nothing on the worker thread touches the API.
+    """
+
+    # ----- CONSTRUCTORS -----
+
+    def __init__(self, hand_back, delay=DEBOUNCE_SECONDS):
+        """
+        Parameters:
+            hand_back (callable): Called with the generation of each PlanResult, on the worker thread.
+            delay (float): The debounce delay, in seconds.
+        """
+        self._hand_back = hand_back
+        self._delay = delay
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._timer = None
+        self._cancel = None
+        self._result = None
+
+
+    # ----- METHODS -----
+
+    def request(self, processor, first_cuts=0):
+        """
+        Plans with the given processor once the debounce delay has passed, dropping any earlier
+        request.
+
+        Parameters:
+            processor (JitterProcessor): A processor that's been prepared (see
+                            JitterProcessor.prepare()) on the main thread.
+            first_cuts (int): Hands back a plan of only the first this many cuts per curve, then
+                            the full plan, when above zero.
+
+        Returns:
+            int: The generation of the request.
+        """
+        with self._lock:
+            self._stop()
+            self._generation += 1
+            self._cancel = threading.Event()
+            self._timer = threading.Timer(self._delay, self._run,
+                                          (self._generation, processor, first_cuts, self._cancel))
+            self._timer.daemon = True
+            self._timer.start()
+            return self._generation
+
+    def cancel(self):
+        """Drops the current request, and any plans it handed back."""
+        with self._lock:
+            self._stop()
+            self._generation += 1
+
+    def is_current(self, generation):
+        return generation == self._generation
+
+    def result(self):
+        """
+        Returns:
+            PlanResult: The latest result of the current request, or None if there isn't one yet.
+        """
+        with self._lock:
+            if self._result is not None and self._result.generation == self._generation:
+                return self._result
+            return None
+
+    def _stop(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        if self._cancel is not None:
+            self._cancel.set()
+        self._timer = self._cancel = self._result = None
+
+    def _run(self, generation, processor, first_cuts, cancel):
+        stages = [(first_cuts, False)] if first_cuts > 0 else []
+        stages.append((None, True))
+        for max_cuts, complete in stages:
+            try:
+                result = PlanResult(generation, processor.plan(cancel, max_cuts), complete)
+            except Exception:
+                result = PlanResult(generation, None, True, traceback.format_exc())
+            with self._lock:
+                if cancel.is_set() or generation != self._generation:
+                    return
+                self._result = result
+            self._hand_back(generation)
+            if result.error:
+                return
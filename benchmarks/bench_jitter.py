@@ -0,0 +1,127 @@
+"""
+Benchmarks JitterProcessor.generate() outside of Fusion, on the in-memory adsk stand-in.
+
+Each case jitters the bottom edge of a rectangle sketch and reports the best wall time, the
+number of API calls made and the peak Python memory, across edge lengths, cut size ranges and
+recurse settings.
+
+Usage:
+    python benchmarks/bench_jitter.py [--latency SECONDS] [--repeat N] [--batch] [--rebuild]
+                                     [--placement {bisect,scatter}] [--output FILE]
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(HERE, 'fake_adsk'), os.path.dirname(HERE)]
+
+import adsk  # noqa: E402
+import adsk.core  # noqa: E402
+import adsk.fusion  # noqa: E402
+import instrumentation  # noqa: E402
+import jitter_processor  # noqa: E402
+from plan_cache import plan_cache  # noqa: E402
+from planner import BISECT, SCATTER  # noqa: E402
+
+EDGE_LENGTHS = (30.0, 100.0, 300.0)
+SIZE_RANGES = ((1.0, 3.0), (0.25, 1.0))
+RECURSE_OPTIONS = (False, True)
+SEED = 1234
+
+# Keep benchmark runs out of the add-in's run log
+instrumentation.LOG_PATH = os.devnull
+
+
+class _UI:
+    def messageBox(self, message):
+        print(f'messageBox: {message}', file=sys.stderr)
+
+
+def make_sketch(length, height=None):
+    """
+    Builds a sketch holding a closed length by height rectangle.
+
+    Returns:
+        tuple: The sketch, and the rectangle's bottom line.
+    """
+    height = height if height is not None else length / 2
+    sketch = adsk.fusion.Sketch()
+    lines = sketch.sketchCurves.sketchLines
+    corners = [(0, 0), (length, 0), (length, height), (0, height)]
+    bottom = lines.addByTwoPoints(adsk.core.Point3D.create(*corners[0], 0), adsk.core.Point3D.create(*corners[1], 0))
+    previous = bottom
+    for x, y in corners[2:]:
+        previous = lines.addByTwoPoints(previous.endSketchPoint, adsk.core.Point3D.create(x, y, 0))
+    lines.addByTwoPoints(previous.endSketchPoint, bottom.startSketchPoint)
+    return sketch, bottom
+
+
+def _generate(length, min_size, max_size, recurse, batch, rebuild, placement):
+    plan_cache.clear()
+    sketch, line = make_sketch(length)
+    processor = jitter_processor.JitterProcessor(_UI(), line, min_size, max_size, recurse, batch=batch, seed=SEED,
+                                                 rebuild=rebuild, placement=placement)
+    start_time = time.perf_counter()
+    processor.generate()
+    return time.perf_counter() - start_time, processor
+
+
+def run_case(length, min_size, max_size, recurse, batch=False, latency=0.0, repeat=3, rebuild=False,
+             placement=BISECT):
+    """
+    Benchmarks one case.
+
+    Returns:
+        dict: The best wall time in seconds, the API calls of one run, the peak traced memory in
+            bytes and the number of cuts planned.
+    """
+    adsk.reset(latency)
+    wall = min(_generate(length, min_size, max_size, recurse, batch, rebuild, placement)[0] for _ in range(repeat))
+
+    # Memory and API calls are measured on a run of their own, tracing slows everything down
+    adsk.reset(latency)
+    tracemalloc.start()
+    _, processor = _generate(length, min_size, max_size, recurse, batch, rebuild, placement)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'wall': wall,
+        'calls': sum(adsk.api_calls.values()),
+        'peak': peak,
+        'cuts': sum(len(plan) for plan in processor.last_plans),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.0, help='extra seconds each API call takes')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per case, the best is reported')
+    parser.add_argument('--batch', action='store_true', help='use batch emission')
+    parser.add_argument('--rebuild', action='store_true', help='rebuild each curve in one pass instead of trimming it')
+    parser.add_argument('--placement', choices=(BISECT, SCATTER), default=BISECT, help='how cuts are placed')
+    parser.add_argument('--output', help='also write the results to this file')
+    args = parser.parse_args(argv)
+
+    header = f"{'length':>8} {'min':>6} {'max':>6} {'recurse':>8} {'cuts':>6} {'wall ms':>9} {'API calls':>10} {'peak KiB':>9}"
+    lines = [header, '-' * len(header)]
+    print(header)
+    print(lines[-1])
+    for length, (min_size, max_size), recurse in itertools.product(EDGE_LENGTHS, SIZE_RANGES, RECURSE_OPTIONS):
+        result = run_case(length, min_size, max_size, recurse, args.batch, args.latency, args.repeat, args.rebuild,
+                          args.placement)
+        line = (f"{length:>8.1f} {min_size:>6.2f} {max_size:>6.2f} {str(recurse):>8} {result['cuts']:>6} "
+                f"{result['wall'] * 1000:>9.1f} {result['calls']:>10} {result['peak'] / 1024:>9.1f}")
+        lines.append(line)
+        print(line)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write('\n'.join(lines) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+An in-memory stand-in for the subset of the Fusion 360 API that EdgeJitter uses.
+
+This is only meant for benchmarking the jitter pipeline outside of Fusion. Every API property
+read and method call is counted in api_calls, and can be made to take a fixed extra time, to
+mimic the cost of going through the real API.
+"""
+import time
+from collections import Counter
+
+api_calls = Counter()
+latency = 0.0
+
+
+def _call(name):
+    api_calls[name] += 1
+    if latency:
+        time.sleep(latency)
+
+
+def reset(call_latency=0.0):
+    """
+    Clears the API call counts and sets the extra time, in seconds, each API call takes.
+    """
+    global latency
+    api_calls.clear()
+    latency = call_latency
+
+
+def autoTerminate(value):
+    pass
+
+
+def terminate():
+    pass
+
+
+from . import core, fusion  # noqa: E402
@@ -0,0 +1,144 @@
+"""Points, collections and the command event handler base classes."""
+import math
+import adsk
+
+
+class Point3D:
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self._x, self._y, self._z = x, y, z
+
+    @staticmethod
+    def create(x=0.0, y=0.0, z=0.0):
+        adsk._call('Point3D.create')
+        return Point3D(x, y, z)
+
+    @property
+    def x(self):
+        adsk._call('Point3D.x')
+        return self._x
+
+    @property
+    def y(self):
+        adsk._call('Point3D.y')
+        return self._y
+
+    @property
+    def z(self):
+        adsk._call('Point3D.z')
+        return self._z
+
+    def distanceTo(self, other):
+        adsk._call('Point3D.distanceTo')
+        return math.dist((self._x, self._y, self._z), (other._x, other._y, other._z))
+
+    def isEqualTo(self, other):
+        adsk._call('Point3D.isEqualTo')
+        return (self._x, self._y, self._z) == (other._x, other._y, other._z)
+
+    def copy(self):
+        return Point3D(self._x, self._y, self._z)
+
+
+class Matrix3D:
+    def __init__(self):
+        self._values = [1.0 if row == column else 0.0 for row in range(4) for column in range(4)]
+
+    @staticmethod
+    def create():
+        adsk._call('Matrix3D.create')
+        return Matrix3D()
+
+    def setWithArray(self, values):
+        adsk._call('Matrix3D.setWithArray')
+        self._values = list(values)
+        return True
+
+    def asArray(self):
+        adsk._call('Matrix3D.asArray')
+        return list(self._values)
+
+    def _apply(self, point):
+        m = self._values
+        x, y, z = point._x, point._y, point._z
+        return Point3D(m[0] * x + m[1] * y + m[2] * z + m[3],
+                       m[4] * x + m[5] * y + m[6] * z + m[7],
+                       m[8] * x + m[9] * y + m[10] * z + m[11])
+
+
+class ObjectCollection:
+    def __init__(self, items=None):
+        self._items = list(items or [])
+
+    @staticmethod
+    def create():
+        adsk._call('ObjectCollection.create')
+        return ObjectCollection()
+
+    @property
+    def count(self):
+        adsk._call('ObjectCollection.count')
+        return len(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def item(self, index):
+        adsk._call('ObjectCollection.item')
+        return self._items[index]
+
+    def add(self, item):
+        adsk._call('ObjectCollection.add')
+        if item in self._items:
+            return False
+        self._items.append(item)
+        return True
+
+    def removeByIndex(self, index):
+        adsk._call('ObjectCollection.removeByIndex')
+        del self._items[index]
+        return True
+
+    def removeByItem(self, item):
+        adsk._call('ObjectCollection.removeByItem')
+        self._items.remove(item)
+        return True
+
+    def clear(self):
+        adsk._call('ObjectCollection.clear')
+        self._items.clear()
+        return True
+
+
+class ValueInput:
+    @staticmethod
+    def createByReal(value):
+        return value
+
+
+class _Events(list):
+    def add(self, handler):
+        self.append(handler)
+        return True
+
+
+class CommandCreatedEventHandler:
+    def __init__(self):
+        pass
+
+
+class CommandEventHandler:
+    def __init__(self):
+        pass
+
+
+class InputChangedEventHandler:
+    def __init__(self):
+        pass
+
+
+class CustomEventHandler:
+    def __init__(self):
+        pass
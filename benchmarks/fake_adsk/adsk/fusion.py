@@ -0,0 +1,444 @@
+"""Sketches, sketch curves and sketch points, kept as plain Python objects."""
+import math
+import adsk
+from .core import Point3D, ObjectCollection
+
+_TOLERANCE = 1e-7
+
+
+def _xy(point):
+    return (point._x, point._y)
+
+
+class SketchPoint:
+    _next_token = 0
+
+    def __init__(self, sketch, geometry):
+        self._sketch = sketch
+        self._geometry = geometry.copy()
+        self._valid = True
+        self._visible = True
+        SketchPoint._next_token += 1
+        self._token = f'point-{SketchPoint._next_token}'
+
+    @property
+    def entityToken(self):
+        adsk._call('SketchPoint.entityToken')
+        return self._token
+
+    @property
+    def geometry(self):
+        adsk._call('SketchPoint.geometry')
+        return self._geometry.copy()
+
+    @property
+    def isVisible(self):
+        adsk._call('SketchPoint.isVisible')
+        return self._visible
+
+    @property
+    def isValid(self):
+        adsk._call('SketchPoint.isValid')
+        return self._valid
+
+    @property
+    def parentSketch(self):
+        return self._sketch
+
+
+class SketchPoints:
+    def __init__(self, sketch):
+        self._sketch = sketch
+        self._items = []
+
+    def _add(self, geometry):
+        point = SketchPoint(self._sketch, geometry)
+        self._items.append(point)
+        return point
+
+    def add(self, geometry):
+        adsk._call('SketchPoints.add')
+        return self._add(geometry)
+
+    @property
+    def count(self):
+        adsk._call('SketchPoints.count')
+        return len(self._items)
+
+    def item(self, index):
+        adsk._call('SketchPoints.item')
+        return self._items[index]
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        for point in list(self._items):
+            adsk._call('SketchPoints.item')
+            yield point
+
+
+class SketchCurve:
+    _next_token = 0
+
+    def __init__(self, sketch):
+        self._sketch = sketch
+        self._valid = True
+        self._fixed = False
+        SketchCurve._next_token += 1
+        self._token = f'curve-{SketchCurve._next_token}'
+
+    @staticmethod
+    def cast(obj):
+        return obj if isinstance(obj, SketchCurve) else None
+
+    @property
+    def isFixed(self):
+        adsk._call('SketchCurve.isFixed')
+        return self._fixed
+
+    @isFixed.setter
+    def isFixed(self, value):
+        adsk._call('SketchCurve.isFixed')
+        self._fixed = value
+
+    @property
+    def entityToken(self):
+        adsk._call('SketchCurve.entityToken')
+        return self._token
+
+    @property
+    def parentSketch(self):
+        adsk._call('SketchCurve.parentSketch')
+        return self._sketch
+
+    @property
+    def isValid(self):
+        adsk._call('SketchCurve.isValid')
+        return self._valid
+
+    def deleteMe(self):
+        adsk._call('SketchCurve.deleteMe')
+        self._sketch._remove_curve(self)
+        return True
+
+
+class SketchLine(SketchCurve):
+    objectType = 'adsk::fusion::SketchLine'
+
+    def __init__(self, sketch, start, end):
+        super().__init__(sketch)
+        self._start = start
+        self._end = end
+
+    @staticmethod
+    def cast(obj):
+        return obj if isinstance(obj, SketchLine) else None
+
+    @property
+    def startSketchPoint(self):
+        adsk._call('SketchLine.startSketchPoint')
+        return self._start
+
+    @property
+    def endSketchPoint(self):
+        adsk._call('SketchLine.endSketchPoint')
+        return self._end
+
+    @property
+    def length(self):
+        adsk._call('SketchLine.length')
+        return math.dist(_xy(self._start._geometry), _xy(self._end._geometry))
+
+    def _param(self, point):
+        sx, sy = _xy(self._start._geometry)
+        ex, ey = _xy(self._end._geometry)
+        length_sq = (ex - sx) ** 2 + (ey - sy) ** 2
+        px, py = point
+        t = ((px - sx) * (ex - sx) + (py - sy) * (ey - sy)) / length_sq
+        off = abs((px - sx) * (ey - sy) - (py - sy) * (ex - sx)) / math.sqrt(length_sq)
+        return t, off
+
+    def trim(self, segment_point):
+        """
+        Removes the piece of the line between the nearest intersections around segment_point. Only
+        the end points of other curves that lie on this line count as intersections.
+        """
+        adsk._call('SketchLine.trim')
+        t_trim, _ = self._param(_xy(segment_point))
+        # Any endpoint of another curve lying on this line counts as an intersection.
+        params = [0.0, 1.0]
+        owners = {}
+        for curve in self._sketch._curves:
+            if curve is self:
+                continue
+            for point in curve._end_points():
+                t, off = self._param(_xy(point._geometry))
+                if off < _TOLERANCE and _TOLERANCE < t < 1 - _TOLERANCE:
+                    params.append(t)
+                    owners[t] = point
+        lower = max(t for t in params if t <= t_trim)
+        upper = min(t for t in params if t >= t_trim)
+        sx, sy = _xy(self._start._geometry)
+        ex, ey = _xy(self._end._geometry)
+        result = ObjectCollection()
+        start, end = self._start, self._end
+        self._sketch._remove_curve(self)
+        constraints = self._sketch.geometricConstraints
+        # Like Fusion, the new ends are constrained onto whatever they were trimmed against
+        if lower > 0:
+            mid = Point3D(sx + (ex - sx) * lower, sy + (ey - sy) * lower, 0)
+            piece = self._sketch.sketchCurves.sketchLines._add(start, mid)
+            constraints._add(CoincidentConstraint(piece._end, owners[lower]))
+            result._items.append(piece)
+        if upper < 1:
+            mid = Point3D(sx + (ex - sx) * upper, sy + (ey - sy) * upper, 0)
+            piece = self._sketch.sketchCurves.sketchLines._add(mid, end)
+            constraints._add(CoincidentConstraint(piece._start, owners[upper]))
+            result._items.append(piece)
+        return result
+
+    def _end_points(self):
+        return (self._start, self._end)
+
+
+class SketchArc(SketchCurve):
+    objectType = 'adsk::fusion::SketchArc'
+
+    def __init__(self, sketch, start, mid, end):
+        super().__init__(sketch)
+        self._start = start
+        self._mid = mid
+        self._end = end
+
+    @property
+    def startSketchPoint(self):
+        adsk._call('SketchArc.startSketchPoint')
+        return self._start
+
+    @property
+    def endSketchPoint(self):
+        adsk._call('SketchArc.endSketchPoint')
+        return self._end
+
+    def _end_points(self):
+        return (self._start, self._end)
+
+
+def _sketch_point(sketch, point):
+    if isinstance(point, SketchPoint):
+        return point
+    return sketch.sketchPoints._add(point)
+
+
+class SketchLines:
+    def __init__(self, sketch):
+        self._sketch = sketch
+
+    def _add(self, start, end):
+        line = SketchLine(self._sketch, _sketch_point(self._sketch, start), _sketch_point(self._sketch, end))
+        self._sketch._curves.append(line)
+        return line
+
+    def addByTwoPoints(self, start, end):
+        adsk._call('SketchLines.addByTwoPoints')
+        line = self._add(start, end)
+        # Like Fusion, lines drawn along an axis are constrained to stay that way
+        (sx, sy), (ex, ey) = _xy(line._start._geometry), _xy(line._end._geometry)
+        if abs(sy - ey) < _TOLERANCE:
+            self._sketch.geometricConstraints._add(HorizontalConstraint(line))
+        elif abs(sx - ex) < _TOLERANCE:
+            self._sketch.geometricConstraints._add(VerticalConstraint(line))
+        return line
+
+    def addTwoPointRectangle(self, corner, opposite):
+        adsk._call('SketchLines.addTwoPointRectangle')
+        x0, y0 = _xy(corner)
+        x1, y1 = _xy(opposite)
+        corners = [_sketch_point(self._sketch, Point3D(x, y, 0)) for x, y in ((x0, y0), (x1, y0), (x1, y1), (x0, y1))]
+        result = ObjectCollection()
+        for i in range(4):
+            result._items.append(self._add(corners[i], corners[(i + 1) % 4]))
+        return result
+
+    def __iter__(self):
+        return iter([c for c in self._sketch._curves if isinstance(c, SketchLine)])
+
+
+class SketchArcs:
+    def __init__(self, sketch):
+        self._sketch = sketch
+
+    def addByThreePoints(self, start, mid, end):
+        adsk._call('SketchArcs.addByThreePoints')
+        arc = SketchArc(self._sketch, _sketch_point(self._sketch, start), mid.copy(), _sketch_point(self._sketch, end))
+        self._sketch._curves.append(arc)
+        return arc
+
+
+class SketchCurves:
+    def __init__(self, sketch):
+        self.sketchLines = SketchLines(sketch)
+        self.sketchArcs = SketchArcs(sketch)
+        self._sketch = sketch
+
+    @property
+    def count(self):
+        adsk._call('SketchCurves.count')
+        return len(self._sketch._curves)
+
+    def __iter__(self):
+        return iter(list(self._sketch._curves))
+
+
+class GeometricConstraint:
+    def __init__(self, sketch):
+        self._sketch = sketch
+
+    @property
+    def isDeletable(self):
+        adsk._call('GeometricConstraint.isDeletable')
+        return True
+
+    def deleteMe(self):
+        adsk._call('GeometricConstraint.deleteMe')
+        self._sketch.geometricConstraints._items.remove(self)
+        return True
+
+    def _entities(self):
+        return ()
+
+
+class HorizontalConstraint(GeometricConstraint):
+    def __init__(self, line):
+        super().__init__(line._sketch)
+        self._line = line
+
+    @property
+    def line(self):
+        adsk._call('HorizontalConstraint.line')
+        return self._line
+
+    def _entities(self):
+        return (self._line,)
+
+
+class VerticalConstraint(HorizontalConstraint):
+    pass
+
+
+class CoincidentConstraint(GeometricConstraint):
+    def __init__(self, point, entity):
+        super().__init__(point._sketch)
+        self._point = point
+        self._entity = entity
+
+    @property
+    def point(self):
+        adsk._call('CoincidentConstraint.point')
+        return self._point
+
+    @property
+    def entity(self):
+        adsk._call('CoincidentConstraint.entity')
+        return self._entity
+
+    def _entities(self):
+        return (self._point, self._entity)
+
+
+class GeometricConstraints:
+    def __init__(self, sketch):
+        self._sketch = sketch
+        self._items = []
+
+    def _add(self, constraint):
+        self._items.append(constraint)
+
+    def _remove_entity(self, entity):
+        self._items = [constraint for constraint in self._items if entity not in constraint._entities()]
+
+    def addCoincident(self, point, entity):
+        adsk._call('GeometricConstraints.addCoincident')
+        constraint = CoincidentConstraint(point, entity)
+        self._add(constraint)
+        return constraint
+
+    @property
+    def count(self):
+        adsk._call('GeometricConstraints.count')
+        return len(self._items)
+
+    def item(self, index):
+        adsk._call('GeometricConstraints.item')
+        return self._items[index]
+
+
+class Profile:
+    # Sketches in the stand-in never hold profiles, this is only here to be cast to
+    @staticmethod
+    def cast(obj):
+        return obj if isinstance(obj, Profile) else None
+
+
+class Profiles(list):
+    @property
+    def count(self):
+        adsk._call('Profiles.count')
+        return len(self)
+
+
+class Sketch:
+    def __init__(self):
+        self._curves = []
+        self.sketchPoints = SketchPoints(self)
+        self.sketchCurves = SketchCurves(self)
+        self.origin = Point3D(0, 0, 0)
+        self.profiles = Profiles()
+        self.geometricConstraints = GeometricConstraints(self)
+        self._compute_deferred = False
+
+    @property
+    def isComputeDeferred(self):
+        adsk._call('Sketch.isComputeDeferred')
+        return self._compute_deferred
+
+    @isComputeDeferred.setter
+    def isComputeDeferred(self, value):
+        adsk._call('Sketch.isComputeDeferred')
+        self._compute_deferred = value
+
+    @staticmethod
+    def classType():
+        return 'adsk::fusion::Sketch'
+
+    def copy(self, entities, matrix, target_sketch=None):
+        """
+        Copies the curves in entities, moved by matrix. Curves that shared a point share the
+        copy of it, and the copies come back in the order given, followed by their points.
+        """
+        adsk._call('Sketch.copy')
+        points = {}
+
+        def copied(point):
+            if id(point) not in points:
+                points[id(point)] = self.sketchPoints._add(matrix._apply(point._geometry))
+            return points[id(point)]
+
+        result = ObjectCollection()
+        for entity in entities:
+            if isinstance(entity, SketchLine):
+                curve = self.sketchCurves.sketchLines._add(copied(entity._start), copied(entity._end))
+            elif isinstance(entity, SketchArc):
+                curve = SketchArc(self, copied(entity._start), matrix._apply(entity._mid), copied(entity._end))
+                self._curves.append(curve)
+            else:
+                continue
+            result._items.append(curve)
+        result._items.extend(points.values())
+        return result
+
+    def _remove_curve(self, curve):
+        curve._valid = False
+        self._curves.remove(curve)
+        self.geometricConstraints._remove_entity(curve)
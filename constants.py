@@ -1,7 +1,7 @@
-from enum import Enum, auto
+import os
 
-class Direction(Enum):
-    POSITIVE_X = auto()
-    NEGATIVE_X = auto()
-    POSITIVE_Y = auto()
-    NEGATIVE_Y = auto()
+CUT_OUT_TYPES = ('convex', 'concave')
+
+# Set EDGE_JITTER_DEV=1 in the environment Fusion is started from to turn dev mode on, see
+# EdgeJitter.py
+DEV_MODE = os.environ.get('EDGE_JITTER_DEV', '') == '1'
@@ -0,0 +1,184 @@
+import math
+from collections import defaultdict
+from typing import NamedTuple
+
+# Sketch points are matched on their coordinates to this many decimal places (cm), so both
+# lines that share a SketchPoint and lines whose ends were merged or made coincident connect
+POINT_DECIMALS = 6
+
+# How far from a corner the nearest cut stays on top of the clearance the corner's angle
+# needs, as a fraction of the min cut size, so no cut is trimmed right at a vertex
+CORNER_CLEARANCE = 0.5
+
+
+class Chain(NamedTuple):
+    """
+    Lines connected end to end.
+
+    Attributes:
+        edges (list): The index of each line in the chain, walking it from one end to the other.
+        closed (bool): Whether the chain is a closed loop, like the outline of a profile.
+    """
+    edges: list
+    closed: bool
+
+
+def corner_margin(angle: float, max_height: float, clearance: float):
+    """
+    Returns how far along an edge from a corner cuts have to stay, so they can't straddle the
+    vertex or run into the cuts of the edge on the other side of it.
+
+    Keeping every cut of both edges on its own side of the corner's bisector does that. A cut as
+    high as max_height is clear of the bisector once it's max_height / tan(angle / 2) from the
+    vertex, which is nothing for lines that carry straight on and grows quickly as the corner
+    gets sharper.
+
+    Parameters:
+        angle (float): The angle between the edges at the corner, in radians, from 0 to pi.
+        max_height (float): The height of the highest cut that can be planned.
+        clearance (float): The least distance to keep from any corner.
+    """
+    if angle >= math.pi - 1e-9:
+        return clearance
+    if angle <= 1e-9:
+        return math.inf
+    return max_height / math.tan(angle / 2) + clearance
+
+
+class CurveGraph:
+    """
+    The selected lines, as a graph of the sketch points they share.
+
+    Every line is an edge between the points at its two ends, so a profile's outline is a loop
+    and lines drawn one after the other are a chain. The graph only holds the lines' edge frames,
+    nothing is read from the sketch, so it can be built and queried off Fusion's main thread.
+    """
+
+    # ----- CONSTRUCTORS -----
+
+    def __init__(self, frames):
+        """
+        Parameters:
+            frames (list): The EdgeFrame of each line.
+        """
+        self._frames = list(frames)
+        # The points at the (start, end) of each edge, and the (edge, end) pairs at each point
+        self._ends = []
+        self._adjacency = defaultdict(list)
+        for index, frame in enumerate(self._frames):
+            ends = (_point_key(frame.start), _point_key(frame.end))
+            self._ends.append(ends)
+            for end, key in enumerate(ends):
+                self._adjacency[key].append((index, end))
+
+
+    # ----- METHODS -----
+
+    def __len__(self):
+        return len(self._frames)
+
+    def neighbours(self, index: int, end: int):
+        """
+        Returns the (edge, end) pairs of the other edges that meet the given end (0 for its start,
+        1 for its end) of the edge.
+        """
+        return [pair for pair in self._adjacency[self._ends[index][end]] if pair[0] != index]
+
+    def _direction(self, index, end):
+        # The edge's direction leading away from the given end
+        frame = self._frames[index]
+        return (frame.tx, frame.ty) if end == 0 else (-frame.tx, -frame.ty)
+
+    def corner_angle(self, index: int, end: int):
+        """
+        Returns the sharpest angle, in radians, between the edge and the edges it meets at the
+        given end, or None when it's a free end.
+        """
+        neighbours = self.neighbours(index, end)
+        if not neighbours:
+            return None
+        dx, dy = self._direction(index, end)
+        angles = []
+        for other, other_end in neighbours:
+            ox, oy = self._direction(other, other_end)
+            angles.append(math.acos(max(-1.0, min(1.0, dx * ox + dy * oy))))
+        return min(angles)
+
+    def corner_margins(self, max_height: float, clearance: float):
+        """
+        Returns the (start, end) margins of each edge to keep cuts out of, see corner_margin().
+        Free ends have no margin, and no margin is longer than its edge.
+
+        Parameters:
+            max_height (float): The height of the highest cut that can be planned.
+            clearance (float): The least distance to keep from any corner.
+        """
+        margins = []
+        for index, frame in enumerate(self._frames):
+            margin = []
+            for end in (0, 1):
+                angle = self.corner_angle(index, end)
+                margin.append(0.0 if angle is None else min(frame.length, corner_margin(angle, max_height, clearance)))
+            margins.append(tuple(margin))
+        return margins
+
+    def corner_count(self):
+        """Returns how many points are shared by two or more edges."""
+        return sum(1 for pairs in self._adjacency.values() if len(pairs) > 1)
+
+    def chains(self):
+        """
+        Splits the edges into chains of connected edges.
+
+        Each chain is walked from a free end when it has one, so a simple chain comes out in
+        order from one end to the other, and a loop in order around the loop. Where more than two
+        edges meet, the walk carries on with the lowest numbered edge and picks up the rest after.
+
+        Returns:
+            list: The Chains, in the order of their lowest numbered edge.
+        """
+        visited = set()
+        chains = []
+        for first in range(len(self._frames)):
+            if first in visited:
+                continue
+            component = self._component(first)
+            visited.update(component)
+            # Start the walk from a free end, if there is one
+            start = next(((index, end) for index in sorted(component) for end in (0, 1)
+                          if not self.neighbours(index, end)), (min(component), 0))
+            closed = all(len(self._adjacency[self._ends[index][end]]) == 2
+                         for index in component for end in (0, 1))
+            chains.append(Chain(self._walk(start, component), closed))
+        return chains
+
+    def _component(self, first):
+        component = {first}
+        stack = [first]
+        while stack:
+            index = stack.pop()
+            for end in (0, 1):
+                for other, _ in self.neighbours(index, end):
+                    if other not in component:
+                        component.add(other)
+                        stack.append(other)
+        return component
+
+    def _walk(self, start, component):
+        order = []
+        walked = set()
+        index, end = start
+        while len(order) < len(component):
+            if index is None:
+                index = min(component - walked)
+                end = 0
+            order.append(index)
+            walked.add(index)
+            # Leave by the far end, and carry on with the next edge that hasn't been walked
+            following = sorted(pair for pair in self.neighbours(index, 1 - end) if pair[0] not in walked)
+            index, end = following[0] if following else (None, None)
+        return order
+
+
+def _point_key(point):
+    return tuple(round(value, POINT_DECIMALS) for value in point)
@@ -0,0 +1,116 @@
+import adsk.fusion
+from utils import as_tuple
+
+# The counters every proxy tallies its cached and fetched reads under, when given a Counter
+HITS = 'curve_cache_hits'
+MISSES = 'curve_cache_misses'
+
+# Marks a property that hasn't been read from the curve yet, as None is a valid value
+_UNREAD = object()
+
+
+class CurveProxy:
+    """
+    Stands in for a SketchCurve, caching the properties the jitter reads from it over and over.
+
+    Every read of a live property of a SketchCurve is a call into Fusion. The proxy reads
+    isValid, length and the end points once, after which they're plain attribute lookups, and
+    passes anything else straight through to the curve. The proxy isn't an adsk object, so the
+    curve itself has to be handed to the API, as `proxy.curve`.
+
+    The cache is only as good as our own bookkeeping: trim() and deleteMe() clear it, but the
+    proxy can't tell when the curve is changed some other way. Proxies are only kept for one run,
+    while nothing but the jitter is changing the sketch, and invalidate() clears the cache when
+    the curve has changed otherwise.
+    """
+
+    __slots__ = ('curve', 'hits', 'misses', '_counters', '_is_valid', '_length', '_start_sketch_point',
+                 '_end_sketch_point', '_start_point', '_end_point')
+
+    # ----- CONSTRUCTORS -----
+
+    def __init__(self, curve: adsk.fusion.SketchCurve, counters=None):
+        """
+        Parameters:
+            curve (SketchCurve): The curve to stand in for.
+            counters (Counter): Where to also tally the proxy's hits and misses, if anywhere, e.g.
+                            the counters of an Instrumentation, to add up the reads of every proxy.
+        """
+        self.curve = curve
+        self.hits = 0
+        self.misses = 0
+        self._counters = counters
+        self.invalidate()
+
+    @staticmethod
+    def wrap(curve, counters=None):
+        """Returns a proxy for the curve, or the curve itself when it already is one."""
+        return curve if isinstance(curve, CurveProxy) else CurveProxy(curve, counters)
+
+
+    # ----- METHODS -----
+
+    def __getattr__(self, name):
+        # Only called for what the proxy doesn't have itself
+        return getattr(self.curve, name)
+
+    def _cached(self, slot, read):
+        value = getattr(self, slot)
+        if value is _UNREAD:
+            value = read()
+            setattr(self, slot, value)
+            self.misses += 1
+            if self._counters is not None:
+                self._counters[MISSES] += 1
+        else:
+            self.hits += 1
+            if self._counters is not None:
+                self._counters[HITS] += 1
+        return value
+
+    def invalidate(self):
+        """Forgets everything read from the curve, so it's read again when next needed."""
+        self._is_valid = _UNREAD
+        self._length = _UNREAD
+        self._start_sketch_point = _UNREAD
+        self._end_sketch_point = _UNREAD
+        self._start_point = _UNREAD
+        self._end_point = _UNREAD
+
+    @property
+    def isValid(self):
+        return self._cached('_is_valid', lambda: self.curve.isValid)
+
+    @property
+    def length(self):
+        return self._cached('_length', lambda: self.curve.length)
+
+    @property
+    def startSketchPoint(self):
+        return self._cached('_start_sketch_point', lambda: self.curve.startSketchPoint)
+
+    @property
+    def endSketchPoint(self):
+        return self._cached('_end_sketch_point', lambda: self.curve.endSketchPoint)
+
+    @property
+    def start_point(self):
+        """The (x, y, z) coordinates of the curve's start point."""
+        return self._cached('_start_point', lambda: as_tuple(self.startSketchPoint.geometry))
+
+    @property
+    def end_point(self):
+        """The (x, y, z) coordinates of the curve's end point."""
+        return self._cached('_end_point', lambda: as_tuple(self.endSketchPoint.geometry))
+
+    def trim(self, segment_point):
+        """Trims the curve, see SketchCurve.trim(). Whatever's left of it has to be read again."""
+        result = self.curve.trim(segment_point)
+        self.invalidate()
+        return result
+
+    def deleteMe(self):
+        """Deletes the curve, see SketchCurve.deleteMe()."""
+        result = self.curve.deleteMe()
+        self.invalidate()
+        return result
@@ -0,0 +1,102 @@
+import bisect
+
+# Gaps and widths below this (cm) are slivers: Fusion can't tell their ends apart, so trimming
+# next to one wipes out or invalidates the neighbouring piece of curve. It matches the 0.001 cm
+# precision cut widths are rounded to.
+SLIVER_TOLERANCE = 1e-3
+
+# Reasons check() can reject a cut for
+OUT_OF_BOUNDS = 'out_of_bounds'
+DEGENERATE = 'degenerate'
+OVERLAP = 'overlap'
+SLIVER = 'sliver'
+
+
+class CutIndex:
+    """
+    Tracks the intervals taken up by cuts along an edge, and the free space between them.
+
+    Intervals are kept in two sorted lists, so checking a candidate cut against its neighbours
+    is a bisect rather than a scan, and nothing has to be read back from the sketch to find out
+    that a cut wouldn't work.
+    """
+
+    # ----- CONSTRUCTORS -----
+
+    def __init__(self, edge_length: float, min_gap: float = SLIVER_TOLERANCE,
+                 min_width: float = SLIVER_TOLERANCE):
+        """
+        Parameters:
+            edge_length (float): The length of the edge.
+            min_gap (float): The shortest piece of curve allowed between two cuts, or between a
+                            cut and the end of the edge.
+            min_width (float): The narrowest cut allowed.
+        """
+        self.edge_length = edge_length
+        self._min_gap = min_gap
+        self._min_width = min_width
+        self._starts = []
+        self._ends = []
+
+
+    # ----- METHODS -----
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __iter__(self):
+        return zip(self._starts, self._ends)
+
+    def check(self, start: float, end: float):
+        """
+        Checks whether a cut from start to end can be placed.
+
+        Returns:
+            str: Why the cut can't be placed (OUT_OF_BOUNDS, DEGENERATE, OVERLAP or SLIVER), or
+                None when it can.
+        """
+        if start < 0 or end > self.edge_length:
+            return OUT_OF_BOUNDS
+        if end - start < self._min_width:
+            return DEGENERATE
+        index = bisect.bisect_left(self._starts, start)
+        previous_end = self._ends[index - 1] if index > 0 else 0.0
+        next_start = self._starts[index] if index < len(self._starts) else self.edge_length
+        if start < previous_end or end > next_start:
+            return OVERLAP
+        if start - previous_end < self._min_gap or next_start - end < self._min_gap:
+            return SLIVER
+        return None
+
+    def add(self, start: float, end: float):
+        """
+        Records the interval from start to end as taken, without checking it. Also used to keep
+        cuts away from parts of the edge, such as its corners.
+        """
+        index = bisect.bisect_left(self._starts, start)
+        self._starts.insert(index, start)
+        self._ends.insert(index, end)
+
+    def place(self, start: float, end: float):
+        """
+        Records the cut from start to end if it can be placed, see check().
+
+        Returns:
+            str: Why the cut wasn't placed, or None when it was.
+        """
+        reason = self.check(start, end)
+        if reason is None:
+            self.add(start, end)
+        return reason
+
+    def free_intervals(self):
+        """
+        Yields the (start, end) intervals of the edge not taken up by cuts, in order.
+        """
+        previous_end = 0.0
+        for start, end in zip(self._starts, self._ends):
+            if start > previous_end:
+                yield previous_end, start
+            previous_end = max(previous_end, end)
+        if previous_end < self.edge_length:
+            yield previous_end, self.edge_length
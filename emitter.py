@@ -0,0 +1,306 @@
+import bisect
+import time
+import adsk.core
+import adsk.fusion
+from curve_proxy import CurveProxy
+from cut_index import CutIndex
+from geometry import EdgeFrame
+from instrumentation import Instrumentation
+from utils import clean_selected_curve_by_points
+
+
+class PlanEmitter:
+    """
+    Applies a JitterPlan to the sketch, one shape per planned cut.
+
+    The emitter keeps track of which live piece of the original curve covers which interval
+    along the edge, so cuts can be emitted in one pass without re-reading the whole curve. Cuts
+    are checked against the ones already emitted before anything is drawn (see CutIndex), so a
+    plan that doesn't fit the edge, e.g. one replayed from elsewhere, doesn't cost any geometry.
+    """
+
+    # ----- CONSTRUCTORS -----
+
+    def __init__(self, selected_curve: adsk.fusion.SketchCurve, frame: EdgeFrame, sides, shape_drawers,
+                 point_index=None, instrumentation=None, outline_drawers=None):
+        """
+        Parameters:
+            selected_curve (SketchCurve): The curve the plan was made for.
+            frame (EdgeFrame): The edge frame of the selected_curve.
+            sides (dict): The side of the frame to cut towards (1 or -1), keyed by cut out type.
+            shape_drawers (dict): The shape drawing functions, keyed by shape name.
+            point_index (SketchPointIndex): A sketch snapshot to record the added points in, if any.
+            instrumentation (Instrumentation): Where to record timings and counts, if anywhere.
+            outline_drawers (dict): The shape outline drawing functions, keyed by shape name. Only
+                            needed by emit_rebuild().
+        """
+        self._sketch = selected_curve.parentSketch
+        self._frame = frame
+        self._sides = sides
+        self._shape_drawers = shape_drawers
+        self._outline_drawers = outline_drawers
+        self._point_index = point_index
+        self._instrumentation = instrumentation if instrumentation is not None else Instrumentation()
+        # Live pieces of the original curve, sorted by their start along the edge. The pieces are
+        # read over and over, so they're kept as CurveProxies.
+        self._starts = [0.0]
+        self._pieces = [(0.0, frame.length, self._proxy(selected_curve))]
+        self._placed = CutIndex(frame.length)
+        # Every curve drawn for the cuts, and by emit_rebuild() for the pieces in between
+        self.drawn_curves = []
+
+
+    # ----- METHODS -----
+
+    def _proxy(self, curve):
+        return CurveProxy.wrap(curve, self._instrumentation.counters)
+
+    def _point(self, u):
+        return adsk.core.Point3D.create(*self._frame.point_at(u))
+
+    def emit(self, plan, batch=False, rebuild=False):
+        """
+        Emits every cut of the plan.
+
+        Parameters:
+            plan (JitterPlan): The plan to emit.
+            batch (bool): Whether to suspend the sketch compute while emitting, see emit_batch().
+            rebuild (bool): Whether to rebuild the curve in one pass rather than trimming it once
+                            per cut, see emit_rebuild().
+
+        Returns:
+            int: The number of cuts actually emitted.
+        """
+        if rebuild:
+            return self.emit_rebuild(plan)
+        if batch:
+            return self.emit_batch(plan)
+        emitted = 0
+        for cut in plan:
+            if self.emit_cut(cut):
+                emitted += 1
+        return emitted
+
+    def emit_cut(self, cut):
+        """
+        Draws the shape of a single cut and trims the live piece of the curve it falls on. A shape
+        that can't be trimmed is deleted again, like trim_batch() does.
+
+        Returns:
+            bool: Whether the cut was emitted.
+        """
+        index = self._find_piece(cut)
+        if index is None or not self._accept(cut):
+            return False
+        drawn = self._draw(cut)
+        if self._trim(index, cut, drawn):
+            return True
+        _delete_all(drawn.curves)
+        return False
+
+    def emit_batch(self, plan):
+        """
+        Emits every cut of the plan with the sketch compute suspended.
+
+        All the shapes are drawn first. The trims need the sketch to know about the new shapes,
+        so the sketch is brought up to date once before trimming, rather than after every shape.
+        A trim that still fails gets one more try after another recompute, and the sketch is
+        always recomputed at the end, unless it was already suspended by the caller.
+
+        Returns:
+            int: The number of cuts actually emitted.
+        """
+        deferred = self._sketch.isComputeDeferred
+        self._sketch.isComputeDeferred = True
+        try:
+            pending = self.draw_batch(plan)
+            self._recompute()
+            return self.trim_batch(pending)
+        finally:
+            self._sketch.isComputeDeferred = deferred
+
+    def draw_batch(self, plan):
+        """
+        Draws the shape of every cut of the plan that fits, without trimming anything. The first
+        half of emit_batch(), for emitting several curves in one batch.
+
+        Returns:
+            list: The (cut, DrawnShape) of each cut drawn, to hand to trim_batch().
+        """
+        return [(cut, self._draw(cut)) for cut in plan if self._accept(cut)]
+
+    def trim_batch(self, pending):
+        """
+        Trims the curve for shapes drawn by draw_batch(), once the sketch has been brought up to
+        date. Shapes that can't be trimmed are deleted again.
+
+        Returns:
+            int: The number of cuts actually emitted.
+        """
+        emitted = 0
+        for cut, drawn in pending:
+            index = self._find_piece(cut)
+            if index is not None and self._trim(index, cut, drawn, retry=True):
+                emitted += 1
+            else:
+                _delete_all(drawn.curves)
+        return emitted
+
+    def emit_rebuild(self, plan):
+        """
+        Emits every cut of the plan by rebuilding the curve in a single pass.
+
+        Trimming has Fusion intersect the curve with everything around it and split it, once per
+        cut. Instead, the straight pieces between the cuts and the outlines of the cuts are drawn
+        as one connected chain, from the curve's start point to its end point with each curve
+        starting on the SketchPoint the one before it ended on, and the original curve is deleted
+        once. The sketch compute is suspended throughout, and left suspended if the caller had
+        already suspended it. Only a curve that hasn't been cut yet can be rebuilt.
+
+        Returns:
+            int: The number of cuts actually emitted.
+
+        Raises:
+            RuntimeError: If some of the curve has already been cut.
+        """
+        if len(self._pieces) != 1 or self._pieces[0][:2] != (0.0, self._frame.length):
+            raise RuntimeError("Only a curve that hasn't been cut yet can be rebuilt.")
+        curve = self._pieces[0][2]
+        cuts = [cut for cut in sorted(plan, key=lambda cut: cut.start) if self._accept(cut)]
+        if not cuts:
+            return 0
+
+        sketch_lines = self._sketch.sketchCurves.sketchLines
+        pieces = []
+        deferred = self._sketch.isComputeDeferred
+        self._sketch.isComputeDeferred = True
+        try:
+            point = curve.startSketchPoint
+            piece_start = 0.0
+            for cut in cuts:
+                line = sketch_lines.addByTwoPoints(point, self._point(cut.start))
+                pieces.append((piece_start, cut.start, self._proxy(line)))
+                self.drawn_curves.append(line)
+                _, point = self._draw(cut, line.endSketchPoint)
+                piece_start = cut.end
+            line = sketch_lines.addByTwoPoints(point, curve.endSketchPoint)
+            pieces.append((piece_start, self._frame.length, self._proxy(line)))
+            self.drawn_curves.append(line)
+            curve.deleteMe()
+        finally:
+            self._sketch.isComputeDeferred = deferred
+        self._pieces = pieces
+        self._starts = [piece[0] for piece in pieces]
+        self._instrumentation.count('curves_rebuilt')
+        return len(cuts)
+
+    def result_curves(self):
+        """
+        Returns what the curve has been jittered into: the live pieces of the curve followed by
+        the shapes drawn on it, and where the pieces that keep the curve's start and end points
+        are among them.
+
+        Returns:
+            tuple: The valid curves, and the (start, end) indices of the end pieces in them, either
+                of which is None if there's no piece at that end.
+        """
+        pieces = [piece for piece in self._pieces if piece[2].isValid]
+        curves = [piece[2].curve for piece in pieces]
+        ends = (0 if pieces and pieces[0][0] == 0.0 else None,
+                len(pieces) - 1 if pieces and pieces[-1][1] == self._frame.length else None)
+        # Rebuilt pieces are drawn curves too
+        piece_ids = {id(curve) for curve in curves}
+        curves.extend(curve for curve in self.drawn_curves if id(curve) not in piece_ids and curve.isValid)
+        return curves, ends
+
+    def _recompute(self):
+        # Flushing the deferred compute is what makes Fusion solve the sketch
+        self._sketch.isComputeDeferred = False
+        self._sketch.isComputeDeferred = True
+
+    def _accept(self, cut):
+        reason = self._placed.place(cut.start, cut.end)
+        if reason is not None:
+            self._instrumentation.count(f'cuts_skipped_{reason}')
+            return False
+        return True
+
+    def _find_piece(self, cut):
+        index = bisect.bisect_right(self._starts, cut.start) - 1
+        if index < 0:
+            return None
+        piece_start, piece_end, curve = self._pieces[index]
+        if cut.end > piece_end:
+            return None
+        if not curve.isValid:
+            self._instrumentation.count('invalid_curves')
+            return None
+        return index
+
+    def _draw(self, cut, start=None):
+        """
+        Draws the shape of a cut. Given a start point, only the shape's outline is drawn, joined on
+        to that point, see emit_rebuild().
+        """
+        side = self._sides[cut.cut_out_type]
+        start_time = time.perf_counter()
+        if start is None:
+            drawn = self._shape_drawers[cut.shape](self._sketch, self._frame, cut.center, cut.width, side,
+                                                   cut.height)
+            self.drawn_curves.extend(drawn.curves)
+        else:
+            drawn = self._outline_drawers[cut.shape](self._sketch, self._frame, cut.center, cut.width, side,
+                                                     cut.height, start)
+            self.drawn_curves.extend(drawn[0])
+        seconds = time.perf_counter() - start_time
+        self._instrumentation.timings['draw'] += seconds
+        self._instrumentation.shape_cost(cut.shape, seconds)
+        if self._point_index is not None:
+            self._point_index.add_points((self._frame.point_at(cut.start), self._frame.point_at(cut.end),
+                                          self._frame.point_at(cut.center, side * cut.height)))
+        return drawn
+
+    def _trim(self, index, cut, drawn, retry=False):
+        piece_start, piece_end, curve = self._pieces[index]
+        try:
+            self._instrumentation.count('trims')
+            with self._instrumentation.phase('trim'):
+                remaining = list(clean_selected_curve_by_points(curve, drawn.trim_start, drawn.trim_end))
+        except RuntimeError:
+            remaining = []
+        if not remaining and curve.isValid:
+            # Nothing was trimmed, most likely the sketch hadn't caught up with the new shape yet
+            if retry:
+                self._recompute()
+                return self._trim(index, cut, drawn)
+            return False
+        _delete_all(drawn.helpers)
+
+        # Work out which of the remaining curves is on which side of the cut. Depending on the
+        # trim, the original curve may live on as one of them.
+        if curve.isValid and curve.curve not in remaining:
+            remaining.append(curve.curve)
+        left = right = None
+        for remaining_curve in remaining:
+            remaining_curve = curve if remaining_curve == curve.curve else self._proxy(remaining_curve)
+            if not remaining_curve.isValid:
+                continue
+            if self._frame.project(remaining_curve.start_point) < cut.center:
+                left = remaining_curve
+            else:
+                right = remaining_curve
+
+        new_pieces = []
+        if left:
+            new_pieces.append((piece_start, cut.start, left))
+        if right:
+            new_pieces.append((cut.end, piece_end, right))
+        self._pieces[index:index + 1] = new_pieces
+        self._starts[index:index + 1] = [piece[0] for piece in new_pieces]
+        return True
+
+
+def _delete_all(curves):
+    for curve in curves:
+        if curve.isValid:
+            curve.deleteMe()
@@ -0,0 +1,95 @@
+import os
+
+DXF_EXTENSION = '.dxf'
+SVG_EXTENSION = '.svg'
+EXPORT_EXTENSIONS = (DXF_EXTENSION, SVG_EXTENSION)
+
+# Sketch coordinates are in cm, exported files are in mm, which laser cutters expect
+MM_PER_CM = 10.0
+
+# The layer every DXF line goes on, and the width of SVG strokes (mm)
+DXF_LAYER = 'JITTER'
+SVG_STROKE_WIDTH = 0.1
+
+# How many points of an SVG path are written on one line of the file
+SVG_POINTS_PER_LINE = 32
+
+
+def _mm(value):
+    return f'{value * MM_PER_CM:.4f}'
+
+
+def dxf_lines(outlines):
+    """
+    Yields an R12 DXF document drawing each outline as LINE entities, a piece of text at a time.
+
+    Parameters:
+        outlines (iterable): Each outline's (x, y, z) sketch coordinates, see
+                        outline.iter_plan_outline(). Outlines, and the points in them, are only
+                        read once and in order, so both can be generators.
+    """
+    yield '0\nSECTION\n2\nHEADER\n9\n$ACADVER\n1\nAC1009\n0\nENDSEC\n'
+    yield '0\nSECTION\n2\nENTITIES\n'
+    for outline in outlines:
+        previous = None
+        for point in outline:
+            if previous is not None and point != previous:
+                yield (f'0\nLINE\n8\n{DXF_LAYER}\n'
+                       f'10\n{_mm(previous[0])}\n20\n{_mm(previous[1])}\n30\n{_mm(previous[2])}\n'
+                       f'11\n{_mm(point[0])}\n21\n{_mm(point[1])}\n31\n{_mm(point[2])}\n')
+            previous = point
+    yield '0\nENDSEC\n0\nEOF\n'
+
+
+def svg_lines(outlines, bounds):
+    """
+    Yields an SVG document drawing each outline as a path, a piece of text at a time. The sketch's
+    y axis points up, so y is flipped.
+
+    Parameters:
+        outlines (iterable): As for dxf_lines().
+        bounds (tuple): The (min x, min y, max x, max y) sketch coordinates everything is within,
+                        which sets the size of the drawing. The header is written before any
+                        outline is read, so they have to be known up front.
+    """
+    min_x, min_y, max_x, max_y = bounds
+    width, height = _mm(max_x - min_x), _mm(max_y - min_y)
+    yield ('<?xml version="1.0" encoding="UTF-8"?>\n'
+           f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}mm" height="{height}mm" '
+           f'viewBox="{_mm(min_x)} {_mm(-max_y)} {width} {height}">\n')
+    for outline in outlines:
+        yield f'<path fill="none" stroke="black" stroke-width="{SVG_STROKE_WIDTH}" d="'
+        command = 'M'
+        for i, point in enumerate(outline):
+            if i and i % SVG_POINTS_PER_LINE == 0:
+                yield '\n'
+            yield f'{command}{_mm(point[0])} {_mm(-point[1])} '
+            command = 'L'
+        yield '"/>\n'
+    yield '</svg>\n'
+
+
+def write_outlines(filename, outlines, bounds):
+    """
+    Streams outlines to a DXF or SVG file, picked by the file's extension. Nothing but the piece
+    of text being written is held in memory, so outlines can be given as generators that work
+    each outline out as it's needed.
+
+    Parameters:
+        filename (str): The file to write, ending in .dxf or .svg.
+        outlines (iterable): As for dxf_lines().
+        bounds (tuple): As for svg_lines().
+
+    Raises:
+        ValueError: If the file isn't a DXF or SVG file.
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == DXF_EXTENSION:
+        lines = dxf_lines(outlines)
+    elif extension == SVG_EXTENSION:
+        lines = svg_lines(outlines, bounds)
+    else:
+        raise ValueError(f"Can't export to {extension or 'a file without an extension'}, "
+                         f"only to {' or '.join(EXPORT_EXTENSIONS)}.")
+    with open(filename, 'w', encoding='utf-8', newline='\n') as file:
+        file.writelines(lines)
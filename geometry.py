@@ -0,0 +1,69 @@
+import math
+
+
+class EdgeFrame:
+    """
+    Edge-local coordinate frame for a straight sketch line.
+
+    Positions are expressed as (u, v) where u is the distance along the edge from its start
+    point and v is the distance along the edge's left-hand normal. This module is pure Python
+    so it can be used by the planner, and outside of Fusion, without any adsk objects.
+    """
+
+    # ----- CONSTRUCTORS -----
+
+    def __init__(self, start, end):
+        """
+        Parameters:
+            start (tuple): The (x, y, z) start point of the edge.
+            end (tuple): The (x, y, z) end point of the edge.
+        """
+        self.start = tuple(start)
+        self.end = tuple(end)
+        dx = self.end[0] - self.start[0]
+        dy = self.end[1] - self.start[1]
+        self.length = math.hypot(dx, dy)
+        if self.length == 0:
+            raise ValueError("Cannot build a frame for a zero length edge.")
+        self.tx = dx / self.length
+        self.ty = dy / self.length
+        self.nx = -self.ty
+        self.ny = self.tx
+
+
+    # ----- METHODS -----
+
+    def point_at(self, u, v=0.0):
+        """
+        Returns the (x, y, z) sketch coordinate for the edge-local position (u, v).
+        """
+        return (self.start[0] + u * self.tx + v * self.nx,
+                self.start[1] + u * self.ty + v * self.ny,
+                self.start[2])
+
+    def project(self, point):
+        """
+        Returns the edge-local u coordinate of the given (x, y[, z]) point.
+        """
+        return (point[0] - self.start[0]) * self.tx + (point[1] - self.start[1]) * self.ty
+
+    def map_local(self, u, side, points):
+        """
+        Maps cut-local (s, t) points to sketch coordinates, where s runs along the edge from the
+        edge-local position u, and t runs away from the edge on the given side.
+
+        This is the one affine transform every shape template goes through. The edge's tangent
+        and normal are worked out once, with the frame, so each cut only moves the origin.
+
+        Parameters:
+            u (float): The edge-local position of the cut-local origin.
+            side (int): 1 to map t onto the edge's left-hand side, -1 for its right-hand side.
+            points (iterable): The cut-local (s, t) points.
+
+        Returns:
+            list: The (x, y, z) sketch coordinates of the points.
+        """
+        tx, ty = self.tx, self.ty
+        nx, ny = side * self.nx, side * self.ny
+        ox, oy, z = self.start[0] + u * tx, self.start[1] + u * ty, self.start[2]
+        return [(ox + s * tx + t * nx, oy + s * ty + t * ny, z) for s, t in points]
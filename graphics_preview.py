@@ -0,0 +1,51 @@
+import adsk.core
+import adsk.fusion
+
+# The colour of the preview outline, as RGBA
+PREVIEW_COLOR = (255, 120, 0, 255)
+
+
+class GraphicsPreview:
+    """
+    Shows jittered outlines with custom graphics instead of sketch geometry.
+
+    Each outline is drawn as one line strip, so showing a preview is a single vertex buffer per
+    edge, with no sketch curves, constraints or trims to create and roll back. Custom graphics
+    aren't part of the preview transaction, so they stay until clear() is called, which the
+    command does before every preview, on execute and when it's destroyed.
+    """
+
+    # ----- CONSTRUCTORS -----
+
+    def __init__(self):
+        self._group = None
+
+
+    # ----- METHODS -----
+
+    def show(self, sketch: adsk.fusion.Sketch, outlines):
+        """
+        Replaces whatever is shown with the given outlines.
+
+        Parameters:
+            sketch (Sketch): The sketch the outlines are in.
+            outlines (list): Each outline's (x, y, z) sketch coordinates, see outline.plan_outline().
+        """
+        self.clear()
+        self._group = sketch.parentComponent.customGraphicsGroups.add()
+        color = adsk.fusion.CustomGraphicsSolidColorEffect.create(adsk.core.Color.create(*PREVIEW_COLOR))
+        for coordinates in outlines:
+            flat = [value for coordinate in coordinates for value in coordinate]
+            lines = self._group.addLines(adsk.fusion.CustomGraphicsCoordinates.create(flat), [], True)
+            # The outline is in sketch space, the graphics are drawn in the component's space
+            lines.transform = sketch.transform
+            lines.color = color
+            lines.weight = 2
+        adsk.core.Application.get().activeViewport.refresh()
+
+    def clear(self):
+        """Removes the preview, if one is shown."""
+        if self._group is not None:
+            if self._group.isValid:
+                self._group.deleteMe()
+            self._group = None
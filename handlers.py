@@ -1,16 +1,48 @@
 import traceback
+import os
+import random
 import adsk.core
+import background
+import graphics_preview
 import jitter_processor
+import plan_format
+import planner
+import shapes.shape_factory as shape_factory
+from constants import DEV_MODE
+from utils import profile_lines
 
 handler_holder = []
 
+# Fired from the background planning thread when plans are ready, see MyPlanReadyHandler
+PLAN_READY_EVENT = 'EdgeJitterPlanReady'
+# Inputs that don't change the plan, so changing them doesn't start planning again
+REPORT_INPUTS = ('inputReport', 'inputShowStats')
+PLAN_FILE_FILTER = 'Jitter plans (*.ejplan);;JSON (*.json)'
+EXPORT_FILE_FILTER = 'DXF (*.dxf);;SVG (*.svg)'
+# The default time budget of a preview, in seconds
+PREVIEW_BUDGET = 2.0
+# The "Placement" choices, and the planner placements they stand for
+PLACEMENTS = {'Midpoint bisection': planner.BISECT, 'Scatter': planner.SCATTER}
+
+_background_planner = None
+_command = None
+_plan_store = plan_format.PlanStore()
+_graphics_preview = graphics_preview.GraphicsPreview()
+# The plans of the last preview or run, for "Save plan", and the plans loaded with "Load plan"
+_last_plans = None
+_loaded_plans = None
+
+def _fire_plan_ready(generation):
+    """Hands plans back to the main thread. Fusion's custom events are safe to fire from any thread."""
+    adsk.core.Application.get().fireCustomEvent(PLAN_READY_EVENT, str(generation))
+
 class MyCommandCreatedHandler(adsk.core.CommandCreatedEventHandler):
     """Handles the command creation event for the JitterProcessor."""
     def __init__(self):
         super().__init__()
 
     def notify(self, args: adsk.core.CommandCreatedEventArgs):
-        global handler_holder
+        global handler_holder, _background_planner, _command
 
         app = adsk.core.Application.get()
         ui = app.userInterface
@@ -27,11 +59,68 @@ class MyCommandCreatedHandler(adsk.core.CommandCreatedEventHandler):
 
             # inputs
             inputs: adsk.core.CommandInputs = cmd.commandInputs
-            inputs.addSelectionInput('inputSelectedCurve', "Selected curve", "Select a single curve (line) to operate on")
+            curve_input = inputs.addSelectionInput('inputSelectedCurve', "Selected curves", "Select the curves (lines) or profiles to operate on")
+            curve_input.addSelectionFilter('SketchLines')
+            curve_input.addSelectionFilter('Profiles')
+            curve_input.setSelectionLimits(1, 0)
+            # Jitters connected lines as one profile, clear of their corners, see curve_graph.py
+            inputs.addBoolValueInput('inputProfile', 'Connected profile', True, '', False)
+            # Jitters one of each set of same-length lines and copies it onto the rest, see stamp.py
+            inputs.addBoolValueInput('inputStamp', 'Stamp congruent curves', True, '', False)
             inputs.addBoolValueInput('inputRecurseOption', 'Recurse?', True, '', False)                
+            # Scatter places every cut in one pass, see planner.iter_scattered_cuts()
+            placement_input = inputs.addDropDownCommandInput('inputPlacement', 'Placement',
+                                                             adsk.core.DropDownStyles.TextListDropDownStyle)
+            for i, name in enumerate(PLACEMENTS):
+                placement_input.listItems.add(name, i == 0)
+            # Plans this many layouts per curve and keeps the best looking, see layout_score.py
+            inputs.addIntegerSpinnerCommandInput('inputCandidates', 'Layout candidates', 1, 64, 1, 1)
+            # Caps on how many cuts a run makes, 0 for no cap, see JitterProcessor._cut_caps()
+            inputs.addFloatSpinnerCommandInput('inputDensity', 'Max cuts per cm', '', 0, 100, 0.5, 0)
+            inputs.addIntegerSpinnerCommandInput('inputTotalCuts', 'Max total cuts', 0, 1000000, 100, 0)
             inputs.addDistanceValueCommandInput('inputMinSize', 'Min Size', adsk.core.ValueInput.createByReal(0))
             inputs.addDistanceValueCommandInput('inputMaxSize', 'Max Size', adsk.core.ValueInput.createByReal(0))
+            # The seed makes the preview and the final result the same, and lets execute replay the preview's plan
+            inputs.addIntegerSpinnerCommandInput('inputSeed', 'Seed', 0, 2**31 - 1, 1, random.randint(0, 2**31 - 1))
+            inputs.addBoolValueInput('inputBatchMode', 'Batch emission', True, '', False)
+            inputs.addBoolValueInput('inputRebuild', 'Rebuild curves', True, '', False)
+            # Keeps the jitter from weighing on the sketch solver, see JitterProcessor._settle_constraints()
+            inputs.addBoolValueInput('inputFreeConstraints', 'Remove jitter constraints', True, '', False)
+            inputs.addBoolValueInput('inputFixGeometry', 'Fix jitter in place', True, '', False)
+            # Off by default: worker processes started from Fusion's embedded Python haven't been shown
+            # to work, see parallel.py
+            cpu_count = os.cpu_count() or 1
+            inputs.addIntegerSpinnerCommandInput('inputWorkers', 'Planning processes', 1, cpu_count, 1, 1)
             inputs.addBoolValueInput('inputPreview', 'Generate preview', True)
+            # How long a preview may take, 0 for no limit. A preview cut down to fit is drawn in full on OK.
+            inputs.addFloatSpinnerCommandInput('inputPreviewBudget', 'Preview time budget (s)', '', 0, 60, 0.5,
+                                               PREVIEW_BUDGET)
+            # Previews the outline with custom graphics rather than sketch geometry, see graphics_preview.py
+            inputs.addBoolValueInput('inputGraphicsPreview', 'Lightweight preview', True, '', False)
+            # Plans the preview on a worker thread as the inputs change, see background.py
+            inputs.addBoolValueInput('inputBackground', 'Plan in background', True, '', False)
+            inputs.addIntegerSpinnerCommandInput('inputFirstCuts', 'Progressive first cuts', 0, 10000, 10, 0)
+            # Plans can be kept on disk, and saved and loaded to replay them elsewhere, see plan_format.py
+            inputs.addBoolValueInput('inputDiskCache', 'Cache plans on disk', True, '', False)
+            inputs.addBoolValueInput('inputSavePlan', 'Save plan', False, '', False)
+            inputs.addBoolValueInput('inputLoadPlan', 'Load plan', False, '', False)
+            # Writes the jitter straight to a file for cutting, without touching the sketch, see export.py
+            inputs.addBoolValueInput('inputExport', 'Export outline', False, '', False)
+            replay_input = inputs.addBoolValueInput('inputReplayPlan', 'Replay loaded plan', True, '', False)
+            replay_input.isEnabled = _loaded_plans is not None
+            inputs.addBoolValueInput('inputShowStats', 'Show run statistics', True, '', False)
+            inputs.addTextBoxCommandInput('inputReport', 'Report', '', 2, True)
+
+            # shape mix, remembered by the shape registry between runs
+            shapes_group = inputs.addGroupCommandInput('inputShapes', 'Shapes')
+            shapes_group.isExpanded = False
+            registry = shape_factory.registry
+            for name in registry.names():
+                label = name.replace('_', ' ').title()
+                shapes_group.children.addBoolValueInput(f'inputShapeEnabled_{name}', label, True, '',
+                                                        registry.is_enabled(name))
+                shapes_group.children.addIntegerSpinnerCommandInput(f'inputShapeWeight_{name}', f'{label} weight',
+                                                                    0, 100, 1, round(registry.weight(name)))
 
             # Set up event handlers
             on_destroy = MyDestroyHandler()
@@ -46,6 +135,18 @@ class MyCommandCreatedHandler(adsk.core.CommandCreatedEventHandler):
             cmd.executePreview.add(on_execute_preview)
             handler_holder.append(on_execute_preview)
 
+            on_input_changed = MyInputChangedHandler()
+            cmd.inputChanged.add(on_input_changed)
+            handler_holder.append(on_input_changed)
+
+            _command = cmd
+            _background_planner = background.BackgroundPlanner(_fire_plan_ready)
+            app.unregisterCustomEvent(PLAN_READY_EVENT)
+            plan_ready_event = app.registerCustomEvent(PLAN_READY_EVENT)
+            on_plan_ready = MyPlanReadyHandler()
+            plan_ready_event.add(on_plan_ready)
+            handler_holder.append(on_plan_ready)
+
             # # Trim and remove any spaces
             # userInput = userInput.strip()
             
@@ -79,23 +180,185 @@ class MyCommandCreatedHandler(adsk.core.CommandCreatedEventHandler):
         except:
             ui.messageBox(f'Failed:\n{traceback.format_exc()}')
 
+def _apply_shape_inputs(inputs: adsk.core.CommandInputs):
+    """Copies the shape enabled flags and weights from the dialog onto the shape registry."""
+    registry = shape_factory.registry
+    for name in registry.names():
+        enabled_input = inputs.itemById(f'inputShapeEnabled_{name}')
+        weight_input = inputs.itemById(f'inputShapeWeight_{name}')
+        if enabled_input:
+            registry.set_enabled(name, enabled_input.value)
+        if weight_input:
+            registry.set_weight(name, weight_input.value)
+
+def _selected_curves(inputs: adsk.core.CommandInputs):
+    """Returns the selected lines, with every selected profile standing in for its outline's lines."""
+    curve_input = inputs.itemById('inputSelectedCurve')
+    selected_curves = []
+    for i in range(curve_input.selectionCount):
+        entity = curve_input.selection(i).entity
+        profile = adsk.fusion.Profile.cast(entity)
+        for curve in profile_lines(profile) if profile else [entity]:
+            if curve not in selected_curves:
+                selected_curves.append(curve)
+    return selected_curves
+
+def _create_processor(ui, inputs: adsk.core.CommandInputs, preview=False):
+    """
+    Builds a JitterProcessor from the dialog's inputs. A preview processor is held to the preview
+    time budget.
+    """
+    selected_curves = _selected_curves(inputs)
+    min_size = inputs.itemById('inputMinSize').value
+    max_size = inputs.itemById('inputMaxSize').value
+    recurse = inputs.itemById('inputRecurseOption').value
+    batch = inputs.itemById('inputBatchMode').value
+    rebuild = inputs.itemById('inputRebuild').value
+    seed = inputs.itemById('inputSeed').value
+    workers = inputs.itemById('inputWorkers').value
+    plan_store = _plan_store if inputs.itemById('inputDiskCache').value else None
+    profile = inputs.itemById('inputProfile').value
+    density = inputs.itemById('inputDensity').value or None
+    total_cuts = inputs.itemById('inputTotalCuts').value or None
+    preview_budget = (inputs.itemById('inputPreviewBudget').value or None) if preview else None
+    outline = preview and inputs.itemById('inputGraphicsPreview').value
+    placement = PLACEMENTS[inputs.itemById('inputPlacement').selectedItem.name]
+    free_constraints = inputs.itemById('inputFreeConstraints').value
+    fix_geometry = inputs.itemById('inputFixGeometry').value
+    stamp = inputs.itemById('inputStamp').value
+    candidates = inputs.itemById('inputCandidates').value
+    _apply_shape_inputs(inputs)
+    return jitter_processor.JitterProcessor(ui, selected_curves, min_size, max_size, recurse, batch=batch,
+                                            seed=seed, workers=workers, rebuild=rebuild, plan_store=plan_store,
+                                            profile=profile, density=density, total_cuts=total_cuts,
+                                            preview_budget=preview_budget, outline=outline, placement=placement,
+                                            free_constraints=free_constraints, fix_geometry=fix_geometry,
+                                            stamp=stamp, candidates=candidates)
+
+def _replaying(inputs: adsk.core.CommandInputs):
+    return _loaded_plans is not None and inputs.itemById('inputReplayPlan').value
+
+def _generate(processor, inputs: adsk.core.CommandInputs, plans=None):
+    """
+    Runs the processor, replaying the loaded plans if asked to, and remembers the plans it
+    emitted for "Save plan".
+    """
+    global _last_plans
+    result = processor.replay(_loaded_plans) if _replaying(inputs) else processor.generate(plans)
+    if result:
+        _last_plans = processor.last_plans
+    return result
+
+def _show_outlines(processor, inputs: adsk.core.CommandInputs, plans=None):
+    """Shows the jittered outlines with custom graphics, replaying the loaded plans if asked to."""
+    if _replaying(inputs):
+        plans = processor.fit_plans(_loaded_plans)
+        if plans is None:
+            return
+    outlines = processor.outlines(plans)
+    if outlines:
+        sketch = inputs.itemById('inputSelectedCurve').selection(0).entity.parentSketch
+        _graphics_preview.show(sketch, outlines)
+        inputs.itemById('inputReport').text = _report(processor, inputs)
+
+def _save_plans(ui, inputs: adsk.core.CommandInputs):
+    if not _last_plans:
+        ui.messageBox('There is no plan to save yet, preview or run the jitter first.')
+        return
+    dialog = ui.createFileDialog()
+    dialog.title = 'Save jitter plan'
+    dialog.filter = PLAN_FILE_FILTER
+    if dialog.showSave() != adsk.core.DialogResults.DialogOK:
+        return
+    plan_format.save_plans(dialog.filename, _last_plans, seed=inputs.itemById('inputSeed').value)
+    inputs.itemById('inputReport').text = f'Saved {len(_last_plans)} plans to {dialog.filename}.'
+
+def _load_plans(ui, inputs: adsk.core.CommandInputs):
+    global _loaded_plans
+    dialog = ui.createFileDialog()
+    dialog.title = 'Load jitter plan'
+    dialog.filter = PLAN_FILE_FILTER
+    if dialog.showOpen() != adsk.core.DialogResults.DialogOK:
+        return
+    try:
+        _loaded_plans, _ = plan_format.load_plans(dialog.filename)
+    except (OSError, ValueError) as error:
+        ui.messageBox(f'Unable to load the plan:\n{error}')
+        return
+    replay_input = inputs.itemById('inputReplayPlan')
+    replay_input.isEnabled = True
+    replay_input.value = True
+    inputs.itemById('inputReport').text = f'Loaded {len(_loaded_plans)} plans from {dialog.filename}.'
+
+def _export_outlines(ui, inputs: adsk.core.CommandInputs):
+    if not inputs.itemById('inputSelectedCurve').selectionCount:
+        ui.messageBox('Select the curves to export the jitter of first.')
+        return
+    dialog = ui.createFileDialog()
+    dialog.title = 'Export jitter outline'
+    dialog.filter = EXPORT_FILE_FILTER
+    if dialog.showSave() != adsk.core.DialogResults.DialogOK:
+        return
+    processor = _create_processor(ui, inputs)
+    plans = None
+    if _replaying(inputs):
+        plans = processor.fit_plans(_loaded_plans)
+        if plans is None:
+            return
+    try:
+        exported = processor.export(dialog.filename, plans)
+    except (OSError, ValueError) as error:
+        ui.messageBox(f'Unable to export the outline:\n{error}')
+        return
+    if exported:
+        inputs.itemById('inputReport').text = _report(processor, inputs)
+
+def _background_plans(inputs: adsk.core.CommandInputs):
+    """
+    Returns the latest PlanResult of the background planner, or None when background planning is
+    off or hasn't handed anything back yet.
+    """
+    if _background_planner is None or not inputs.itemById('inputBackground').value:
+        return None
+    return _background_planner.result()
+
+def _report(processor, inputs: adsk.core.CommandInputs):
+    """Returns the emission report, followed by the run statistics if they're asked for."""
+    report = processor.emission_report or ''
+    if jitter_processor.is_degraded(processor.last_plans):
+        report += '\nCut down to fit the preview time budget, OK draws the full jitter.'
+    if inputs.itemById('inputShowStats').value:
+        report += '\n' + processor.instrumentation.summary()
+    return report
+
 class MyExecuteHandler(adsk.core.CommandEventHandler):
     """Handles the execution of the command."""
     def __init__(self):
         super().__init__()
 
     def notify(self, args):
+        """
+        This is only run when there's no valid preview to keep. A seeded plan that was planned for
+        an earlier preview comes out of the plan cache rather than being planned again.
+        """
         ui = adsk.core.Application.get().userInterface
         event_args = adsk.core.CommandEventArgs.cast(args)
         inputs = event_args.command.commandInputs
+        _graphics_preview.clear()
+
+        # A complete plan from the background planner is emitted as is, unless it was cut down to
+        # fit the preview time budget
+        result = _background_plans(inputs)
+        plans = result.plans if result is not None and result.complete and not result.error else None
+        if jitter_processor.is_degraded(plans):
+            plans = None
+        if _background_planner is not None:
+            _background_planner.cancel()
 
-        selected_curve = inputs.itemById('inputSelectedCurve').selection(0).entity
-        min_size = inputs.itemById('inputMinSize').value
-        max_size = inputs.itemById('inputMaxSize').value
-        recurse = inputs.itemById('inputRecurseOption').value
-        processor = jitter_processor.JitterProcessor(ui, selected_curve, min_size, max_size, recurse)
+        processor = _create_processor(ui, inputs)
         try:
-            processor.generate()
+            if _generate(processor, inputs, plans):
+                adsk.core.Application.get().log(_report(processor, inputs))
         except:
             if ui:
                 ui.messageBox(f'Failed:\n{traceback.format_exc()}')
@@ -108,8 +371,12 @@ class MyExecutePreviewHandler(adsk.core.CommandEventHandler):
     def notify(self, args):
         """
         This is run upon preview requests. We only build the preview when manually requested
-        on button push. Each preview request, re-generates the result from scratch (i.e. 
-        may look different on each request).
+        on button push. The layout is seeded, so a preview looks the same on each request until the
+        seed or another input changes, and its plan is cached for execute to replay.
+
+        A valid preview is marked as the final result, in which case Fusion keeps it on OK
+        rather than running execute again. A lightweight preview only shows the outline with
+        custom graphics, without touching the sketch, and leaves the real thing to execute.
         """
         ui = adsk.core.Application.get().userInterface
 
@@ -120,24 +387,121 @@ class MyExecutePreviewHandler(adsk.core.CommandEventHandler):
         event_args = adsk.core.CommandEventArgs.cast(args)
         inputs = event_args.command.commandInputs
         generate_preview = inputs.itemById('inputPreview').value
+        _graphics_preview.clear()
 
         if generate_preview:
-            selected_curve = inputs.itemById('inputSelectedCurve').selection(0).entity
-            min_size = inputs.itemById('inputMinSize').value
-            max_size = inputs.itemById('inputMaxSize').value
-            recurse = inputs.itemById('inputRecurseOption').value
-            processor = jitter_processor.JitterProcessor(ui, selected_curve, min_size, max_size, recurse)
+            plans = None
+            complete = True
+            if inputs.itemById('inputBackground').value and not _replaying(inputs):
+                # Only emit here, the planning happens in the background, see MyInputChangedHandler
+                planned = _background_plans(inputs)
+                if planned is None:
+                    inputs.itemById('inputReport').text = 'Planning...'
+                    return
+                if planned.error:
+                    ui.messageBox(f'Failed:\n{planned.error}')
+                    return
+                plans, complete = planned.plans, planned.complete
+
+            processor = _create_processor(ui, inputs, preview=True)
+            if inputs.itemById('inputGraphicsPreview').value:
+                try:
+                    _show_outlines(processor, inputs, plans)
+                except:
+                    if ui:
+                        ui.messageBox(f'Failed:\n{traceback.format_exc()}')
+                return
             try:
-                # if a valid callback, mark preview displayed
-                result = processor.generate()
-                event_args.isValidResult = result
+                # if a valid callback, mark preview displayed. The first cuts of a progressive
+                # plan aren't the final result, the rest are on their way, and neither is a plan
+                # cut down to fit the preview time budget.
+                result = _generate(processor, inputs, plans)
+                event_args.isValidResult = bool(result) and complete and not jitter_processor.is_degraded(
+                    processor.last_plans)
+                if result:
+                    inputs.itemById('inputReport').text = _report(processor, inputs)
             except:
                 if ui:
                     ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))  
 
+class MyInputChangedHandler(adsk.core.InputChangedEventHandler):
+    """Starts background planning when the inputs change."""
+    def __init__(self):
+        super().__init__()
+
+    def notify(self, args):
+        """
+        With "Plan in background" ticked, every change to the inputs (re)starts planning on a
+        worker thread, after a short debounce. Anything still being planned for earlier inputs is
+        cancelled. The curves are read here, on the main thread, and the plans come back through
+        MyPlanReadyHandler. The "Save plan" and "Load plan" buttons are handled here too.
+        """
+        ui = adsk.core.Application.get().userInterface
+        event_args = adsk.core.InputChangedEventArgs.cast(args)
+        if event_args.input.id in REPORT_INPUTS:
+            return
+        inputs = event_args.firingEvent.sender.commandInputs
+
+        try:
+            if event_args.input.id == 'inputSavePlan':
+                _save_plans(ui, inputs)
+                return
+            if event_args.input.id == 'inputLoadPlan':
+                _load_plans(ui, inputs)
+                return
+            if event_args.input.id == 'inputExport':
+                _export_outlines(ui, inputs)
+                return
+            _background_planner.cancel()
+            if not inputs.itemById('inputBackground').value or not inputs.itemById('inputPreview').value:
+                return
+            if _replaying(inputs):
+                return
+            if not inputs.itemById('inputSelectedCurve').selectionCount:
+                return
+            processor = _create_processor(ui, inputs, preview=True)
+            problem = processor.validate()
+            if problem:
+                inputs.itemById('inputReport').text = problem
+                return
+            processor.prepare()
+            _background_planner.request(processor, inputs.itemById('inputFirstCuts').value)
+            inputs.itemById('inputReport').text = 'Planning...'
+        except:
+            if ui:
+                ui.messageBox(f'Failed:\n{traceback.format_exc()}')
+
+class MyPlanReadyHandler(adsk.core.CustomEventHandler):
+    """Handles plans handed back by the background planner, on the main thread."""
+    def __init__(self):
+        super().__init__()
+
+    def notify(self, args):
+        """
+        Asks for the preview to be run again, which emits the plans that are now ready. Plans
+        for inputs that have changed since are ignored.
+        """
+        ui = adsk.core.Application.get().userInterface
+        event_args = adsk.core.CustomEventArgs.cast(args)
+        try:
+            if _command is not None and _background_planner.is_current(int(event_args.additionalInfo)):
+                _command.doExecutePreview()
+        except:
+            if ui:
+                ui.messageBox(f'Failed:\n{traceback.format_exc()}')
+
 class MyDestroyHandler(adsk.core.CommandEventHandler):
     """Handles the command destruction event."""
     def __init__(self):
         super().__init__()
     def notify(self, args: adsk.core.CommandEventArgs):
-        adsk.terminate() 
+        global _command
+        if _background_planner is not None:
+            _background_planner.cancel()
+        _graphics_preview.clear()
+        _command = None
+        adsk.core.Application.get().unregisterCustomEvent(PLAN_READY_EVENT)
+        # Only dev mode runs the add-in for the one command, see EdgeJitter.py. In production its
+        # button stays, and Fusion stops the add-in.
+        if DEV_MODE:
+            adsk.terminate() 
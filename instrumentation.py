@@ -0,0 +1,86 @@
+import json
+import os
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+# Where run records go, next to the add-in
+LOG_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'EdgeJitter.log.jsonl')
+# How big the log can get before it's moved aside to LOG_PATH + '.1', replacing the one there, so at
+# most about twice this is kept
+LOG_MAX_BYTES = 1024 * 1024
+
+
+class Instrumentation:
+    """
+    Collects the timings and counters of one jitter run.
+
+    Everything is plain dicts and perf_counter() calls, so it's cheap enough to always leave on.
+    A run is written out as one JSON object per line (JSON Lines), see write().
+    """
+
+    # ----- CONSTRUCTORS -----
+
+    def __init__(self):
+        self.started = time.time()
+        self.timings = defaultdict(float)
+        self.counters = Counter()
+        # Per shape module: how many were drawn, and the seconds spent drawing them
+        self.shapes = defaultdict(lambda: {'count': 0, 'seconds': 0.0})
+
+
+    # ----- METHODS -----
+
+    @contextmanager
+    def phase(self, name):
+        """Times the enclosed block, adding to the total time of the named phase."""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] += time.perf_counter() - start_time
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    def add_counts(self, counts):
+        self.counters.update(counts)
+
+    def shape_cost(self, shape, seconds):
+        cost = self.shapes[shape]
+        cost['count'] += 1
+        cost['seconds'] += seconds
+
+    def to_record(self, **extra):
+        """Returns the run as a JSON serializable dict, with any extra fields added."""
+        record = {
+            'started': self.started,
+            'timings': dict(self.timings),
+            'counters': dict(self.counters),
+            'shapes': {name: dict(cost) for name, cost in self.shapes.items()},
+        }
+        record.update(extra)
+        return record
+
+    def write(self, path=None, **extra):
+        """
+        Appends the run to the JSON Lines log at path, LOG_PATH by default. A log that has grown
+        past LOG_MAX_BYTES is rotated first. A log that can't be written is skipped rather than
+        failing the run.
+        """
+        path = path or LOG_PATH
+        try:
+            if os.path.isfile(path) and os.path.getsize(path) >= LOG_MAX_BYTES:
+                os.replace(path, path + '.1')
+            with open(path, 'a') as log:
+                log.write(json.dumps(self.to_record(**extra)) + '\n')
+        except OSError:
+            pass
+
+    def summary(self):
+        """Returns a short, human readable summary of the run."""
+        lines = [', '.join(f'{name} {seconds * 1000:.0f} ms' for name, seconds in self.timings.items())]
+        lines.append(', '.join(f'{name.replace("_", " ")} {count}' for name, count in sorted(self.counters.items())))
+        for name, cost in sorted(self.shapes.items()):
+            lines.append(f"{name}: {cost['count']} drawn in {cost['seconds'] * 1000:.0f} ms")
+        return '\n'.join(line for line in lines if line)
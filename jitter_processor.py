@@ -1,122 +1,699 @@
-import adsk.core
-import adsk.fusion
-from constants import Direction
+import math
 import random
-from utils import random_size
-from shapes.shape_factory import random_shape
+import time
+from curve_graph import CORNER_CLEARANCE, CurveGraph
+from curve_proxy import CurveProxy
+from export import write_outlines
+from emitter import PlanEmitter
+from geometry import EdgeFrame
+from instrumentation import Instrumentation
+from layout_score import score_plan
+from parallel import PlanJob, derive_seed, plan_best_edges, plan_edges
+from plan_cache import plan_cache, plan_key
+from plan_format import fit_plan, store_key
+from planner import BISECT
+from outline import iter_plan_outline
+from shapes.shape_factory import shape_drawers, shape_outline_drawers, shape_preview_templates, shape_specs
+from sketch_index import SketchPointIndex
+from stamp import congruent_groups, stamp, stamp_matrix, transform_point
+from utils import delete_constraints
+
+# The share of a preview's time budget that planning gets, the rest is left for drawing the cuts
+PLAN_BUDGET_SHARE = 0.25
+# The (cuts, seconds) a run is taken to have cost until a run of the same emission mode has been
+# timed. On the slow side of what Fusion takes, so the first preview doesn't overrun its budget.
+DEFAULT_EMISSION_COST = (100, 1.0)
+# The plan stat marking a plan cut down to fit a preview's time budget
+DEGRADED = 'degraded_by_preview_budget'
+
 
 class JitterProcessor:
 
+    # Seconds per emitted cut of the last immediate mode run, to compare batch runs against
+    _immediate_seconds_per_cut = None
+    # The (cuts, seconds) of the last run of each emission mode, to budget previews with
+    _emission_costs = {}
+
     # ----- CONSTRUCTORS -----
 
-    def __init__(self, ui, selected_curve, min_size, max_size=None, recurse=False):
+    def __init__(self, ui, selected_curves, min_size, max_size=None, recurse=False, point_index=None,
+                 batch=False, seed=None, workers=1, max_depth=None, max_cuts=None, time_budget=None,
+                 rebuild=False, plan_store=None, profile=False, density=None, total_cuts=None,
+                 preview_budget=None, outline=False, placement=BISECT, free_constraints=False,
+                 fix_geometry=False, stamp=False, candidates=1):
         self.ui = ui
-        self._selected_curve = selected_curve
+        # A single curve is still accepted, as a list of one
+        if not isinstance(selected_curves, (list, tuple)):
+            selected_curves = [selected_curves] if selected_curves else []
+        self._selected_curves = list(selected_curves)
         self._min_size = min_size
         self._max_size = self._min_size if not max_size else max_size
         self._recurse = recurse
-        self._sketch = self._selected_curve.parentSketch
-        self._dominant_axis = None
+        # How cuts are placed along each curve, see planner.plan_edge()
+        self._placement = placement
+        # Each curve's plan is the best of this many layouts, see parallel.plan_best_edges()
+        self._candidates = max(1, candidates)
+        # Per curve caps on the planner, see planner.iter_cuts()
+        self._max_depth = max_depth
+        self._max_cuts = max_cuts
+        self._time_budget = time_budget
+        # Caps on the whole run: the most cuts per cm of curve, and the most cuts over every curve
+        self._density = density
+        self._total_cuts = total_cuts
+        # The seconds a preview may take, planning and drawing, see _cut_caps(). Plans that had to
+        # be cut down to fit are marked as degraded, see is_degraded().
+        self._preview_budget = preview_budget
+        self._outline = outline
+        self._sketch = self._selected_curves[0].parentSketch if self._selected_curves else None
+        # (curve, frame) of every selected curve, and their entity tokens, see prepare()
+        self._edges = None
+        self._tokens = None
+        # Jitter connected curves as one profile, keeping cuts clear of their corners, see curve_graph.py
+        self._profile = profile
+        self._graph = None
+        # Only jitter one of each set of congruent curves, and copy it onto the rest, see stamp.py.
+        # The (curve, frame) of the curves to copy each of _edges onto, see _read_curves()
+        self._stamp = stamp
+        self._stamp_targets = None
+        # Seeded runs are repeatable, which is what lets their plans be cached and replayed
+        self._seed = seed
+        self._workers = workers
+        # Seeded plans are also kept here, when given, see plan_format.PlanStore
+        self._plan_store = plan_store
+        self._point_index = point_index
+        self._batch = batch
+        # Rebuild each curve in one pass instead of trimming it once per cut, see PlanEmitter
+        self._rebuild = rebuild
+        # Leave the jitter without the constraints Fusion adds to it, and/or fix it in place, so
+        # it doesn't weigh on the sketch solver, see _settle_constraints()
+        self._free_constraints = free_constraints
+        self._fix_geometry = fix_geometry
+        self.emission_report = None
+        self.last_plans = None
+        # Always on, see instrumentation.py
+        self.instrumentation = Instrumentation()
+        # Each curve's properties are only read from Fusion once per run, see curve_proxy.py
+        self._selected_curves = [CurveProxy.wrap(curve, self.instrumentation.counters)
+                                 for curve in self._selected_curves]
 
 
     # ----- METHODS -----
 
-    def _calculate_jitter_direction(self, start_point, end_point, cut_out_type):
-        shape_axis = 'y' if self._dominant_axis == 'x' else 'x'
-        line_pos = (getattr(start_point, shape_axis) + getattr(end_point, shape_axis)) / 2
-        farthest_distance = 0
-        farthest_point = None
-        for point in self._sketch.sketchPoints:
-            if point.isVisible:
-                pt = point.geometry
-                distance = abs(getattr(pt, shape_axis) - line_pos)
-                if distance > farthest_distance:
-                    farthest_distance = distance
-                    farthest_point = getattr(pt, shape_axis)
-        if not farthest_point:
-            # If no farther point found, consider using the origin
-            distance = abs(getattr(self._sketch.origin, shape_axis) - line_pos)
-            if distance != 0:
-                # Ok, we're using the origin!
-                farthest_point = getattr(self._sketch.origin, shape_axis)
-            else:
-                # No good on origin, because the line is intersecting the origin.
-                # We'll just make a "far" point
-                farthest_point = adsk.core.Point3D.create(
-                        self._sketch.origin.x + 1 if shape_axis == 'x' else 0,
-                        self._sketch.origin.y + 1 if shape_axis == 'y' else 0,
-                        self._sketch.origin.z)
-        
-        # Determine direction based on farthest point (simplified logic)
-        if shape_axis == 'x':
-            if cut_out_type == 'concave':
-                return Direction.POSITIVE_X if farthest_point >= start_point.x else Direction.NEGATIVE_X
-            else:
-                return Direction.NEGATIVE_X if farthest_point >= start_point.x else Direction.POSITIVE_X
+    def _calculate_jitter_sides(self, frame):
+        """
+        Returns the side of the frame to cut towards for each cut out type, 1 for its left-hand
+        side and -1 for its right: concave cuts go into the material, convex cuts go away from it.
+        """
+        inside = self._point_index.inside_side(frame)
+        return {
+            'concave': inside,
+            'convex': -inside,
+        }
+
+    def _read_curves(self):
+        self._edges = []
+        for curve in self._selected_curves:
+            self._edges.append((curve, EdgeFrame(curve.start_point, curve.end_point)))
+        if self._stamp:
+            # The first curve of each congruent group is jittered, the rest are stamped
+            groups = congruent_groups([frame for _, frame in self._edges])
+            self._stamp_targets = [[self._edges[i] for i in group[1:]] for group in groups]
+            self._edges = [self._edges[group[0]] for group in groups]
+
+    def prepare(self):
+        """
+        Reads everything plan() needs from the selected curves. Like the rest of the API, this
+        must run on Fusion's main thread, after which plan() can run on any thread.
+        """
+        self._read_curves()
+        self._tokens = [curve.entityToken for curve, _ in self._edges] if self._seed is not None else None
+        self._graph = CurveGraph(frame for _, frame in self._edges) if self._profile else None
+
+    def _corner_margins(self, shapes):
+        """
+        Returns the (start, end) margins of each selected curve to keep cuts out of, or None for
+        each when the curves aren't jittered as a profile.
+        """
+        if self._graph is None:
+            return [None] * len(self._edges)
+        max_height = self._max_size / 2 * max(shape.height_ratio for shape in shapes)
+        return self._graph.corner_margins(max_height, self._min_size * CORNER_CLEARANCE)
+
+    def plan(self, cancel=None, max_cuts=None):
+        """
+        Plans the jitter for the selected curves without touching the sketch.
+
+        Each curve is planned with its own seed, derived from the run's seed, so the plans are
+        the same whether they're made one after the other or on worker processes. Seeded plans
+        are cached, so asking again with the same curve, sizes, seed and shapes replays the same
+        plan. With a plan store, they're also kept on disk, for any curve of the same length.
+        When the curves are jittered as a profile, each is planned with margins around the
+        corners it shares with the others.
+
+        Parameters:
+            cancel (Event): Stops planning as soon as it's set, when given. Plans cut short this
+                            way aren't cached.
+            max_cuts (int): Caps the cuts per curve below the processor's own cap, when given.
+                            The largest-first plan of a seeded run with a cap is the start of the
+                            plan without it. The density, total and preview budget caps apply on
+                            top, see _cut_caps().
+
+        Returns:
+            list: The JitterPlan of each selected curve, in selection order.
+        """
+        if self._edges is None:
+            self.prepare()
+        max_cuts = _lowest(max_cuts, self._max_cuts)
+        shapes = tuple(shape_specs())
+        base_seed = self._seed if self._seed is not None else random.randrange(2**32)
+        margins = self._corner_margins(shapes)
+        caps, budget_caps = self._cut_caps(max_cuts)
+        budgets = self._time_budgets()
+
+        plans = [None] * len(self._edges)
+        missing = []
+        for i, (curve, frame) in enumerate(self._edges):
+            edge_seed = derive_seed(base_seed, i)
+            if self._tokens is not None:
+                # Plans are keyed on the run's own caps, so a preview's plan is reused on OK,
+                # unless it has more cuts than the preview budget affords
+                plans[i] = self._cached_plan(i, edge_seed, shapes, margins[i], caps[i])
+                if plans[i] is not None and budget_caps[i] is not None and len(plans[i]) > budget_caps[i]:
+                    plans[i] = None
+                if plans[i] is None and budget_caps[i] is not None:
+                    plans[i] = self._cached_plan(i, edge_seed, shapes, margins[i], budget_caps[i])
+            if plans[i] is None:
+                missing.append((i, edge_seed, PlanJob(frame.length, self._min_size, self._max_size, self._recurse,
+                                                      shapes, edge_seed, self._max_depth,
+                                                      _lowest(caps[i], budget_caps[i]), budgets[i], margins[i],
+                                                      self._placement)))
+
+        jobs = [job for _, _, job in missing]
+        if self._candidates > 1:
+            new_plans = plan_best_edges(jobs, self._candidates, self._workers, cancel)
         else:
-            if cut_out_type == 'concave':
-                return Direction.POSITIVE_Y if farthest_point >= start_point.y else Direction.NEGATIVE_Y
-            else:
-                return Direction.NEGATIVE_Y if farthest_point >= start_point.y else Direction.POSITIVE_Y
-
-
-    def _recursive_cut(self, selected_curve, start_point, end_point, min_size, max_size,
-                       recurse):
-        # if not selected_curve.isValid:
-        #     return None
-        cut_out_type = random.choice(['convex', 'concave'])
-        direction = self._calculate_jitter_direction(start_point, end_point, cut_out_type)
-        shape_creator = random_shape() # Randomly decide the type of cut to make
-        cut_size = random_size(min_size, max_size)
-        # Make sure the remaining pieces of the segment, to the left and right of the cut are
-        # proportionate to the cut size.
-        if not selected_curve or not selected_curve.isValid:
-            pass
-        if (selected_curve.length * .75) <= cut_size:
+            new_plans = plan_edges(jobs, self._workers, cancel)
+        cancelled = cancel is not None and cancel.is_set()
+        for (i, edge_seed, _), plan in zip(missing, new_plans):
+            plans[i] = plan
+            # A plan is only degraded if the preview budget is what stopped it. A plan that didn't
+            # run into the budget's cap is the very plan the run's own caps give, and is keyed so.
+            cap = caps[i]
+            if budget_caps[i] is not None and plan.stats['stopped_by_max_cuts']:
+                plan.stats[DEGRADED] = 1
+                cap = budget_caps[i]
+            # The preview's share of the time budget only binds when it's below the processor's own
+            timed_out = plan.stats['stopped_by_time_budget']
+            if timed_out and budgets[i] != self._time_budget:
+                plan.stats[DEGRADED] = 1
+            # A plan cut short by its time budget or cancelled isn't repeatable, so it isn't cached
+            if self._tokens is not None and not timed_out and not cancelled:
+                key, stored_key = self._plan_keys(i, edge_seed, shapes, margins[i], cap)
+                plan_cache.put(key, plan)
+                if stored_key is not None:
+                    self._plan_store.put(stored_key, plan)
+        return plans
+
+    def _plan_keys(self, index, seed, shapes, margins, cap):
+        """
+        Returns the plan cache key of a selected curve's plan, and its PlanStore key, or None
+        without a plan store.
+        """
+        frame = self._edges[index][1]
+        key = plan_key(self._tokens[index], frame.length, self._min_size, self._max_size, self._recurse, seed,
+                       shapes, self._max_depth, cap, margins, self._placement, self._candidates)
+        if self._plan_store is None:
+            return key, None
+        return key, store_key(frame.length, self._min_size, self._max_size, self._recurse, seed, shapes,
+                              self._max_depth, cap, margins, self._placement, self._candidates)
+
+    def _cached_plan(self, index, seed, shapes, margins, cap):
+        """Returns a selected curve's plan from the plan cache or the plan store, or None."""
+        key, stored_key = self._plan_keys(index, seed, shapes, margins, cap)
+        plan = plan_cache.get(key)
+        if plan is None and stored_key is not None:
+            plan = self._plan_store.get(stored_key)
+            if plan is not None:
+                plan_cache.put(key, plan)
+        return plan
+
+    def _cut_caps(self, max_cuts):
+        """
+        Returns the most cuts to plan on each selected curve: the lowest of max_cuts, the density
+        cap for the curve's length, and the curve's share of the total cap. For a preview, also
+        returns the lower cap the preview budget puts on each curve, or None where it doesn't.
+
+        The budget's cap is as many cuts as can be drawn in what's left of the preview budget
+        once planning has had its share, see _affordable_cuts(). Both totals are shared out
+        between the curves in proportion to their lengths, and each curve is planned largest gap
+        first, so a capped run still has its cuts spread evenly over the whole selection rather
+        than bunched at its start.
+
+        Returns:
+            tuple: The list of caps, and the list of the budget's caps.
+        """
+        lengths = [frame.length for _, frame in self._edges]
+        caps = [max_cuts] * len(lengths)
+        if self._density:
+            caps = [_lowest(cap, int(self._density * length)) for cap, length in zip(caps, lengths)]
+        if self._total_cuts:
+            caps = [_lowest(cap, share) for cap, share in zip(caps, _share_out(self._total_cuts, lengths))]
+        budget_caps = [None] * len(lengths)
+        if self._preview_budget:
+            affordable = self._affordable_cuts(self._preview_budget * (1 - PLAN_BUDGET_SHARE))
+            if affordable is not None:
+                budget_caps = [share if cap is None or share < cap else None
+                               for cap, share in zip(caps, _share_out(affordable, lengths))]
+        return caps, budget_caps
+
+    def _affordable_cuts(self, seconds):
+        """
+        Returns how many cuts can be drawn in the given seconds, going by the last run of the same
+        emission mode (DEFAULT_EMISSION_COST before there's been one).
+
+        Every cut adds geometry the next ones are trimmed against, so drawing gets slower per cut
+        as a run grows. To stay on the safe side, more cuts than the last run had are taken to cost
+        time with the square of their number, and fewer cuts in proportion to their number.
+        """
+        cuts, spent = JitterProcessor._emission_costs.get(self._emission_mode(), DEFAULT_EMISSION_COST)
+        if spent <= 0:
             return None
-        new_curves = shape_creator(selected_curve, start_point, end_point, self._dominant_axis, cut_size, direction)
-        if recurse:
-            i = 0
-            while i < len(new_curves):
-                curve = new_curves.item(i)
-                if not curve:
-                    pass
-                if not curve.isValid:
-                    new_curves.removeByIndex(i)
-                    continue
-                recursed_curves = self._recursive_cut(curve, curve.startSketchPoint.geometry, 
-                                                      curve.endSketchPoint.geometry, min_size, max_size, recurse)
-                i = i + 1 # work was done, increment the index
-                if recursed_curves:
-                    for recurse_curve in recursed_curves:
-                        if recurse_curve.isValid:
-                            new_curves.add(recurse_curve)
-        return new_curves
-    
-
-    def generate(self):
-        if self._selected_curve is None:
-            return
-        
+        if seconds >= spent:
+            return int(cuts * math.sqrt(seconds / spent))
+        return int(cuts * seconds / spent)
+
+    def _time_budgets(self):
+        """
+        Returns the planning time budget of each selected curve: the processor's own per curve
+        budget, and for a preview, the planning share of the preview budget split in proportion
+        to the curves' lengths.
+        """
+        if not self._preview_budget:
+            return [self._time_budget] * len(self._edges)
+        total_length = sum(frame.length for _, frame in self._edges)
+        return [_lowest(self._time_budget, self._preview_budget * PLAN_BUDGET_SHARE * frame.length / total_length)
+                for _, frame in self._edges]
+
+    def _emission_mode(self):
+        if self._outline:
+            return 'outline'
+        if self._rebuild:
+            return 'rebuild'
+        if self._graph is not None or self._profile:
+            return 'profile'
+        return 'batch' if self._batch else 'immediate'
+
+    def fit_plans(self, plans):
+        """
+        Fits saved plans to the selected curves. The plans are handed out to the curves in
+        selection order, starting over when there are more curves than plans, and each is fitted
+        to the length of its curve, see plan_format.fit_plan().
+
+        Returns:
+            list: The fitted JitterPlan of each selected curve, or None when they don't fit.
+        """
+        if not self._selected_curves or not plans:
+            return None
+        self.prepare()
+        try:
+            return [fit_plan(plans[i % len(plans)], frame.length) for i, (_, frame) in enumerate(self._edges)]
+        except ValueError as error:
+            self.ui.messageBox(str(error))
+            return None
+
+    def replay(self, plans):
+        """
+        Jitters the selected curves with saved plans, rather than planning them, see fit_plans().
+
+        Returns:
+            bool: Whether the curves were jittered.
+        """
+        fitted = self.fit_plans(plans)
+        return self.generate(fitted) if fitted is not None else False
+
+    def validate(self):
+        """
+        Checks the run's inputs, without telling the user about it.
+
+        Returns:
+            str: What's wrong with the inputs, or None when there's nothing wrong with them.
+        """
         if self._min_size is None or self._max_size is None:
-            self.ui.messageBox("Provide valid numeric input sizes.")
-            return False
+            return "Provide valid numeric input sizes."
         if self._min_size <= 0 or self._max_size >= 100 or self._min_size > self._max_size:
-            self.ui.messageBox("Ensure min < max and within valid range.")
-            return False
-        if self._max_size >= (self._selected_curve.length / 3):
+            return "Ensure min < max and within valid range."
+        if not self._selected_curves:
+            # Profiles are jittered along their lines only, so a profile of arcs, e.g. a circle, has none
+            return "Select at least one line. Selected profiles made only of arcs have no lines to jitter."
+        shortest_length = min(curve.length for curve in self._selected_curves)
+        if self._max_size >= (shortest_length / 3):
             # This is really important, not just for proportionality, but also because if we cut a segment
             # equal to, or longer than, 1/3rd of the original curve length, it will delete the original curve
             # and the transacation rollback of the preview command does _not_ undo that deletion! It's a bit
             # bananas.
-            self.ui.messageBox(f"Max cut must be less than 1/3rd of selected curve length ({self._selected_curve.length} cm).")
+            return f"Max cut must be less than 1/3rd of the shortest selected curve length ({shortest_length} cm)."
+        try:
+            shape_specs()
+        except RuntimeError:
+            return "Enable at least one shape with a weight above zero."
+        return self._mode_conflict()
+
+    def _mode_conflict(self):
+        """
+        Returns why the run's modes can't be combined, or None when they can. Unlike the rest of
+        validate(), this also applies to plans that were made elsewhere, e.g. replayed ones.
+        """
+        if self._stamp and self._profile:
+            # The corners of congruent curves can differ, and with them the corner margins
+            return "Stamping can't be combined with jittering a connected profile."
+        return None
+
+    def _plans_for_run(self, plans=None):
+        """
+        Checks the inputs, reads the curves and plans them, unless plans are given (see
+        generate()), and takes the sketch snapshot.
+
+        Returns:
+            list: The JitterPlan of each selected curve, or None when the inputs aren't valid.
+        """
+        problem = self.validate() if plans is None else self._mode_conflict()
+        if problem:
+            self.ui.messageBox(problem)
+            return None
+
+        instrumentation = self.instrumentation
+        with instrumentation.phase('read_curves'):
+            self.prepare()
+        if plans is None or len(plans) != len(self._edges):
+            with instrumentation.phase('plan'):
+                plans = self.plan()
+        self.last_plans = plans
+        for plan in plans:
+            instrumentation.add_counts(plan.stats)
+        if self._point_index is None:
+            # Snapshot the sketch once, the emitter keeps it up to date as it adds geometry
+            with instrumentation.phase('snapshot'):
+                self._point_index = SketchPointIndex.from_sketch(self._sketch)
+        return plans
+
+    def outlines(self, plans=None):
+        """
+        Works out the outline each selected curve would be jittered into, without changing the
+        sketch, for a preview that doesn't create any sketch geometry (see graphics_preview.py).
+
+        Parameters:
+            plans (list): The JitterPlans to outline, as for generate().
+
+        Returns:
+            list: The (x, y, z) sketch coordinates of each curve's outline, or None when the
+                inputs aren't valid.
+        """
+        if not self._selected_curves:
+            return None
+        plans = self._plans_for_run(plans)
+        if plans is None:
+            return None
+        start_time = time.perf_counter()
+        outlines = [list(outline) for outline in self._iter_outlines(plans)]
+        seconds = time.perf_counter() - start_time
+        self._record_cost(sum(len(plan) for plan in plans), seconds)
+        self.instrumentation.timings['outline'] += seconds
+        self.emission_report = f"Outlined {sum(len(plan) for plan in plans)} planned cuts in {seconds:.2f} s."
+        if self._candidates > 1:
+            self.emission_report += '\n' + self._report_layouts(plans)
+        return outlines
+
+    def export(self, filename, plans=None):
+        """
+        Writes the outline each selected curve would be jittered into to a DXF or SVG file,
+        without changing the sketch, see export.py. Outlines are worked out one curve at a time,
+        as the file is written, so no sketch geometry is made and memory stays bounded.
+
+        Parameters:
+            filename (str): The file to write, ending in .dxf or .svg.
+            plans (list): The JitterPlans to export, as for generate().
+
+        Returns:
+            bool: Whether the file was written.
+
+        Raises:
+            OSError: If the file can't be written.
+            ValueError: If the file isn't a DXF or SVG file.
+        """
+        if not self._selected_curves:
+            return False
+        plans = self._plans_for_run(plans)
+        if plans is None:
+            return False
+        start_time = time.perf_counter()
+        with self.instrumentation.phase('export'):
+            write_outlines(filename, self._iter_outlines(plans), self._outline_bounds(plans))
+        seconds = time.perf_counter() - start_time
+        self.emission_report = f"Exported {sum(len(plan) for plan in plans)} planned cuts to {filename} in {seconds:.2f} s."
+        return True
+
+    def _iter_outlines(self, plans):
+        """
+        Yields the outline of each selected curve, see outline.iter_plan_outline(), followed by
+        the outlines of the curves it's stamped onto, if any.
+        """
+        templates = shape_preview_templates()
+        for index, ((_, frame), plan) in enumerate(zip(self._edges, plans)):
+            outline = iter_plan_outline(plan, frame, self._calculate_jitter_sides(frame), templates)
+            targets = self._stamp_targets[index] if self._stamp_targets else ()
+            if not targets:
+                yield outline
+                continue
+            outline = list(outline)
+            yield outline
+            for _, target in targets:
+                matrix = stamp_matrix(frame, target, self._stamp_reversed(frame, target))
+                yield (transform_point(matrix, point) for point in outline)
+
+    def _outline_bounds(self, plans):
+        """
+        Returns the (min x, min y, max x, max y) sketch coordinates every outline is within: the
+        selected curves, grown by the height of the highest cut planned.
+        """
+        height = max((cut.height for plan in plans for cut in plan), default=0.0)
+        frames = [frame for _, frame in self._edges]
+        for targets in self._stamp_targets or ():
+            frames.extend(frame for _, frame in targets)
+        xs = [x for frame in frames for x in (frame.start[0], frame.end[0])]
+        ys = [y for frame in frames for y in (frame.start[1], frame.end[1])]
+        return min(xs) - height, min(ys) - height, max(xs) + height, max(ys) + height
+
+    def generate(self, plans=None):
+        """
+        Jitters the selected curves.
+
+        Parameters:
+            plans (list): The JitterPlans to emit, one per selected curve, when they've already
+                        been made, e.g. in the background or by replay(). The inputs were checked
+                        when they were made, so they aren't checked again. The curves are planned
+                        here otherwise.
+
+        Returns:
+            bool: Whether the curves were jittered.
+        """
+        if not self._selected_curves:
+            return
+
+        plans = self._plans_for_run(plans)
+        if plans is None:
             return False
 
-        sc_start_point = self._selected_curve.startSketchPoint.geometry
-        sc_end_point = self._selected_curve.endSketchPoint.geometry
-        self._dominant_axis = 'x' if \
-            abs(sc_end_point.x - sc_start_point.x) > abs(sc_end_point.y - sc_start_point.y) \
-                else 'y'
-        
-        self._recursive_cut(self._selected_curve, sc_start_point, sc_end_point, self._min_size, self._max_size, self._recurse)
+        instrumentation = self.instrumentation
+        drawers = shape_drawers()
+        outline_drawers = shape_outline_drawers()
+
+        settle = self._free_constraints or self._fix_geometry
+        constraints_before = self._sketch.geometricConstraints.count if settle else None
+        start_time = time.perf_counter()
+        emitters = []
+        for (curve, frame), plan in zip(self._edges, plans):
+            with instrumentation.phase('direction'):
+                sides = self._calculate_jitter_sides(frame)
+            emitters.append(PlanEmitter(curve, frame, sides, drawers, self._point_index, instrumentation,
+                                        outline_drawers))
+        if self._graph is not None:
+            emitted = self._emit_profile(emitters, plans)
+            counts = None
+        else:
+            counts = [emitter.emit(plan, self._batch, self._rebuild) for emitter, plan in zip(emitters, plans)]
+            emitted = sum(counts)
+        jitter_curves = [curve for emitter in emitters for curve in emitter.drawn_curves]
+        if self._stamp_targets:
+            with instrumentation.phase('stamp'):
+                jitter_curves.extend(self._stamp_curves(emitters, counts))
+        seconds = time.perf_counter() - start_time
+        instrumentation.timings['emit'] += seconds
+        instrumentation.count('cuts_emitted', emitted)
+        self._record_cost(emitted, seconds)
+        self.emission_report = self._report_emission(emitted, seconds)
+        if self._candidates > 1:
+            self.emission_report += '\n' + self._report_layouts(plans)
+        if self._graph is not None:
+            self.emission_report += '\n' + self._report_profile()
+        if self._stamp_targets:
+            self.emission_report += '\n' + self._report_stamp(counts)
+        if settle:
+            self.emission_report += '\n' + self._settle_constraints(jitter_curves, constraints_before)
+        instrumentation.write(curves=len(self._edges), batch=self._batch, rebuild=self._rebuild, seed=self._seed,
+                              min_size=self._min_size, max_size=self._max_size, recurse=self._recurse,
+                              profile=self._profile, placement=self._placement,
+                              free_constraints=self._free_constraints, fix_geometry=self._fix_geometry,
+                              stamp=self._stamp, candidates=self._candidates)
         return True
+
+    def _report_layouts(self, plans):
+        shape_count = len(shape_specs())
+        scores = [score_plan(plan, shape_count) for plan in plans]
+        means = [sum(values) / len(values) for values in zip(*scores)]
+        return (f"Picked each layout from {self._candidates} candidates, scoring {means[-1]:.2f} on average "
+                f"(uniformity {means[0]:.2f}, coverage {means[1]:.2f}, variety {means[2]:.2f}, "
+                f"spacing {means[3]:.2f}).")
+
+    def _stamp_reversed(self, master, target):
+        """
+        Returns whether the master has to be laid onto the target the other way round, for its
+        concave cuts to still go into the material, see stamp.stamp_matrix().
+        """
+        return self._point_index.inside_side(master) != self._point_index.inside_side(target)
+
+    def _stamp_curves(self, emitters, counts):
+        """
+        Copies each jittered curve onto its congruent curves, with one Sketch.copy() per curve,
+        with the sketch compute suspended.
+
+        Returns:
+            list: The copied curves.
+        """
+        copies = []
+        self._sketch.isComputeDeferred = True
+        try:
+            for (_, master), emitter, count, targets in zip(self._edges, emitters, counts, self._stamp_targets):
+                if not count or not targets:
+                    continue
+                curves, ends = emitter.result_curves()
+                for target_curve, target in targets:
+                    copies.extend(stamp(self._sketch, curves, ends, master, target_curve, target,
+                                        self._stamp_reversed(master, target)))
+                    self.instrumentation.count('curves_stamped')
+                    self.instrumentation.count('cuts_stamped', count)
+        finally:
+            self._sketch.isComputeDeferred = False
+        return copies
+
+    def _report_stamp(self, counts):
+        stamped = self.instrumentation.counters['curves_stamped']
+        return (f"Stamped {stamped} curves with copies of {sum(1 for count in counts if count)} jittered curves, "
+                f"{self.instrumentation.counters['cuts_stamped']} cuts in all.")
+
+    def _settle_constraints(self, curves, constraints_before):
+        """
+        Deletes the constraints Fusion added to the jitter's curves as they were drawn and trimmed
+        (horizontal and vertical lines, coincident trim points, ...), and fixes the curves in
+        place, as asked. Constraints on the rest of the sketch are left alone.
+
+        Returns:
+            str: The sketch's constraint count before and after the run, for the report.
+        """
+        instrumentation = self.instrumentation
+        curves = [curve for curve in curves if curve.isValid]
+        deleted = 0
+        with instrumentation.phase('constraints'):
+            if self._free_constraints:
+                deleted = delete_constraints(self._sketch, constraints_before, curves)
+            if self._fix_geometry:
+                for curve in curves:
+                    curve.isFixed = True
+        constraints_after = self._sketch.geometricConstraints.count
+        instrumentation.count('constraints_before', constraints_before)
+        instrumentation.count('constraints_after', constraints_after)
+        instrumentation.count('constraints_deleted', deleted)
+        if self._fix_geometry:
+            instrumentation.count('curves_fixed', len(curves))
+        report = (f"Sketch constraints: {constraints_before} before the run, {constraints_after} after "
+                  f"({deleted} removed from the jitter")
+        return report + (f", {len(curves)} curves fixed)." if self._fix_geometry else ").")
+
+    def _record_cost(self, cuts, seconds):
+        # Remembered for the preview budgets of later runs in the same mode, see _affordable_cuts()
+        if cuts:
+            JitterProcessor._emission_costs[self._emission_mode()] = (cuts, seconds)
+
+    def _emit_profile(self, emitters, plans):
+        """
+        Emits the plans of every curve of the profile in one batch: the sketch compute is
+        suspended once for the whole profile, every shape is drawn, the sketch is brought up to
+        date once, and then every curve is trimmed. Rebuilt curves are rebuilt one after the
+        other inside the same batch.
+
+        Returns:
+            int: The number of cuts actually emitted.
+        """
+        self._sketch.isComputeDeferred = True
+        try:
+            if self._rebuild:
+                return sum(emitter.emit_rebuild(plan) for emitter, plan in zip(emitters, plans))
+            pending = [emitter.draw_batch(plan) for emitter, plan in zip(emitters, plans)]
+            self._sketch.isComputeDeferred = False
+            self._sketch.isComputeDeferred = True
+            return sum(emitter.trim_batch(drawn) for emitter, drawn in zip(emitters, pending))
+        finally:
+            self._sketch.isComputeDeferred = False
+
+    def _report_profile(self):
+        chains = self._graph.chains()
+        closed = sum(1 for chain in chains if chain.closed)
+        return (f"Jittered {len(self._edges)} curves as {len(chains)} connected profiles ({closed} closed), "
+                f"keeping clear of {self._graph.corner_count()} corners.")
+
+    def _report_emission(self, emitted, seconds):
+        """
+        Describes how long emission took. Immediate runs are remembered, so that batch and rebuild
+        runs can report how much time they saved compared to them.
+        """
+        if not emitted:
+            return f"No cuts emitted ({seconds:.2f} s)."
+        # Profiles are always emitted in one batch, see _emit_profile()
+        if not self._batch and not self._rebuild and self._graph is None:
+            JitterProcessor._immediate_seconds_per_cut = seconds / emitted
+            return f"Emitted {emitted} cuts in {seconds:.2f} s."
+        mode = 'Rebuilt curves with' if self._rebuild else 'Batch emitted'
+        report = f"{mode} {emitted} cuts in {seconds:.2f} s"
+        if JitterProcessor._immediate_seconds_per_cut is None:
+            return report + " (run once without batch mode or rebuild to compare)."
+        saved = JitterProcessor._immediate_seconds_per_cut * emitted - seconds
+        return report + f", an estimated {abs(saved):.2f} s {'faster' if saved >= 0 else 'slower'} than immediate mode."
+
+
+def is_degraded(plans):
+    """
+    Returns whether any of the plans was cut down to fit a preview's time budget, in which case
+    the preview doesn't show the full jitter, and execute has to plan it again without one.
+    """
+    return any(plan.stats[DEGRADED] for plan in plans or ())
+
+
+def _lowest(*caps):
+    """Returns the lowest of the caps that are set, or None when none of them are."""
+    caps = [cap for cap in caps if cap is not None]
+    return min(caps) if caps else None
+
+
+def _share_out(total, lengths):
+    """
+    Shares total cuts out between curves in proportion to their lengths, handing the cuts left
+    over by rounding down to the curves that were rounded down the most.
+    """
+    length_sum = sum(lengths)
+    if not length_sum:
+        return [0] * len(lengths)
+    exact = [total * length / length_sum for length in lengths]
+    shares = [int(share) for share in exact]
+    by_remainder = sorted(range(len(lengths)), key=lambda i: shares[i] - exact[i])
+    for i in by_remainder[:total - sum(shares)]:
+        shares[i] += 1
+    return shares
@@ -0,0 +1,79 @@
+import math
+from typing import NamedTuple
+
+# How much each metric counts towards a layout's total score
+DEFAULT_WEIGHTS = {'uniformity': 1.0, 'coverage': 1.0, 'variety': 0.5, 'spacing': 1.0}
+
+
+class LayoutScore(NamedTuple):
+    """
+    How good a jitter layout looks, each metric from 0 (worst) to 1 (best).
+
+    Attributes:
+        uniformity (float): How evenly the bare stretches between cuts are spread, so neither
+                        clusters nor long bare stretches stand out.
+        coverage (float): How much of the edge is cut.
+        variety (float): How evenly the cuts are spread over the shapes they could have been.
+        spacing (float): How far apart the closest two cuts are, as a fraction of the min cut size.
+        total (float): The weighted mean of the metrics.
+    """
+    uniformity: float
+    coverage: float
+    variety: float
+    spacing: float
+    total: float
+
+
+def score_plan(plan, shape_count=None, weights=None):
+    """
+    Scores a plan's layout. The plan's cuts are only read once, in order along the edge, so
+    scoring costs next to nothing next to planning.
+
+    Parameters:
+        plan (JitterPlan): The plan to score.
+        shape_count (int): How many shapes the plan could pick from, which is what variety is
+                        measured against. Only the shapes the plan used count when not given.
+        weights (dict): How much each metric counts, keyed by metric name, see DEFAULT_WEIGHTS.
+
+    Returns:
+        LayoutScore: The plan's score, all 0 when it has no cuts.
+    """
+    if not len(plan):
+        return LayoutScore(0.0, 0.0, 0.0, 0.0, 0.0)
+    weights = DEFAULT_WEIGHTS if weights is None else weights
+    edge_length = plan.edge_length
+    gaps = []
+    shape_counts = {}
+    covered = 0.0
+    previous_end = 0.0
+    for cut in sorted(plan, key=lambda cut: cut.start):
+        gaps.append(cut.start - previous_end)
+        covered += cut.width
+        shape_counts[cut.shape] = shape_counts.get(cut.shape, 0) + 1
+        previous_end = cut.end
+    gaps.append(edge_length - previous_end)
+
+    # The coefficient of variation of the gaps, the spread relative to their size
+    mean = sum(gaps) / len(gaps)
+    deviation = math.sqrt(sum((gap - mean) ** 2 for gap in gaps) / len(gaps))
+    uniformity = 1.0 / (1.0 + deviation / mean) if mean > 0 else 0.0
+    coverage = min(1.0, covered / edge_length) if edge_length > 0 else 0.0
+    variety = _evenness(shape_counts.values(), shape_count or len(shape_counts))
+    # The gaps at the ends of the edge aren't between cuts
+    inner_gaps = gaps[1:-1]
+    spacing = min(1.0, max(0.0, min(inner_gaps)) / plan.min_size) if inner_gaps and plan.min_size else 1.0
+
+    metrics = {'uniformity': uniformity, 'coverage': coverage, 'variety': variety, 'spacing': spacing}
+    weight_sum = sum(weights.get(name, 0.0) for name in metrics)
+    total = sum(value * weights.get(name, 0.0) for name, value in metrics.items()) / weight_sum if weight_sum else 0.0
+    return LayoutScore(uniformity, coverage, variety, spacing, total)
+
+
+def _evenness(counts, categories):
+    # The entropy of the counts, relative to the most there could be over that many categories
+    counts = [count for count in counts if count]
+    if categories <= 1 or not counts:
+        return 1.0
+    total = sum(counts)
+    entropy = -sum(count / total * math.log(count / total) for count in counts)
+    return entropy / math.log(categories)
@@ -0,0 +1,60 @@
+import math
+from cut_index import CutIndex
+
+# How many straight pieces an arc is approximated with, where only straight lines will do
+ARC_SEGMENTS = 12
+
+
+def arc_points(half_width: float, height: float, segments=ARC_SEGMENTS):
+    """
+    Returns points along the circular arc through (-half_width, 0), (0, height) and
+    (half_width, 0), in cut-local (s, t) coordinates, the same arc SketchArcs.addByThreePoints()
+    draws through them.
+    """
+    # The arc's center is on the t axis, at the same distance from all three points
+    center = (height * height - half_width * half_width) / (2 * height)
+    radius = height - center
+    end_angle = math.atan2(-center, half_width)
+    start_angle = math.pi - end_angle
+    sweep = end_angle - start_angle
+    points = []
+    for i in range(segments + 1):
+        angle = start_angle + sweep * i / segments
+        points.append((radius * math.cos(angle), center + radius * math.sin(angle)))
+    return points
+
+
+def iter_plan_outline(plan, frame, sides, templates):
+    """
+    Yields the outline the plan jitters its edge into, as one strip of points from the start of
+    the edge to its end, without any adsk objects. Cuts that don't fit the edge are left out,
+    like the emitter would. Only one cut's points are worked out at a time.
+
+    Parameters:
+        plan (JitterPlan): The plan.
+        frame (EdgeFrame): The edge frame of the edge the plan is for.
+        sides (dict): The side of the frame to cut towards (1 or -1), keyed by cut out type.
+        templates (dict): Functions returning the outline of a shape as a strip of cut-local (s, t)
+                        points, given its half width and height, keyed by shape name.
+
+    Yields:
+        tuple: The (x, y, z) sketch coordinates of each point of the outline.
+    """
+    placed = CutIndex(frame.length)
+    yield frame.point_at(0.0)
+    for cut in sorted(plan, key=lambda cut: cut.start):
+        if placed.place(cut.start, cut.end) is not None:
+            continue
+        points = templates[cut.shape](round(cut.width / 2, 3), cut.height)
+        yield from frame.map_local(cut.center, sides[cut.cut_out_type], points)
+    yield frame.point_at(frame.length)
+
+
+def plan_outline(plan, frame, sides, templates):
+    """
+    Returns the outline the plan jitters its edge into, see iter_plan_outline().
+
+    Returns:
+        list: The (x, y, z) sketch coordinates of the outline.
+    """
+    return list(iter_plan_outline(plan, frame, sides, templates))
@@ -0,0 +1,159 @@
+import concurrent.futures
+import random
+from concurrent.futures.process import BrokenProcessPool
+from typing import NamedTuple
+from layout_score import score_plan
+from planner import BISECT, plan_edge
+
+# Below this many edges, or candidate layouts, starting up worker processes costs more than it saves.
+PARALLEL_MIN_JOBS = 8
+
+# How often a cancellable run on the worker processes checks whether it's been cancelled (s)
+CANCEL_POLL_SECONDS = 0.02
+
+_executor = None
+_executor_workers = 0
+
+
+class PlanJob(NamedTuple):
+    """Everything needed to plan one edge, as plain data that can cross a process boundary."""
+    edge_length: float
+    min_size: float
+    max_size: float
+    recurse: bool
+    shapes: tuple
+    seed: int
+    max_depth: int = None
+    max_cuts: int = None
+    time_budget: float = None
+    margins: tuple = None
+    placement: str = BISECT
+
+
+def derive_seed(seed: int, index: int):
+    """
+    Derives the seed of the index'th edge of a run from the run's seed, so each edge gets the
+    same layout whether the run is planned serially or in parallel.
+    """
+    return (seed * 1000003 + index * 7919 + 1) % (2**32)
+
+
+def _plan_job(job: PlanJob, cancel=None):
+    return plan_edge(job.edge_length, job.min_size, job.max_size, job.recurse, job.shapes,
+                     random.Random(job.seed), job.max_depth, job.max_cuts, job.time_budget, cancel=cancel,
+                     margins=job.margins, placement=job.placement)
+
+
+def _plan_and_score(job: PlanJob, cancel=None):
+    plan = _plan_job(job, cancel)
+    return score_plan(plan, len(job.shapes)).total, plan
+
+
+def candidate_jobs(job: PlanJob, candidates: int):
+    """
+    Returns the jobs planning the candidate layouts of an edge: the job itself, so the first
+    candidate is the layout the edge gets without a search, then the job with derived seeds.
+    Each candidate gets an equal share of the job's time budget, so the search as a whole keeps
+    to it however the candidates are spread over the workers.
+    """
+    if job.time_budget is not None:
+        job = job._replace(time_budget=job.time_budget / candidates)
+    return [job] + [job._replace(seed=derive_seed(job.seed, candidate)) for candidate in range(1, candidates)]
+
+
+def _get_executor(workers):
+    global _executor, _executor_workers
+    if _executor is None or _executor_workers != workers:
+        shutdown()
+        _executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        _executor_workers = workers
+    return _executor
+
+
+def plan_edges(jobs, workers=1, cancel=None):
+    """
+    Plans every job, on a pool of worker processes when there are enough of them.
+
+    Parameters:
+        jobs (list): The PlanJobs to plan.
+        workers (int): The number of worker processes to use, 1 plans in this process.
+        cancel (Event): Stops planning as soon as it's set, when given. Plans made in this
+                        process after it's set are cut short. An Event can't be handed to worker
+                        processes, so on the workers, the jobs that haven't finished when it's
+                        set are left to run out, and cut short plans made here instead.
+
+    Returns:
+        list: The JitterPlans, in the same order as the jobs.
+    """
+    return _map(_plan_job, jobs, workers, cancel)
+
+
+def plan_best_edges(jobs, candidates, workers=1, cancel=None):
+    """
+    Plans several candidate layouts for every job and keeps the best scoring one of each, see
+    layout_score.py. Candidates are scored where they're planned. The candidates of every edge are
+    planned as one batch, which goes to the worker processes like a run of as many edges would,
+    see plan_edges().
+
+    Parameters:
+        jobs (list): The PlanJobs to plan.
+        candidates (int): The number of layouts to pick each edge's plan from.
+        workers (int): As for plan_edges().
+        cancel (Event): As for plan_edges().
+
+    Returns:
+        list: The best plan of each job, in the same order as the jobs. Ties go to the earlier
+            candidate, so the search never does worse than planning the job on its own.
+    """
+    batch = [candidate for job in jobs for candidate in candidate_jobs(job, candidates)]
+    results = _map(_plan_and_score, batch, workers, cancel)
+    plans = []
+    for index in range(len(jobs)):
+        _, plan = max(results[index * candidates:(index + 1) * candidates], key=lambda result: result[0])
+        plan.stats['layout_candidates'] = candidates
+        plans.append(plan)
+    return plans
+
+
+def _map(function, jobs, workers, cancel):
+    if workers > 1 and len(jobs) >= PARALLEL_MIN_JOBS:
+        try:
+            if cancel is not None:
+                return _map_cancellable(_get_executor(workers), function, jobs, cancel)
+            chunk_size = max(1, len(jobs) // (workers * 4))
+            return list(_get_executor(workers).map(function, jobs, chunksize=chunk_size))
+        except (OSError, BrokenProcessPool):
+            # The pool couldn't be started, or a worker died. Plan here instead, the per edge seeds
+            # give the very same result. A worker that starts but never reports back isn't caught,
+            # which is why the add-in plans in this process unless asked not to.
+            shutdown()
+    if cancel is not None:
+        return [function(job, cancel) for job in jobs]
+    return [function(job) for job in jobs]
+
+
+def _map_cancellable(executor, function, jobs, cancel):
+    # Jobs are handed out one by one, so the ones not yet started can be dropped once cancelled
+    futures = [executor.submit(function, job) for job in jobs]
+    pending = set(futures)
+    while pending and not cancel.is_set():
+        _, pending = concurrent.futures.wait(pending, timeout=CANCEL_POLL_SECONDS,
+                                             return_when=concurrent.futures.FIRST_COMPLETED)
+    results = []
+    for future, job in zip(futures, jobs):
+        if future.done() and not future.cancelled():
+            results.append(future.result())
+        else:
+            # Cancelled, so this is cut short straight away
+            future.cancel()
+            results.append(function(job, cancel))
+    return results
+
+
+def shutdown():
+    """Stops the worker processes, if any were started."""
+    global _executor, _executor_workers
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        _executor_workers = 0
@@ -0,0 +1,72 @@
+import threading
+from collections import OrderedDict
+
+
+class PlanCache:
+    """
+    A small least-recently-used cache of JitterPlans.
+
+    Plans are keyed by everything that goes into making them (see plan_key()), so a plan that's
+    been previewed can be replayed on execute instead of being planned again. Background planning
+    fills the cache from a worker thread, so it's locked.
+    """
+
+    # ----- CONSTRUCTORS -----
+
+    def __init__(self, max_entries=16):
+        self._max_entries = max_entries
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    # ----- METHODS -----
+
+    def __len__(self):
+        return len(self._plans)
+
+    def get(self, key):
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+            return plan
+
+    def put(self, key, plan):
+        with self._lock:
+            self._plans[key] = plan
+            self._plans.move_to_end(key)
+            while len(self._plans) > self._max_entries:
+                self._plans.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
+
+
+def plan_key(entity_token, edge_length, min_size, max_size, recurse, seed, shapes, max_depth=None, max_cuts=None,
+             margins=None, placement=None, candidates=1):
+    """
+    Builds the cache key of a plan.
+
+    Parameters:
+        entity_token (str): The entityToken of the curve the plan is for.
+        edge_length (float): The length of the curve, which can change without its token changing.
+        min_size (float): The minimum cut size.
+        max_size (float): The maximum cut size.
+        recurse (bool): Whether the plan recurses.
+        seed (int): The seed the plan's random source was seeded with.
+        shapes (sequence): The ShapeSpecs the plan picks from.
+        max_depth (int): The plan's depth cap, if any.
+        max_cuts (int): The plan's cut count cap, if any.
+        margins (tuple): The plan's corner margins, if any.
+        placement (str): How the plan places its cuts, see planner.plan_edge().
+        candidates (int): How many layouts the plan was picked from, see parallel.plan_best_edges().
+
+    Returns:
+        tuple: A hashable key.
+    """
+    return (entity_token, round(edge_length, 3), min_size, max_size, bool(recurse), seed, tuple(shapes), max_depth,
+            max_cuts, margins, placement, candidates)
+
+
+plan_cache = PlanCache()
@@ -0,0 +1,263 @@
+import hashlib
+import json
+import os
+import struct
+from planner import BISECT, Cut, JitterPlan
+
+# Bumped whenever the layout of either format changes. Older versions are still read.
+# Version 2 added the plans' stats to the packed format.
+FORMAT_VERSION = 2
+BINARY_MAGIC = b'EJPL'
+BINARY_EXTENSION = '.ejplan'
+JSON_EXTENSION = '.json'
+
+# How much longer or shorter than its own edge a plan can be stretched onto, as a fraction
+MAX_STRETCH = 0.05
+
+# Where the on-disk plan cache lives, next to the add-in
+PLAN_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'plans')
+
+_HEADER = struct.Struct('<4sHI')
+_PLAN = struct.Struct('<dddBI')
+_CUT = struct.Struct('<dddHBH')
+
+
+def plan_to_dict(plan: JitterPlan):
+    """
+    Returns the plan as a JSON serializable dict. Cuts are kept in edge-local coordinates, and
+    their cut out type rather than a direction in the sketch, so the plan isn't tied to any edge.
+    """
+    return {
+        'edge_length': plan.edge_length,
+        'min_size': plan.min_size,
+        'max_size': plan.max_size,
+        'recurse': plan.recurse,
+        'cuts': [[cut.start, cut.end, cut.shape, cut.cut_out_type, cut.height, cut.depth] for cut in plan.cuts],
+        'stats': dict(plan.stats),
+    }
+
+
+def plan_from_dict(data):
+    plan = JitterPlan(data['edge_length'], data['min_size'], data['max_size'], data['recurse'])
+    plan.cuts = [Cut(*cut) for cut in data['cuts']]
+    plan.stats.update(data.get('stats', {}))
+    return plan
+
+
+def dumps_json(plans, **meta):
+    """
+    Returns the plans, and any extra metadata such as the seed, as a JSON document.
+    """
+    return json.dumps({'version': FORMAT_VERSION, 'meta': meta, 'plans': [plan_to_dict(plan) for plan in plans]})
+
+
+def loads_json(text):
+    """
+    Returns:
+        tuple: The plans, and the metadata they were saved with.
+
+    Raises:
+        ValueError: If the document isn't a plan, or is from a newer version of the add-in.
+    """
+    data = json.loads(text)
+    if not isinstance(data, dict) or 'plans' not in data:
+        raise ValueError("Not a jitter plan.")
+    _check_version(data.get('version'))
+    return [plan_from_dict(plan) for plan in data['plans']], data.get('meta', {})
+
+
+def dumps_binary(plans, **meta):
+    """
+    Returns the plans, and any extra metadata, packed with struct. At 24 bytes or so per cut,
+    this is a fraction of the size of the JSON for large plans, and quicker to read back.
+
+    The layout is a header (magic, version, number of plans), the metadata as length-prefixed
+    JSON, the shape and cut out type names as length-prefixed JSON, then each plan's edge length,
+    sizes, recurse flag and cut count, its stats as length-prefixed JSON (from version 2 on),
+    and its cuts.
+    """
+    names = sorted({cut.shape for plan in plans for cut in plan.cuts})
+    types = sorted({cut.cut_out_type for plan in plans for cut in plan.cuts})
+    name_index = {name: i for i, name in enumerate(names)}
+    type_index = {cut_out_type: i for i, cut_out_type in enumerate(types)}
+
+    chunks = [_HEADER.pack(BINARY_MAGIC, FORMAT_VERSION, len(plans))]
+    for blob in (json.dumps(meta), json.dumps([names, types])):
+        chunks.extend(_pack_blob(blob))
+    for plan in plans:
+        chunks.append(_PLAN.pack(plan.edge_length, plan.min_size, plan.max_size, bool(plan.recurse), len(plan.cuts)))
+        chunks.extend(_pack_blob(json.dumps(dict(plan.stats))))
+        chunks.extend(_CUT.pack(cut.start, cut.end, cut.height, name_index[cut.shape], type_index[cut.cut_out_type],
+                                cut.depth)
+                      for cut in plan.cuts)
+    return b''.join(chunks)
+
+
+def loads_binary(data: bytes):
+    """
+    Returns:
+        tuple: The plans, and the metadata they were saved with.
+
+    Raises:
+        ValueError: If the data isn't a plan, or is from a newer version of the add-in.
+    """
+    try:
+        magic, version, count = _HEADER.unpack_from(data, 0)
+    except struct.error:
+        raise ValueError("Not a jitter plan.")
+    if magic != BINARY_MAGIC:
+        raise ValueError("Not a jitter plan.")
+    _check_version(version)
+    offset = _HEADER.size
+    meta, offset = _unpack_blob(data, offset)
+    (names, types), offset = _unpack_blob(data, offset)
+
+    plans = []
+    for _ in range(count):
+        edge_length, min_size, max_size, recurse, cut_count = _PLAN.unpack_from(data, offset)
+        offset += _PLAN.size
+        plan = JitterPlan(edge_length, min_size, max_size, bool(recurse))
+        if version >= 2:
+            stats, offset = _unpack_blob(data, offset)
+            plan.stats.update(stats)
+        plan.cuts = [Cut(start, end, names[shape], types[cut_out_type], height, depth)
+                     for start, end, height, shape, cut_out_type, depth
+                     in _CUT.iter_unpack(data[offset:offset + cut_count * _CUT.size])]
+        offset += cut_count * _CUT.size
+        plans.append(plan)
+    return plans, meta
+
+
+def _pack_blob(blob):
+    encoded = blob.encode('utf-8')
+    return struct.pack('<I', len(encoded)), encoded
+
+
+def _unpack_blob(data, offset):
+    # Returns the length-prefixed JSON at offset, and the offset just after it
+    (length,) = struct.unpack_from('<I', data, offset)
+    offset += 4
+    return json.loads(data[offset:offset + length].decode('utf-8')), offset + length
+
+
+def _check_version(version):
+    if not isinstance(version, int) or version > FORMAT_VERSION:
+        raise ValueError(f"Unsupported jitter plan version ({version}), this add-in reads up to version {FORMAT_VERSION}.")
+
+
+def save_plans(path, plans, **meta):
+    """
+    Saves the plans to path, as JSON when it ends in .json and packed otherwise.
+    """
+    if path.lower().endswith(JSON_EXTENSION):
+        with open(path, 'w') as plan_file:
+            plan_file.write(dumps_json(plans, **meta))
+    else:
+        with open(path, 'wb') as plan_file:
+            plan_file.write(dumps_binary(plans, **meta))
+
+
+def load_plans(path):
+    """
+    Loads plans saved with save_plans().
+
+    Returns:
+        tuple: The plans, and the metadata they were saved with.
+
+    Raises:
+        ValueError: If the file isn't a plan, or is from a newer version of the add-in.
+    """
+    with open(path, 'rb') as plan_file:
+        data = plan_file.read()
+    if data.startswith(BINARY_MAGIC):
+        return loads_binary(data)
+    return loads_json(data.decode('utf-8'))
+
+
+def fit_plan(plan: JitterPlan, edge_length: float, max_stretch=MAX_STRETCH):
+    """
+    Fits a plan onto an edge of the given length, so it can be replayed there without planning.
+
+    A plan fits an edge of its own length as is. An edge up to max_stretch longer or shorter
+    gets the plan stretched evenly along it, widths and heights included, so the shapes keep
+    their proportions.
+
+    Returns:
+        JitterPlan: The plan, fitted to the edge.
+
+    Raises:
+        ValueError: If the edge is too much longer or shorter than the plan's.
+    """
+    scale = edge_length / plan.edge_length
+    if abs(scale - 1) > max_stretch:
+        raise ValueError(f"A plan for a {plan.edge_length:.3f} cm curve can't be replayed onto a "
+                         f"{edge_length:.3f} cm curve.")
+    if scale == 1:
+        return plan
+    fitted = JitterPlan(edge_length, plan.min_size * scale, plan.max_size * scale, plan.recurse)
+    fitted.cuts = [cut._replace(start=cut.start * scale, end=cut.end * scale, height=cut.height * scale)
+                   for cut in plan.cuts]
+    fitted.stats.update(plan.stats)
+    return fitted
+
+
+class PlanStore:
+    """
+    An on-disk cache of plans, one packed file per plan.
+
+    Unlike the in-memory plan cache, plans are keyed by the edge length rather than the curve
+    they were made for (see store_key()), so a seeded plan carries over to matching curves in
+    other designs, and to later Fusion sessions.
+    """
+
+    # ----- CONSTRUCTORS -----
+
+    def __init__(self, directory=None):
+        """
+        Parameters:
+            directory (str): Where to keep the plans, PLAN_DIR by default.
+        """
+        self._directory = directory or PLAN_DIR
+
+
+    # ----- METHODS -----
+
+    def _path(self, key):
+        return os.path.join(self._directory, key + BINARY_EXTENSION)
+
+    def get(self, key):
+        """Returns the stored plan, or None if there isn't one or it can't be read."""
+        try:
+            plans, _ = load_plans(self._path(key))
+        except (OSError, ValueError):
+            return None
+        return plans[0] if plans else None
+
+    def put(self, key, plan):
+        """Stores the plan. A plan that can't be written is skipped, the cache is only a cache."""
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            save_plans(self._path(key), [plan])
+        except OSError:
+            pass
+
+
+def store_key(edge_length, min_size, max_size, recurse, seed, shapes, max_depth=None, max_cuts=None,
+              margins=None, placement=BISECT, candidates=1):
+    """
+    Builds the PlanStore key of a plan, from the same inputs as plan_cache.plan_key() less the
+    curve's token, so it matches any curve of the same length, to the 0.001 cm cut widths are
+    rounded to.
+
+    Returns:
+        str: A key that's safe to use as a file name.
+    """
+    parts = (FORMAT_VERSION, round(edge_length, 3), min_size, max_size, bool(recurse), seed,
+             [tuple(shape) for shape in shapes], max_depth, max_cuts)
+    if margins is not None:
+        parts += (tuple(round(margin, 3) for margin in margins),)
+    if placement != BISECT:
+        parts += (placement,)
+    if candidates > 1:
+        parts += (('candidates', candidates),)
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
@@ -0,0 +1,332 @@
+import bisect
+import heapq
+import itertools
+import random
+import time
+from collections import Counter
+from typing import NamedTuple
+from cut_index import CutIndex
+from sampler import CutSampler
+
+# Orders the planner can work its queue of segments in
+LARGEST_FIRST = 'largest'
+BREADTH_FIRST = 'breadth'
+
+# Ways of placing cuts along the edge: centred on segments halved again and again (see
+# iter_cuts()), or scattered along the whole edge in one pass (see iter_scattered_cuts())
+BISECT = 'bisect'
+SCATTER = 'scatter'
+
+# The least gap a scattered cut keeps to its neighbours and the ends of the edge, as a fraction of
+# its width
+MIN_GAP_RATIO = 0.5
+# How much of the edge scattered cuts and their least gaps fill, the rest is scattered between them
+SCATTER_FILL = 0.85
+
+
+class Cut(NamedTuple):
+    """A single planned cut, in edge-local coordinates (cm along the edge)."""
+    start: float
+    end: float
+    shape: str
+    cut_out_type: str
+    height: float
+    depth: int = 0
+
+    @property
+    def width(self):
+        return self.end - self.start
+
+    @property
+    def center(self):
+        return (self.start + self.end) / 2
+
+
+class ShapeSpec(NamedTuple):
+    """What the planner needs to know about a shape, without importing its module."""
+    name: str
+    height_ratio: float
+    weight: float = 1.0
+
+
+class ShapePicker:
+    """
+    Picks shapes at random in proportion to their weights.
+
+    The cumulative weight table is built once, so each pick is a single random draw and a
+    bisect over a handful of entries.
+    """
+
+    # ----- CONSTRUCTORS -----
+
+    def __init__(self, shapes):
+        self._shapes = [shape for shape in shapes if shape.weight > 0]
+        if not self._shapes:
+            raise RuntimeError("No shapes to plan with.")
+        self._cumulative = list(itertools.accumulate(shape.weight for shape in self._shapes))
+        self._total = self._cumulative[-1]
+
+
+    # ----- METHODS -----
+
+    def pick(self, rng=random):
+        index = bisect.bisect_right(self._cumulative, rng.random() * self._total)
+        return self._shapes[min(index, len(self._shapes) - 1)]
+
+    def pick_many(self, count, rng=random):
+        if len(self._shapes) == 1:
+            return self._shapes * count
+        last = len(self._shapes) - 1
+        cumulative, total = self._cumulative, self._total
+        return [self._shapes[min(bisect.bisect_right(cumulative, rng.random() * total), last)]
+                for _ in range(count)]
+
+
+class JitterPlan:
+    """
+    The full jitter layout for one edge, with no adsk objects.
+
+    A plan only records where the cuts go along the edge and what they look like. It's up to
+    an emitter to turn it into sketch geometry.
+    """
+
+    # ----- CONSTRUCTORS -----
+
+    def __init__(self, edge_length, min_size, max_size, recurse):
+        self.edge_length = edge_length
+        self.min_size = min_size
+        self.max_size = max_size
+        self.recurse = recurse
+        self.cuts = []
+        # How many cuts were attempted, and why any were rejected, see iter_cuts()
+        self.stats = Counter()
+
+
+    # ----- METHODS -----
+
+    def __len__(self):
+        return len(self.cuts)
+
+    def __iter__(self):
+        return iter(self.cuts)
+
+
+def random_size(min_size: float, max_size: float, rng=random):
+    """
+    Generate a random size between min_size and max_size, rounded to the nearest 10% increment of max_size.
+
+    Parameters:
+        min_size (float): The minimum size.
+        max_size (float): The maximum size.
+        rng (Random): The random source to draw from, defaults to the random module.
+
+    Returns:
+        float: A random size between min_size and max_size, rounded to the nearest increment
+            where the increment is 10% of max_size.
+    """
+    step = 0.1 * max_size
+    value = rng.uniform(min_size, max_size)
+    return round(value / step) * step
+
+
+def plan_edge(edge_length: float, min_size: float, max_size: float, recurse: bool, shapes, rng=random,
+              max_depth=None, max_cuts=None, time_budget=None, order=LARGEST_FIRST, cancel=None, margins=None,
+              placement=BISECT):
+    """
+    Plans the jitter cuts for an edge of the given length.
+
+    Parameters:
+        edge_length (float): The length of the edge being jittered.
+        min_size (float): The minimum cut size.
+        max_size (float): The maximum cut size.
+        recurse (bool): Whether to keep cutting the pieces on either side of each cut.
+        shapes (sequence): The ShapeSpecs to pick shapes from, in proportion to their weights.
+        rng (Random): The random source to draw from, defaults to the random module.
+        max_depth, max_cuts, time_budget, order, cancel, margins: See iter_cuts().
+        placement (str): BISECT to plan with iter_cuts(), or SCATTER to plan with
+                        iter_scattered_cuts(), which has no use for max_depth or order.
+
+    Returns:
+        JitterPlan: The planned cuts, in the order they were made.
+    """
+    plan = JitterPlan(edge_length, min_size, max_size, recurse)
+    if placement == SCATTER:
+        cuts = iter_scattered_cuts(edge_length, min_size, max_size, recurse, ShapePicker(shapes), rng, max_cuts,
+                                   time_budget, plan.stats, cancel, margins)
+    else:
+        cuts = iter_cuts(edge_length, min_size, max_size, recurse, ShapePicker(shapes), rng, max_depth, max_cuts,
+                         time_budget, order, plan.stats, cancel, margins)
+    plan.cuts.extend(cuts)
+    return plan
+
+
+def iter_cuts(edge_length: float, min_size: float, max_size: float, recurse: bool, picker: ShapePicker,
+              rng=random, max_depth=None, max_cuts=None, time_budget=None, order=LARGEST_FIRST, stats=None,
+              cancel=None, margins=None):
+    """
+    Yields the jitter cuts for an edge of the given length, as they're made.
+
+    A cut is centered on its segment, and when recursing, the pieces left on either side of it
+    are queued to be cut in turn, until they are too short for the next cut. Every cut is checked
+    against the cuts already placed (see CutIndex), so cuts that would overlap, have no width or
+    leave a sliver of curve next to a neighbour are rejected here rather than in the sketch. The
+    queue is worked
+    either largest segment first, so a run that stops early still has its cuts spread evenly
+    along the edge, or breadth first, one depth at a time.
+
+    Parameters:
+        edge_length (float): The length of the edge being jittered.
+        min_size (float): The minimum cut size.
+        max_size (float): The maximum cut size.
+        recurse (bool): Whether to keep cutting the pieces on either side of each cut.
+        picker (ShapePicker): Picks the shape of each cut.
+        rng (Random): The random source to draw from, defaults to the random module.
+        max_depth (int): How many times a piece may be cut again, unlimited when None.
+        max_cuts (int): The most cuts to make, unlimited when None.
+        time_budget (float): The most seconds to spend, unlimited when None.
+        order (str): LARGEST_FIRST or BREADTH_FIRST.
+        stats (Counter): Counts the cuts attempted, rejected (by reason) and planned, and why
+                        planning stopped, when given.
+        cancel (Event): Stops planning as soon as it's set, when given. For planning on a thread,
+                        see background.py.
+        margins (tuple): The (start, end) lengths at either end of the edge to keep cuts out of,
+                        e.g. around the corners of a profile (see curve_graph.py), when given.
+
+    Yields:
+        Cut: Each cut, in the order they were made.
+    """
+    deadline = time.perf_counter() + time_budget if time_budget is not None else None
+    # Entries are (priority, sequence, segment start, segment end, depth). The sequence number
+    # keeps the order stable between segments of the same priority.
+    sequence = itertools.count()
+    start_margin, end_margin = margins or (0.0, 0.0)
+    queue = [(0, next(sequence), start_margin, edge_length - end_margin, 0)]
+    stats = stats if stats is not None else Counter()
+    samples = iter(CutSampler(min_size, max_size, picker, rng))
+    placed = CutIndex(edge_length)
+    # The margins are taken up front, so cuts near them fail the same checks as near other cuts
+    if start_margin > 0:
+        placed.add(0.0, start_margin)
+    if end_margin > 0:
+        placed.add(edge_length - end_margin, edge_length)
+    made = 0
+    while queue:
+        if max_cuts is not None and made >= max_cuts:
+            stats['stopped_by_max_cuts'] += 1
+            return
+        if deadline is not None and time.perf_counter() >= deadline:
+            stats['stopped_by_time_budget'] += 1
+            return
+        if cancel is not None and cancel.is_set():
+            stats['stopped_by_cancel'] += 1
+            return
+        _, _, seg_start, seg_end, depth = heapq.heappop(queue)
+        stats['cuts_attempted'] += 1
+
+        # Randomly decide the type, shape, size and height of cut to make
+        cut_out_type, shape, cut_size, height_fraction = next(samples)
+        # Make sure the remaining pieces of the segment, to the left and right of the cut are
+        # proportionate to the cut size.
+        if ((seg_end - seg_start) * .75) <= cut_size:
+            stats['cuts_rejected_too_long'] += 1
+            continue
+        center = (seg_start + seg_end) / 2
+        half_width = round(cut_size / 2, 3)
+        height = height_fraction * half_width * shape.height_ratio
+        reason = placed.place(center - half_width, center + half_width)
+        if reason is not None:
+            stats[f'cuts_rejected_{reason}'] += 1
+            continue
+        yield Cut(center - half_width, center + half_width, shape.name, cut_out_type, height, depth)
+        made += 1
+        stats['cuts_planned'] += 1
+
+        if recurse and (max_depth is None or depth < max_depth):
+            for piece_start, piece_end in ((seg_start, center - half_width), (center + half_width, seg_end)):
+                priority = -(piece_end - piece_start) if order == LARGEST_FIRST else depth + 1
+                heapq.heappush(queue, (priority, next(sequence), piece_start, piece_end, depth + 1))
+
+
+def iter_scattered_cuts(edge_length: float, min_size: float, max_size: float, recurse: bool, picker: ShapePicker,
+                        rng=random, max_cuts=None, time_budget=None, stats=None, cancel=None, margins=None,
+                        gap_ratio=MIN_GAP_RATIO, fill=SCATTER_FILL):
+    """
+    Yields jitter cuts scattered along an edge of the given length, in one pass.
+
+    Rather than halving the edge again and again, which lays the cuts out like the levels of a
+    binary tree, cuts are drawn one after the other until they, and the gaps they need, no longer
+    fit in the fill fraction of the edge. Each cut needs a gap of gap_ratio times its width to its neighbours and to the
+    ends of the edge. The room left over is then shared out at random: a sorted set of uniform
+    draws, one per cut, splits it into as many random extra gaps. That spreads the cuts like a
+    Poisson process with a minimum distance, evenly overall but without a regular pattern, in
+    O(n log n). Every cut is still checked against the ones already placed (see CutIndex).
+
+    Parameters:
+        edge_length, min_size, max_size, picker, rng, max_cuts, time_budget, stats, cancel,
+        margins: See iter_cuts(). Running out of time, or being cancelled, stops the drawing of
+                        cuts, and the cuts drawn so far are still scattered over the whole edge.
+        recurse (bool): Whether to fill the edge with cuts, or only make one.
+        gap_ratio (float): The least gap each cut keeps, as a fraction of its width.
+        fill (float): The fraction of the edge to fill with cuts and their least gaps, leaving the
+                        rest to scatter them with.
+
+    Yields:
+        Cut: Each cut, from the start of the edge to its end.
+    """
+    deadline = time.perf_counter() + time_budget if time_budget is not None else None
+    stats = stats if stats is not None else Counter()
+    start_margin, end_margin = margins or (0.0, 0.0)
+    usable = edge_length - start_margin - end_margin
+    samples = iter(CutSampler(min_size, max_size, picker, rng))
+
+    # Draw cuts until the next one doesn't fit. Entries are (spacing before the cut, half width,
+    # cut out type, shape, height fraction), where the spacing between two cuts is the larger of
+    # the gaps they need.
+    drawn = []
+    needed = 0.0
+    previous_gap = 0.0
+    while True:
+        if max_cuts is not None and len(drawn) >= max_cuts:
+            stats['stopped_by_max_cuts'] += 1
+            break
+        if deadline is not None and time.perf_counter() >= deadline:
+            stats['stopped_by_time_budget'] += 1
+            break
+        if cancel is not None and cancel.is_set():
+            stats['stopped_by_cancel'] += 1
+            break
+        stats['cuts_attempted'] += 1
+        cut_out_type, shape, cut_size, height_fraction = next(samples)
+        half_width = round(cut_size / 2, 3)
+        gap = gap_ratio * 2 * half_width
+        spacing = max(gap, previous_gap)
+        if needed + spacing + 2 * half_width + gap > usable * fill:
+            stats['cuts_rejected_too_long'] += 1
+            break
+        drawn.append((spacing, half_width, cut_out_type, shape, height_fraction))
+        needed += spacing + 2 * half_width
+        previous_gap = gap
+        if not recurse:
+            break
+
+    slack = usable - needed - previous_gap
+    offsets = sorted(rng.random() * slack for _ in drawn)
+    placed = CutIndex(edge_length)
+    if start_margin > 0:
+        placed.add(0.0, start_margin)
+    if end_margin > 0:
+        placed.add(edge_length - end_margin, edge_length)
+    # Where the cut would start with no slack at all, the slack before it is its offset
+    packed = start_margin
+    for (spacing, half_width, cut_out_type, shape, height_fraction), offset in zip(drawn, offsets):
+        packed += spacing
+        start = packed + offset
+        packed += 2 * half_width
+        center = start + half_width
+        reason = placed.place(center - half_width, center + half_width)
+        if reason is not None:
+            stats[f'cuts_rejected_{reason}'] += 1
+            continue
+        height = height_fraction * half_width * shape.height_ratio
+        yield Cut(center - half_width, center + half_width, shape.name, cut_out_type, height)
+        stats['cuts_planned'] += 1
@@ -0,0 +1,64 @@
+import random
+from constants import CUT_OUT_TYPES
+
+
+class CutSampler:
+    """
+    Draws the random parameters of cuts a block at a time.
+
+    Every cut needs a cut out type, a shape, a size and a height. Rather than making four
+    separate calls for each cut, the sampler draws a whole block of each in one go, quantizes
+    them in one pass, and hands them out one cut at a time. Blocks grow as they're used up, so
+    short runs don't over-draw and long runs don't refill often.
+
+    Sizes keep the semantics of planner.random_size(): uniform between min_size and max_size,
+    rounded to the nearest 10% of max_size. Heights are handed out as a fraction of the shape's
+    maximum height, uniform between 10% and 100% and rounded to the nearest 10%, which is what
+    random_size() gives for a range of 10% to 100% of that maximum.
+    """
+
+    # ----- CONSTRUCTORS -----
+
+    def __init__(self, min_size: float, max_size: float, picker, rng=random, block_size=64,
+                 max_block_size=4096):
+        """
+        Parameters:
+            min_size (float): The minimum cut size.
+            max_size (float): The maximum cut size.
+            picker (ShapePicker): Picks the shape of each cut.
+            rng (Random): The random source to draw from, defaults to the random module.
+            block_size (int): The size of the first block.
+            max_block_size (int): The size blocks stop growing at.
+        """
+        self._min_size = min_size
+        self._max_size = max_size
+        self._picker = picker
+        self._rng = rng
+        self._block_size = block_size
+        self._max_block_size = max_block_size
+
+
+    # ----- METHODS -----
+
+    def draw_block(self, count):
+        """
+        Draws the parameters of count cuts.
+
+        Returns:
+            list: (cut out type, ShapeSpec, cut size, height fraction) tuples.
+        """
+        rng = self._rng
+        step = 0.1 * self._max_size
+        low, span = self._min_size, self._max_size - self._min_size
+        types = [CUT_OUT_TYPES[int(rng.random() * len(CUT_OUT_TYPES))] for _ in range(count)]
+        shapes = self._picker.pick_many(count, rng)
+        sizes = [round((low + span * rng.random()) / step) * step for _ in range(count)]
+        heights = [round(1 + 9 * rng.random()) / 10 for _ in range(count)]
+        return list(zip(types, shapes, sizes, heights))
+
+    def __iter__(self):
+        """Yields cut parameters forever, see draw_block()."""
+        block_size = self._block_size
+        while True:
+            yield from self.draw_block(block_size)
+            block_size = min(block_size * 2, self._max_block_size)
@@ -1,52 +1,76 @@
-import adsk.core
+import functools
 import adsk.fusion
-from constants import Direction
+from geometry import EdgeFrame
+import outline
 import utils
 
-def create_shape(selected_curve: adsk.fusion.SketchCurve, start_point: adsk.core.Point3D, 
-                       end_point: adsk.core.Point3D, dominant_axis, cut_out_size: float, 
-                       direction: Direction):
+# An arc may be up to as tall as half its width, i.e. a true hemi-circle.
+HEIGHT_RATIO = 1
+
+@functools.lru_cache(maxsize=256)
+def template(half_width: float, height: float):
+    """
+    Returns the start, mid and end points of a hemi-circle cut out in cut-local (s, t)
+    coordinates, where s runs along the curve from the center of the cut and t runs away from
+    the curve.
+    """
+    return ((-half_width, 0.0), (0.0, height), (half_width, 0.0))
+
+@functools.lru_cache(maxsize=256)
+def preview_template(half_width: float, height: float):
+    """
+    Returns the hemi-circle as a strip of straight pieces in cut-local (s, t) coordinates, for
+    previews that can only draw lines.
+    """
+    return tuple(outline.arc_points(half_width, height))
+
+def draw_outline(sketch: adsk.fusion.Sketch, frame: EdgeFrame, center: float, cut_out_size: float,
+                 side: int, height: float, start: adsk.fusion.SketchPoint = None):
     """
-    Adds a hemi-circle cut out on the selectedLine in the given sketch based on the specified parameters.
+    Draws the outline of a hemi-circle cut out, from where the cut starts on the curve to where it
+    ends.
 
     Parameters:
-        selectedCurve (SketchCurve): The user-selected SketchCurve onto which a new cut will be added.
-        startPoint (Point3D): The starting point of the selectedCurve.
-        endPoint (Point3D): The ending point of the selectedCurve.
-        dominantAxis (str): The axis ('x' or 'y') that determines the direction of expansion.
-        cutOutSize (float): The total length of the cut along the dominant axis.
-        direction (Direction): The direction to make cut, this must not be along the dominant axis.
+        sketch (Sketch): The sketch to draw in.
+        frame (EdgeFrame): The edge frame of the curve.
+        center (float): Where the cut is centered, along the curve.
+        cut_out_size (float): The total length of the cut along the curve.
+        side (int): The side of the curve to cut towards, 1 for its left-hand side, -1 for its right.
+        height (float): How far the cut extends away from the curve.
+        start (SketchPoint): The point to start the outline from, so it joins on to what was
+                        drawn before it. A new point is made when not given.
 
     Returns:
-        ObjectCollection of SketchCurve objects: Returns the remaining selectedCurve parts after the
-        cut has been created and the original selectedCurve modified or trimmed accordingly.
+        tuple: The drawn curves, and the SketchPoint the outline ends on.
     """
+    arc_start_point, arc_mid_point, arc_end_point = utils.to_points(
+        frame.map_local(center, side, template(round(cut_out_size / 2, 3), height)))
+    newArc = sketch.sketchCurves.sketchArcs.addByThreePoints(start if start is not None else arc_start_point,
+                                                            arc_mid_point, arc_end_point)
+    return [newArc], utils.nearest_end(newArc, arc_end_point)
 
-    center_point = utils.calc_center_point(start_point, end_point)
+def draw_shape(sketch: adsk.fusion.Sketch, frame: EdgeFrame, center: float, cut_out_size: float,
+               side: int, height: float = None):
+    """
+    Draws a hemi-circle cut out for the given curve, without trimming the curve.
+
+    Parameters:
+        sketch (Sketch): The sketch to draw in.
+        frame (EdgeFrame): The edge frame of the curve.
+        center (float): Where the cut is centered, along the curve.
+        cut_out_size (float): The total length of the cut along the curve.
+        side (int): The side of the curve to cut towards, 1 for its left-hand side, -1 for its right.
+        height (float): How far the cut extends away from the curve. Randomized when not given.
+
+    Returns:
+        DrawnShape: The drawn curves, and the points to trim the curve between.
+    """
     arc_width_radius = round(cut_out_size / 2, 3)
-    arc_height_radius = utils.random_size(arc_width_radius * .1, arc_width_radius)
-
-    if direction in (Direction.POSITIVE_Y, Direction.NEGATIVE_X):
-        arc_start_point = adsk.core.Point3D.create(center_point.x + (arc_width_radius if dominant_axis=='x' else 0),
-                                      center_point.y + (arc_width_radius if dominant_axis=='y' else 0),
-                                      center_point.z)
-        arc_end_point = adsk.core.Point3D.create(center_point.x - (arc_width_radius if dominant_axis=='x' else 0),
-                                      center_point.y - (arc_width_radius if dominant_axis=='y' else 0),
-                                      center_point.z)
-        arc_mid_point = adsk.core.Point3D.create(center_point.x - (arc_height_radius if dominant_axis=='y' else 0),
-                                      center_point.y + (arc_height_radius if dominant_axis=='x' else 0),
-                                      center_point.z)
-    else:
-        arc_start_point = adsk.core.Point3D.create(center_point.x - (arc_width_radius if dominant_axis=='x' else 0),
-                                      center_point.y - (arc_width_radius if dominant_axis=='y' else 0),
-                                      center_point.z)
-        arc_end_point = adsk.core.Point3D.create(center_point.x + (arc_width_radius if dominant_axis=='x' else 0),
-                                      center_point.y + (arc_width_radius if dominant_axis=='y' else 0),
-                                      center_point.z)
-        arc_mid_point = adsk.core.Point3D.create(center_point.x + (arc_height_radius if dominant_axis=='y' else 0),
-                                      center_point.y - (arc_height_radius if dominant_axis=='x' else 0),
-                                      center_point.z)
-
-    sketch = selected_curve.parentSketch
+    arc_height_radius = height if height is not None else \
+        utils.random_size(arc_width_radius * .1, arc_width_radius)
+
+    # Not through draw_outline(), which also has to work out which end of the arc is which
+    arc_start_point, arc_mid_point, arc_end_point = utils.to_points(
+        frame.map_local(center, side, template(arc_width_radius, arc_height_radius)))
     newArc = sketch.sketchCurves.sketchArcs.addByThreePoints(arc_start_point, arc_mid_point, arc_end_point)
-    return utils.clean_selected_curve(selected_curve, newArc)
+    return utils.DrawnShape(arc_start_point, arc_end_point, [newArc], [])
@@ -1,60 +1,64 @@
-import adsk.core
+import functools
 import adsk.fusion
-from constants import Direction
+from geometry import EdgeFrame
 import utils
 
-def create_shape(selected_curve: adsk.fusion.SketchCurve, start_point: adsk.core.Point3D, 
-                       end_point: adsk.core.Point3D, dominant_axis, cut_out_size: float, 
-                       direction: Direction):
+# A rectangle may be up to as tall as it is wide.
+HEIGHT_RATIO = 2
+
+@functools.lru_cache(maxsize=256)
+def template(half_width: float, height: float):
+    """
+    Returns the outline of a rectangle cut out in cut-local (s, t) coordinates, where s runs along
+    the curve from the center of the cut and t runs away from the curve. Cut sizes are quantized,
+    so a run only ever needs a handful of these.
+    """
+    return ((-half_width, 0.0), (-half_width, height), (half_width, height), (half_width, 0.0))
+
+def draw_outline(sketch: adsk.fusion.Sketch, frame: EdgeFrame, center: float, cut_out_size: float,
+                 side: int, height: float, start: adsk.fusion.SketchPoint = None):
+    """
+    Draws the outline of a rectangle cut out, from where the cut starts on the curve to where it ends.
+
+    Parameters:
+        sketch (Sketch): The sketch to draw in.
+        frame (EdgeFrame): The edge frame of the curve.
+        center (float): Where the cut is centered, along the curve.
+        cut_out_size (float): The total length of the cut along the curve.
+        side (int): The side of the curve to cut towards, 1 for its left-hand side, -1 for its right.
+        height (float): How far the cut extends away from the curve.
+        start (SketchPoint): The point to start the outline from, so it joins on to what was
+                        drawn before it. A new point is made when not given.
+
+    Returns:
+        tuple: The drawn curves, and the SketchPoint the outline ends on.
     """
-    Adds a rectangle cut out on the selectedCurve in the given sketch based on the specified parameters.
+    # The side on the curve is left open, the trim or the rest of the chain takes care of it
+    corners = frame.map_local(center, side, template(round(cut_out_size / 2, 3), height))
+    new_lines = utils.draw_polyline(sketch, corners, start)
+    return new_lines, new_lines[-1].endSketchPoint
+
+def draw_shape(sketch: adsk.fusion.Sketch, frame: EdgeFrame, center: float, cut_out_size: float,
+               side: int, height: float = None):
+    """
+    Draws a rectangle cut out for the given curve, without trimming the curve.
 
     Parameters:
-        selectedCurve (SketchCurve): The user-selected SketchCurve onto which a new cut will be added.
-        startPoint (Point3D): The starting point of the selectedCurve.
-        endPoint (Point3D): The ending point of the selectedCurve.
-        dominantAxis (str): The axis ('x' or 'y') that determines the direction of expansion.
-        cutOutSize (float): The total length of the cut along the dominant axis.
-        direction (Direction): The direction to make cut, this must not be along the dominant axis.
+        sketch (Sketch): The sketch to draw in.
+        frame (EdgeFrame): The edge frame of the curve.
+        center (float): Where the cut is centered, along the curve.
+        cut_out_size (float): The total length of the cut along the curve.
+        side (int): The side of the curve to cut towards, 1 for its left-hand side, -1 for its right.
+        height (float): How far the cut extends away from the curve. Randomized when not given.
 
     Returns:
-        ObjectCollection of SketchCurve objects: Returns the remaining selectedCurve parts after the
-        cut has been created and the original selectedCurve modified or trimmed accordingly.
+        DrawnShape: The drawn curves, and the points to trim the curve between.
     """
-    center_point = utils.calc_center_point(start_point, end_point)
     width_delta = round(cut_out_size / 2, 3)
-    height_delta = utils.random_size(width_delta * .1, width_delta)
-
-    if direction is Direction.POSITIVE_X:
-        rect_start = adsk.core.Point3D.create(center_point.x + 2*height_delta, center_point.y - width_delta, 0)
-        rect_end   = adsk.core.Point3D.create(center_point.x, center_point.y + width_delta, 0)
-    elif direction is Direction.NEGATIVE_X:
-        rect_start = adsk.core.Point3D.create(center_point.x, center_point.y - width_delta, 0)
-        rect_end   = adsk.core.Point3D.create(center_point.x - 2*height_delta, center_point.y + width_delta, 0)
-    elif direction is Direction.POSITIVE_Y:
-        rect_start = adsk.core.Point3D.create(center_point.x - width_delta, center_point.y + 2*height_delta, 0)
-        rect_end   = adsk.core.Point3D.create(center_point.x + width_delta, center_point.y, 0)
-    elif direction is Direction.NEGATIVE_Y:
-        rect_start = adsk.core.Point3D.create(center_point.x - width_delta, center_point.y, 0)
-        rect_end   = adsk.core.Point3D.create(center_point.x + width_delta, center_point.y - 2*height_delta, 0)
-    else:
-        raise ValueError("Invalid direction.")
-
-    sketch = selected_curve.parentSketch
-    new_rect = sketch.sketchCurves.sketchLines.addTwoPointRectangle(rect_start, rect_end)
-    new_rect_line = None
-    for line in new_rect:
-        ls = line.startSketchPoint.geometry
-        le = line.endSketchPoint.geometry
-        axis = 'x' if abs(le.x - ls.x) > abs(le.y - ls.y) else 'y'
-        non_dominant_axis = 'y' if axis == 'x' else 'x'
-        if axis == dominant_axis and getattr(ls, non_dominant_axis) == getattr(start_point, non_dominant_axis):
-            new_rect_line = line
-            break
-
-    if new_rect_line is None:
-        raise ValueError("Illegal state, can't find newRectLine.")
-    
-    result = utils.clean_selected_curve(selected_curve, new_rect_line)
-    new_rect_line.deleteMe()
-    return result
+    if height is None:
+        height = 2 * utils.random_size(width_delta * .1, width_delta)
+
+    new_lines, _ = draw_outline(sketch, frame, center, cut_out_size, side, height)
+    return utils.DrawnShape(*utils.to_points((frame.point_at(center - width_delta),
+                                              frame.point_at(center + width_delta))),
+                            new_lines, [])
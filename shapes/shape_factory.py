@@ -1,37 +1,178 @@
 import pkgutil
 import importlib
-import random
-
-def _get_shape_creators():
-    shape_creators = []
-    # Import the current package (i.e., shapes) so we can iterate its modules.
-    import shapes  
-    for loader, module_name, is_pkg in pkgutil.iter_modules(shapes.__path__):
-        # Skip the factory module if present
-        if module_name == 'shape_factory':
-            continue
-        module = importlib.import_module(f'shapes.{module_name}')
-        # Each shape module should define a standard creation function, e.g. "create_shape"
-        if hasattr(module, 'create_shape'):
-            shape_creators.append(module.create_shape)
-    return shape_creators
-
-def random_shape():
-    """
-    Dynamically discovers and returns a random shape creation function from the shapes package.
-
-    This function searches the modules in the 'shapes' package for functions named 'create_shape',
-    which are expected to implement shape creation logic. It then selects one of these functions at random
-    and returns it.
-
-    Returns:
-        Callable: A shape creation function with the signature:
-                  create_shape(sketch, selectedCurve, startPoint, endPoint, dominantAxis, cutOutSize, direction)
+from collections.abc import Mapping
+from planner import ShapeSpec
+
+# The weight of a shape that hasn't been given one, and whose module doesn't set WEIGHT
+DEFAULT_WEIGHT = 1
+
+
+class ShapeRegistry:
+    """
+    Discovers the shape modules of the shapes package once and caches them.
+
+    Every public module of the shapes package, other than this one, is taken for a shape module,
+    which defines the standard drawing function "draw_shape". Shape modules are found by name
+    only, and each is only imported the first time it's used, e.g. when it's enabled for a run. A
+    module that turns out not to define draw_shape once imported is dropped from the shapes. Each
+    shape also carries a selection weight and an enabled flag, which the command dialog can
+    change. The cache is only dropped through invalidate(). The dev reload in EdgeJitter.py
+    reloads this module instead, which starts a new registry.
+    """
+
+    # ----- CONSTRUCTORS -----
+
+    def __init__(self):
+        self._names = None
+        self._modules = {}
+        self._weights = {}
+        self._enabled = {}
+
+
+    # ----- METHODS -----
+
+    def _get_shape_names(self):
+        if self._names is None:
+            # Import the current package (i.e., shapes) so we can iterate its modules.
+            import shapes
+            self._names = [module_name for loader, module_name, is_pkg in pkgutil.iter_modules(shapes.__path__)
+                           if module_name != 'shape_factory' and not module_name.startswith('_')]
+        return self._names
+
+    def _get_module(self, name):
+        module = self._modules.get(name)
+        if module is None:
+            if name not in self._get_shape_names():
+                raise KeyError(f"Unknown shape: {name}.")
+            module = importlib.import_module(f'shapes.{name}')
+            if not hasattr(module, 'draw_shape'):
+                self._names.remove(name)
+                raise KeyError(f"Not a shape module: {name}.")
+            self._modules[name] = module
+        return module
+
+    def invalidate(self):
+        """
+        Drops the cached shape modules so they're re-discovered on next use. Weights and enabled
+        flags are kept for any shape that's still around.
+        """
+        self._names = None
+        self._modules = {}
+
+    def names(self):
+        return list(self._get_shape_names())
+
+    def loaded_names(self):
+        """Returns the names of the shape modules that have been imported so far."""
+        return list(self._modules)
+
+    def weight(self, name):
+        """
+        Returns the shape's weight, as set, or else its module's WEIGHT. A module that hasn't been
+        imported yet isn't imported just for its WEIGHT, DEFAULT_WEIGHT stands in until it is.
+        """
+        if name in self._weights:
+            return self._weights[name]
+        return getattr(self._modules.get(name), 'WEIGHT', DEFAULT_WEIGHT)
+
+    def is_enabled(self, name):
+        return self._enabled.get(name, True)
+
+    def set_weight(self, name, weight: float):
+        if weight < 0:
+            raise ValueError(f"Shape weight must not be negative ({name}: {weight}).")
+        self._weights[name] = weight
+
+    def set_enabled(self, name, enabled: bool):
+        self._enabled[name] = enabled
+
+    def specs(self):
+        """
+        Returns the ShapeSpecs of every enabled shape with a positive weight, for the planner.
+
+        Raises:
+            RuntimeError: If no shape modules are found, or none are enabled.
+        """
+        specs = []
+        for name in list(self._get_shape_names()):
+            if not self.is_enabled(name):
+                continue
+            try:
+                module = self._get_module(name)
+            except KeyError:
+                continue
+            if self.weight(name) > 0:
+                specs.append(ShapeSpec(name, getattr(module, 'HEIGHT_RATIO', 1), self.weight(name)))
+        if not specs:
+            raise RuntimeError("No shape modules found in shapes package, or none are enabled.")
+        return specs
+
+    def drawers(self):
+        return _ShapeFunctions(self, 'draw_shape')
+
+    def preview_templates(self):
+        """
+        Returns each shape's outline as a strip of points, for previews that can only draw lines.
+        Shapes made of lines only don't need a separate preview_template(), their template() is it.
+        """
+        return _ShapeFunctions(self, 'preview_template', 'template')
+
+    def outline_drawers(self):
+        return _ShapeFunctions(self, 'draw_outline')
+
+
+class _ShapeFunctions(Mapping):
+    """
+    A read-only mapping of shape name to one of the shape module's functions, which only imports
+    a shape module when its function is looked up.
+    """
+
+    def __init__(self, shape_registry, attribute, fallback=None):
+        self._registry = shape_registry
+        self._attribute = attribute
+        self._fallback = fallback
+
+    def __getitem__(self, name):
+        module = self._registry._get_module(name)
+        if self._fallback is not None and not hasattr(module, self._attribute):
+            return getattr(module, self._fallback)
+        return getattr(module, self._attribute)
+
+    def __iter__(self):
+        return iter(self._registry.names())
+
+    def __len__(self):
+        return len(self._registry.names())
+
+
+registry = ShapeRegistry()
+
+
+def shape_specs():
+    """
+    Returns the ShapeSpecs of the enabled shapes in the shapes package, for the planner.
 
     Raises:
-        RuntimeError: If no shape creation functions are found in the shapes package.
+        RuntimeError: If no shape modules are found in the shapes package, or none are enabled.
+    """
+    return registry.specs()
+
+def shape_drawers():
+    """
+    Returns the shape drawing functions of the shapes package, keyed by shape module name. These
+    draw a shape without trimming the curve it's drawn on.
+    """
+    return registry.drawers()
+
+def shape_outline_drawers():
+    """
+    Returns the shape outline drawing functions of the shapes package, keyed by shape module name.
+    These draw a shape's outline onto the end of a chain of curves, see PlanEmitter.emit_rebuild().
+    """
+    return registry.outline_drawers()
+
+def shape_preview_templates():
+    """
+    Returns each shape's outline as a strip of cut-local points, keyed by shape module name.
     """
-    creators = _get_shape_creators()
-    if not creators:
-        raise RuntimeError("No shape creation functions found in shapes package.")
-    return random.choice(creators)
+    return registry.preview_templates()
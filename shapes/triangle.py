@@ -1,55 +1,64 @@
-import adsk.core
+import functools
 import adsk.fusion
-from constants import Direction
+from geometry import EdgeFrame
 import math
 import utils
 
-def create_shape(selected_curve: adsk.fusion.SketchCurve, start_point: adsk.core.Point3D, 
-                       end_point: adsk.core.Point3D, dominant_axis, cut_out_size: float, 
-                       direction: Direction):
+# A triangle may be up to as tall as a proper equilateral triangle.
+HEIGHT_RATIO = math.sqrt(3)
+
+@functools.lru_cache(maxsize=256)
+def template(half_width: float, height: float):
+    """
+    Returns the outline of a triangular cut out in cut-local (s, t) coordinates, where s runs
+    along the curve from the center of the cut and t runs away from the curve.
+    """
+    return ((-half_width, 0.0), (0.0, height), (half_width, 0.0))
+
+def draw_outline(sketch: adsk.fusion.Sketch, frame: EdgeFrame, center: float, cut_out_size: float,
+                 side: int, height: float, start: adsk.fusion.SketchPoint = None):
     """
-    Adds a triangular cut out on the selectedLine in the given sketch based on the specified parameters.
+    Draws the outline of a triangular cut out, from where the cut starts on the curve to where it ends.
 
     Parameters:
-        selectedCurve (SketchCurve): The user-selected SketchCurve onto which a new cut will be added.
-        startPoint (Point3D): The starting point of the selectedCurve.
-        endPoint (Point3D): The ending point of the selectedCurve.
-        dominantAxis (str): The axis ('x' or 'y') that determines the direction of expansion.
-        cutOutSize (float): The total length of the cut along the dominant axis.
-        direction (Direction): The direction to make cut, this must not be along the dominant axis.
+        sketch (Sketch): The sketch to draw in.
+        frame (EdgeFrame): The edge frame of the curve.
+        center (float): Where the cut is centered, along the curve.
+        cut_out_size (float): The total length of the cut along the curve.
+        side (int): The side of the curve to cut towards, 1 for its left-hand side, -1 for its right.
+        height (float): How far the cut extends away from the curve.
+        start (SketchPoint): The point to start the outline from, so it joins on to what was
+                        drawn before it. A new point is made when not given.
 
     Returns:
-        ObjectCollection of SketchCurve objects: Returns the remaining selectedCurve parts after the
-        cut has been created and the original selectedCurve modified or trimmed accordingly.
+        tuple: The drawn curves, and the SketchPoint the outline ends on.
+    """
+    points = frame.map_local(center, side, template(round(cut_out_size / 2, 3), height))
+    new_lines = utils.draw_polyline(sketch, points, start)
+    return new_lines, new_lines[-1].endSketchPoint
+
+def draw_shape(sketch: adsk.fusion.Sketch, frame: EdgeFrame, center: float, cut_out_size: float,
+               side: int, height: float = None):
     """
+    Draws a triangular cut out for the given curve, without trimming the curve.
 
-    center_point = utils.calc_center_point(start_point, end_point)
+    Parameters:
+        sketch (Sketch): The sketch to draw in.
+        frame (EdgeFrame): The edge frame of the curve.
+        center (float): Where the cut is centered, along the curve.
+        cut_out_size (float): The total length of the cut along the curve.
+        side (int): The side of the curve to cut towards, 1 for its left-hand side, -1 for its right.
+        height (float): How far the cut extends away from the curve. Randomized when not given.
+
+    Returns:
+        DrawnShape: The drawn curves, and the points to trim the curve between.
+    """
     width_delta = round(cut_out_size / 2, 3)
-    height = math.sqrt(3) * width_delta # calculate the max height of a proper equilateral triangle
-    height = utils.random_size(height * .1, height) # now randomize it between proper and squished
-
-    if direction in (Direction.POSITIVE_Y, Direction.NEGATIVE_X):
-        tri_start_point = adsk.core.Point3D.create(center_point.x + (width_delta if dominant_axis=='x' else 0),
-                                      center_point.y + (width_delta if dominant_axis=='y' else 0),
-                                      center_point.z)
-        tri_end_point = adsk.core.Point3D.create(center_point.x - (width_delta if dominant_axis=='x' else 0),
-                                      center_point.y - (width_delta if dominant_axis=='y' else 0),
-                                      center_point.z)
-        tri_mid_point = adsk.core.Point3D.create(center_point.x - (height if dominant_axis=='y' else 0),
-                                      center_point.y + (height if dominant_axis=='x' else 0),
-                                      center_point.z)
-    else:
-        tri_start_point = adsk.core.Point3D.create(center_point.x - (width_delta if dominant_axis=='x' else 0),
-                                      center_point.y - (width_delta if dominant_axis=='y' else 0),
-                                      center_point.z)
-        tri_end_point = adsk.core.Point3D.create(center_point.x + (width_delta if dominant_axis=='x' else 0),
-                                      center_point.y + (width_delta if dominant_axis=='y' else 0),
-                                      center_point.z)
-        tri_mid_point = adsk.core.Point3D.create(center_point.x + (height if dominant_axis=='y' else 0),
-                                      center_point.y - (height if dominant_axis=='x' else 0),
-                                      center_point.z)
-
-    lines = selected_curve.parentSketch.sketchCurves.sketchLines
-    lines.addByTwoPoints(tri_start_point, tri_mid_point)
-    lines.addByTwoPoints(tri_mid_point, tri_end_point)
-    return utils.clean_selected_curve_by_points(selected_curve, tri_start_point, tri_end_point)
+    if height is None:
+        height = HEIGHT_RATIO * width_delta # calculate the max height of a proper equilateral triangle
+        height = utils.random_size(height * .1, height) # now randomize it between proper and squished
+
+    new_lines, _ = draw_outline(sketch, frame, center, cut_out_size, side, height)
+    return utils.DrawnShape(*utils.to_points((frame.point_at(center - width_delta),
+                                              frame.point_at(center + width_delta))),
+                            new_lines, [])
@@ -0,0 +1,133 @@
+from array import array
+import adsk.core
+import adsk.fusion
+from geometry import EdgeFrame
+
+
+class SketchPointIndex:
+    """
+    A snapshot of the sketch's visible point coordinates and closed profile outlines.
+
+    The sketch is read through the API once, when the snapshot is taken. After that, points the
+    jitter adds can be recorded with add(), and direction queries are answered from the
+    snapshot alone, without going back to the sketch.
+    """
+
+    # ----- CONSTRUCTORS -----
+
+    def __init__(self, origin=(0.0, 0.0, 0.0)):
+        self._xs = array('d')
+        self._ys = array('d')
+        self._origin = origin
+        # One flat array of (ax, ay, bx, by) segments per closed profile
+        self._profiles = []
+
+    @classmethod
+    def from_sketch(cls, sketch: adsk.fusion.Sketch, include_profiles=True):
+        """
+        Takes a snapshot of the given sketch.
+
+        Parameters:
+            sketch (Sketch): The sketch to snapshot.
+            include_profiles (bool): Whether to also snapshot the outlines of sketch.profiles, for
+                            the inside/outside test.
+
+        Returns:
+            SketchPointIndex: The snapshot.
+        """
+        origin = sketch.origin
+        index = cls((origin.x, origin.y, origin.z))
+        for point in sketch.sketchPoints:
+            if point.isVisible:
+                geometry = point.geometry
+                index.add(geometry.x, geometry.y)
+        if include_profiles:
+            for profile in sketch.profiles:
+                segments = array('d')
+                for loop in profile.profileLoops:
+                    for profile_curve in loop.profileCurves:
+                        ok, start, end = profile_curve.geometry.evaluator.getEndPoints()
+                        if ok:
+                            segments.extend((start.x, start.y, end.x, end.y))
+                index._profiles.append(segments)
+        return index
+
+
+    # ----- METHODS -----
+
+    def __len__(self):
+        return len(self._xs)
+
+    def add(self, x, y):
+        self._xs.append(x)
+        self._ys.append(y)
+
+    def add_points(self, points):
+        """
+        Records points added to the sketch since the snapshot was taken.
+
+        Parameters:
+            points (iterable): (x, y[, z]) tuples.
+        """
+        for point in points:
+            self.add(point[0], point[1])
+
+    def farthest_side(self, frame: EdgeFrame):
+        """
+        Returns which side of the edge (+1 along its normal, or -1) the point farthest from the
+        edge's line is on, or 0 when every point is on the line.
+        """
+        sx, sy = frame.start[0], frame.start[1]
+        nx, ny = frame.nx, frame.ny
+        # Signed distance of every point from the edge's line, along its normal
+        distances = [(x - sx) * nx + (y - sy) * ny for x, y in zip(self._xs, self._ys)]
+        if not distances:
+            return 0
+        farthest = max(distances, key=abs)
+        if abs(farthest) < 1e-9:
+            return 0
+        return 1 if farthest > 0 else -1
+
+    def profile_side(self, frame: EdgeFrame):
+        """
+        Returns which side of the edge (+1 along its normal, or -1) is inside a closed profile of
+        the sketch, or 0 when that can't be told apart (no profiles, or both sides inside one).
+        """
+        if not self._profiles:
+            return 0
+        offset = frame.length * 1e-3
+        positive = self._is_inside(frame.point_at(frame.length / 2, offset))
+        negative = self._is_inside(frame.point_at(frame.length / 2, -offset))
+        if positive == negative:
+            return 0
+        return 1 if positive else -1
+
+    def _is_inside(self, point):
+        # Even-odd ray casting, so inner loops (holes) of a profile are handled for free
+        px, py = point[0], point[1]
+        for segments in self._profiles:
+            inside = False
+            for i in range(0, len(segments), 4):
+                ax, ay, bx, by = segments[i:i + 4]
+                if (ay > py) != (by > py) and px < ax + (py - ay) * (bx - ax) / (by - ay):
+                    inside = not inside
+            if inside:
+                return True
+        return False
+
+    def inside_side(self, frame: EdgeFrame):
+        """
+        Returns which side of the edge (+1 along its normal, or -1) the material is on.
+
+        The closed profiles of the sketch are trusted first. Failing that, the side with the
+        farthest sketch point is used, and then the side with the sketch origin.
+        """
+        side = self.profile_side(frame) or self.farthest_side(frame)
+        if side:
+            return side
+        origin_distance = (self._origin[0] - frame.start[0]) * frame.nx + (self._origin[1] - frame.start[1]) * frame.ny
+        if abs(origin_distance) > 1e-9:
+            return 1 if origin_distance > 0 else -1
+        # No good on origin, because the line is intersecting the origin. Go positive along
+        # whichever axis the normal is closest to.
+        return 1 if (frame.nx if abs(frame.nx) > abs(frame.ny) else frame.ny) > 0 else -1
@@ -0,0 +1,107 @@
+import adsk.core
+import adsk.fusion
+from geometry import EdgeFrame
+from utils import nearest_end
+
+# How much the lengths of two edges may differ by (cm) for them to count as congruent. It matches
+# the 0.001 cm precision cut widths are rounded to.
+LENGTH_TOLERANCE = 1e-3
+
+
+def congruent_groups(frames, tolerance=LENGTH_TOLERANCE):
+    """
+    Groups edges that are the same length, so one jitter layout fits them all.
+
+    Straight edges of the same length are congruent whatever their orientation, as any one of
+    them can be rotated onto any other, either way round (see stamp_matrix()). Edges are sorted by
+    length and grouped in one pass, so grouping n edges is O(n log n).
+
+    Parameters:
+        frames (list): The EdgeFrame of each edge.
+        tolerance (float): How much the lengths in a group may differ by.
+
+    Returns:
+        list: Lists of edge indices, each in ascending order, ordered by their first index.
+    """
+    order = sorted(range(len(frames)), key=lambda i: frames[i].length)
+    groups = []
+    for i in order:
+        if groups and frames[i].length - frames[groups[-1][0]].length <= tolerance:
+            groups[-1].append(i)
+        else:
+            groups.append([i])
+    return sorted((sorted(group) for group in groups), key=lambda group: group[0])
+
+
+def stamp_matrix(master: EdgeFrame, target: EdgeFrame, reverse=False):
+    """
+    Returns the rigid transform that lays the master edge onto the target edge, as the 16 values
+    of a row-major 4x4 matrix.
+
+    Parameters:
+        master (EdgeFrame): The edge that was jittered.
+        target (EdgeFrame): The edge to lay it onto.
+        reverse (bool): Lays the master's start onto the target's end rather than its start, which
+                        also swaps which side of the edge the master's left-hand side lands on.
+    """
+    tx, ty = (-target.tx, -target.ty) if reverse else (target.tx, target.ty)
+    origin = target.end if reverse else target.start
+    # Rotate the master's direction onto the target's, then move its start onto the target's
+    cos = master.tx * tx + master.ty * ty
+    sin = master.tx * ty - master.ty * tx
+    dx = origin[0] - (cos * master.start[0] - sin * master.start[1])
+    dy = origin[1] - (sin * master.start[0] + cos * master.start[1])
+    return [cos, -sin, 0.0, dx,
+            sin, cos, 0.0, dy,
+            0.0, 0.0, 1.0, origin[2] - master.start[2],
+            0.0, 0.0, 0.0, 1.0]
+
+
+def transform_point(matrix, point):
+    """Returns the (x, y, z) point moved by a matrix from stamp_matrix()."""
+    x, y, z = point
+    return (matrix[0] * x + matrix[1] * y + matrix[2] * z + matrix[3],
+            matrix[4] * x + matrix[5] * y + matrix[6] * z + matrix[7],
+            matrix[8] * x + matrix[9] * y + matrix[10] * z + matrix[11])
+
+
+def stamp(sketch: adsk.fusion.Sketch, curves, end_curves, master: EdgeFrame, target_curve: adsk.fusion.SketchLine,
+          target: EdgeFrame, reverse=False):
+    """
+    Replaces a target curve with a copy of the jittered master curve, in a single Sketch.copy().
+
+    The copy's ends are made coincident with the target's end points, which the curves it's
+    connected to share, before the target is deleted, so the copy is connected in its place.
+
+    Parameters:
+        sketch (Sketch): The sketch the curves are in.
+        curves (list): Every curve the master was jittered into.
+        end_curves (tuple): The indices in curves of the curves touching the master's start and
+                        end points.
+        master (EdgeFrame): The edge frame of the master curve.
+        target_curve (SketchLine): The curve to replace.
+        target (EdgeFrame): The edge frame of the target curve.
+        reverse (bool): See stamp_matrix().
+
+    Returns:
+        list: The copied curves.
+    """
+    matrix = adsk.core.Matrix3D.create()
+    matrix.setWithArray(stamp_matrix(master, target, reverse))
+    entities = adsk.core.ObjectCollection.create()
+    for curve in curves:
+        entities.add(curve)
+    # The copies come back in the order the curves were given, along with their sketch points
+    copies = [curve for curve in map(adsk.fusion.SketchCurve.cast, sketch.copy(entities, matrix)) if curve]
+
+    # The master's start lands on the target's start, or its end when reversed
+    target_ends = [(target_curve.startSketchPoint, target.start), (target_curve.endSketchPoint, target.end)]
+    if reverse:
+        target_ends.reverse()
+    constraints = sketch.geometricConstraints
+    for index, (target_point, position) in zip(end_curves, target_ends):
+        if index is not None:
+            end = nearest_end(copies[index], adsk.core.Point3D.create(*position))
+            constraints.addCoincident(end, target_point)
+    target_curve.deleteMe()
+    return copies
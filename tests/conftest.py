@@ -0,0 +1,14 @@
+"""
+The tests run outside of Fusion. The pure Python modules need nothing from it, and the rest runs
+on the in-memory adsk stand-in the benchmarks use.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, 'benchmarks', 'fake_adsk'), ROOT]
+
+import instrumentation  # noqa: E402
+
+# Keep test runs out of the add-in's run log
+instrumentation.LOG_PATH = os.devnull
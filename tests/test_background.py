@@ -0,0 +1,80 @@
+import threading
+import pytest
+from background import BackgroundPlanner
+
+TIMEOUT = 5
+
+
+class _Processor:
+    """Stands in for a prepared JitterProcessor, planning the max_cuts it's given."""
+
+    def __init__(self, hold=False):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.thread = None
+        if not hold:
+            self.release.set()
+
+    def plan(self, cancel=None, max_cuts=None):
+        self.thread = threading.current_thread()
+        self.started.set()
+        assert self.release.wait(TIMEOUT)
+        return [max_cuts]
+
+
+class _Failing:
+    def plan(self, cancel=None, max_cuts=None):
+        raise RuntimeError('no plan')
+
+
+@pytest.fixture
+def planner():
+    handed_back = []
+    done = threading.Event()
+
+    def hand_back(generation):
+        result = planner.result()
+        handed_back.append(result)
+        if result is None or result.complete:
+            done.set()
+
+    planner = BackgroundPlanner(hand_back, delay=0)
+    planner.handed_back = handed_back
+    planner.done = done
+    return planner
+
+
+def test_newer_request_drops_the_older_result(planner):
+    older = _Processor(hold=True)
+    first = planner.request(older)
+    assert older.started.wait(TIMEOUT)
+    second = planner.request(_Processor())
+    assert planner.done.wait(TIMEOUT)
+    older.release.set()
+    older.thread.join(TIMEOUT)
+    assert [result.generation for result in planner.handed_back] == [second]
+    assert not planner.is_current(first)
+    assert planner.result().generation == second
+
+
+def test_cancel_drops_the_result(planner):
+    generation = planner.request(_Processor())
+    assert planner.done.wait(TIMEOUT)
+    assert planner.result().generation == generation
+    planner.cancel()
+    assert planner.result() is None
+    assert not planner.is_current(generation)
+
+
+def test_progressive_run_hands_back_the_first_cuts_first(planner):
+    planner.request(_Processor(), first_cuts=5)
+    assert planner.done.wait(TIMEOUT)
+    assert [(result.plans, result.complete) for result in planner.handed_back] == [([5], False), ([None], True)]
+
+
+def test_failed_run_hands_back_the_error(planner):
+    planner.request(_Failing(), first_cuts=5)
+    assert planner.done.wait(TIMEOUT)
+    [result] = planner.handed_back
+    assert result.plans is None and result.complete
+    assert 'no plan' in result.error
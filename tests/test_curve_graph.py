@@ -0,0 +1,43 @@
+import math
+import pytest
+from curve_graph import CurveGraph, corner_margin
+from geometry import EdgeFrame
+
+
+def _graph(*points, closed=False):
+    ends = list(points) + [points[0]] if closed else points
+    return CurveGraph([EdgeFrame(start, end) for start, end in zip(ends, ends[1:])])
+
+
+def test_square_is_one_closed_loop():
+    graph = _graph((0, 0, 0), (10, 0, 0), (10, 10, 0), (0, 10, 0), closed=True)
+    assert graph.chains() == [([0, 1, 2, 3], True)]
+    assert graph.corner_count() == 4
+    assert graph.corner_angle(0, 1) == pytest.approx(math.pi / 2)
+
+
+def test_open_chain_is_walked_from_its_free_end():
+    # Drawn out of order, so the walk starts from the free end of the first line, at (10, 10)
+    graph = CurveGraph([EdgeFrame((10, 0, 0), (10, 10, 0)), EdgeFrame((0, 0, 0), (10, 0, 0)),
+                        EdgeFrame((0, 5, 0), (0, 0, 0))])
+    assert graph.chains() == [([0, 1, 2], False)]
+    assert graph.corner_angle(0, 1) is None
+
+
+def test_separate_lines_are_separate_chains():
+    graph = CurveGraph([EdgeFrame((0, 0, 0), (1, 0, 0)), EdgeFrame((0, 5, 0), (1, 5, 0))])
+    assert graph.chains() == [([0], False), ([1], False)]
+    assert graph.corner_count() == 0
+
+
+def test_corner_margins():
+    graph = _graph((0, 0, 0), (10, 0, 0), (10, 10, 0))
+    margins = graph.corner_margins(max_height=1.0, clearance=0.5)
+    # A right angle needs max_height / tan(45°) on top of the clearance, free ends need nothing
+    assert margins == [(0.0, pytest.approx(1.5)), (pytest.approx(1.5), 0.0)]
+
+
+def test_corner_margin_grows_as_the_corner_gets_sharper():
+    assert corner_margin(math.pi, 1.0, 0.5) == 0.5
+    assert corner_margin(math.pi / 2, 1.0, 0.5) < corner_margin(math.pi / 4, 1.0, 0.5)
+    assert corner_margin(0.0, 1.0, 0.5) == math.inf
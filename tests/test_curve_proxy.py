@@ -0,0 +1,63 @@
+from collections import Counter
+import adsk.core
+import adsk.fusion
+from curve_proxy import HITS, MISSES, CurveProxy
+
+
+def _line(sketch, start, end):
+    return sketch.sketchCurves.sketchLines.addByTwoPoints(adsk.core.Point3D.create(*start),
+                                                          adsk.core.Point3D.create(*end))
+
+
+def test_reads_are_cached_and_counted():
+    counters = Counter()
+    line = _line(adsk.fusion.Sketch(), (0, 0, 0), (30, 0, 0))
+    proxy = CurveProxy(line, counters)
+    calls = adsk.api_calls['SketchLine.length']
+    assert proxy.length == 30.0
+    assert proxy.length == 30.0
+    assert adsk.api_calls['SketchLine.length'] == calls + 1
+    assert proxy.end_point == (30.0, 0.0, 0.0)
+    assert proxy.isValid
+    assert (proxy.hits, proxy.misses) == (1, 4)
+    assert (counters[HITS], counters[MISSES]) == (1, 4)
+
+
+def test_wrap_keeps_proxies():
+    proxy = CurveProxy(_line(adsk.fusion.Sketch(), (0, 0, 0), (1, 0, 0)))
+    assert CurveProxy.wrap(proxy) is proxy
+    assert CurveProxy.wrap(proxy.curve).curve is proxy.curve
+
+
+def test_everything_else_is_read_from_the_curve():
+    sketch = adsk.fusion.Sketch()
+    line = _line(sketch, (0, 0, 0), (1, 0, 0))
+    proxy = CurveProxy(line)
+    assert proxy.entityToken == line.entityToken
+    assert proxy.parentSketch is sketch
+    assert (proxy.hits, proxy.misses) == (0, 0)
+
+
+def test_trim_and_delete_forget_what_was_read():
+    sketch = adsk.fusion.Sketch()
+    line = _line(sketch, (0, 0, 0), (30, 0, 0))
+    _line(sketch, (10, 0, 0), (10, 5, 0))
+    proxy = CurveProxy(line)
+    assert proxy.isValid
+    assert len(proxy.trim(adsk.core.Point3D.create(5, 0, 0))) == 1
+    assert not proxy.isValid
+
+    other = CurveProxy(_line(sketch, (0, 10, 0), (5, 10, 0)))
+    assert other.isValid
+    other.deleteMe()
+    assert not other.isValid
+
+
+def test_changes_made_around_the_proxy_need_invalidate():
+    line = _line(adsk.fusion.Sketch(), (0, 0, 0), (30, 0, 0))
+    proxy = CurveProxy(line)
+    assert proxy.isValid
+    line.deleteMe()
+    assert proxy.isValid
+    proxy.invalidate()
+    assert not proxy.isValid
@@ -0,0 +1,41 @@
+import pytest
+from cut_index import DEGENERATE, OUT_OF_BOUNDS, OVERLAP, SLIVER, CutIndex
+
+
+@pytest.fixture
+def index():
+    index = CutIndex(10.0)
+    index.add(2.0, 3.0)
+    index.add(6.0, 7.0)
+    return index
+
+
+@pytest.mark.parametrize('start, end, reason', [
+    (4.0, 5.0, None),
+    (-0.5, 1.0, OUT_OF_BOUNDS),
+    (9.5, 10.5, OUT_OF_BOUNDS),
+    (4.0, 4.0005, DEGENERATE),
+    (2.5, 4.0, OVERLAP),
+    (5.0, 6.5, OVERLAP),
+    (1.0, 8.0, OVERLAP),
+    (2.2, 2.8, OVERLAP),
+    (3.0005, 4.0, SLIVER),
+    (4.0, 5.9995, SLIVER),
+    (3.0, 6.0, SLIVER),
+])
+def test_check(index, start, end, reason):
+    assert index.check(start, end) == reason
+
+
+def test_place_only_records_cuts_that_fit(index):
+    assert index.place(2.5, 4.0) == OVERLAP
+    assert len(index) == 2
+    assert index.place(4.0, 5.0) is None
+    assert list(index) == [(2.0, 3.0), (4.0, 5.0), (6.0, 7.0)]
+
+
+def test_free_intervals(index):
+    assert list(index.free_intervals()) == [(0.0, 2.0), (3.0, 6.0), (7.0, 10.0)]
+    index.add(0.0, 2.0)
+    index.add(7.0, 10.0)
+    assert list(index.free_intervals()) == [(3.0, 6.0)]
@@ -0,0 +1,70 @@
+import adsk.core
+import adsk.fusion
+import pytest
+import emitter
+from geometry import EdgeFrame
+from instrumentation import Instrumentation
+from planner import Cut, JitterPlan
+from shapes.shape_factory import shape_drawers, shape_outline_drawers
+
+
+def _line(sketch, length=30.0):
+    return sketch.sketchCurves.sketchLines.addByTwoPoints(adsk.core.Point3D.create(0, 0, 0),
+                                                          adsk.core.Point3D.create(length, 0, 0))
+
+
+def _plan():
+    plan = JitterPlan(30.0, 1.0, 2.0, False)
+    plan.cuts = [Cut(5.0, 6.0, 'rectangle', 'concave', 0.5), Cut(15.0, 16.5, 'rectangle', 'concave', 0.5)]
+    return plan
+
+
+@pytest.mark.parametrize('batch', [False, True])
+def test_shapes_that_cannot_be_trimmed_are_deleted(monkeypatch, batch):
+    trim = emitter.clean_selected_curve_by_points
+
+    def failing_first_trim(curve, start, end):
+        # The first cut's trim never goes through, even after a recompute
+        return [] if start.x < 10 else trim(curve, start, end)
+
+    monkeypatch.setattr(emitter, 'clean_selected_curve_by_points', failing_first_trim)
+    sketch = adsk.fusion.Sketch()
+    line = _line(sketch)
+    plan_emitter = emitter.PlanEmitter(line, EdgeFrame((0, 0, 0), (30.0, 0, 0)), {'concave': 1, 'convex': -1},
+                                       shape_drawers())
+    assert plan_emitter.emit(_plan(), batch=batch) == 1
+    # The line in two pieces around the one cut that was emitted, and that cut's three sides
+    assert len(sketch._curves) == 5
+
+
+def _rebuild_emitter(sketch, line, instrumentation):
+    return emitter.PlanEmitter(line, EdgeFrame((0, 0, 0), (30.0, 0, 0)), {'concave': 1, 'convex': -1},
+                               shape_drawers(), instrumentation=instrumentation,
+                               outline_drawers=shape_outline_drawers())
+
+
+def test_rebuild_draws_one_connected_chain():
+    sketch = adsk.fusion.Sketch()
+    line = _line(sketch)
+    start, end = line.startSketchPoint, line.endSketchPoint
+    instrumentation = Instrumentation()
+    plan_emitter = _rebuild_emitter(sketch, line, instrumentation)
+    assert plan_emitter.emit_rebuild(_plan()) == 2
+    assert not line.isValid
+    chain = plan_emitter.drawn_curves
+    # Three pieces of the line, and three sides to each of the two rectangles
+    assert len(chain) == 9
+    assert chain[0].startSketchPoint is start
+    assert chain[-1].endSketchPoint is end
+    for before, after in zip(chain, chain[1:]):
+        assert after.startSketchPoint is before.endSketchPoint
+    assert instrumentation.counters['curves_rebuilt'] == 1
+
+
+def test_only_an_uncut_curve_can_be_rebuilt():
+    sketch = adsk.fusion.Sketch()
+    line = _line(sketch)
+    plan_emitter = _rebuild_emitter(sketch, line, Instrumentation())
+    plan_emitter.emit_cut(_plan().cuts[0])
+    with pytest.raises(RuntimeError):
+        plan_emitter.emit_rebuild(_plan())
@@ -0,0 +1,35 @@
+import pytest
+from export import dxf_lines, svg_lines, write_outlines
+
+OUTLINE = [(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (1.0, 0.0, 0.0), (1.0, 2.0, 0.0)]
+
+
+def test_dxf_draws_a_line_between_each_point_in_mm():
+    dxf = ''.join(dxf_lines([iter(OUTLINE)]))
+    # The repeated point draws nothing
+    assert dxf.count('\nLINE\n') == 2
+    assert '10\n10.0000\n20\n0.0000\n30\n0.0000\n11\n10.0000\n21\n20.0000\n' in dxf
+    assert dxf.startswith('0\nSECTION\n') and dxf.endswith('0\nEOF\n')
+
+
+def test_svg_is_in_mm_with_y_flipped():
+    svg = ''.join(svg_lines([OUTLINE], (0.0, 0.0, 1.0, 2.0)))
+    assert 'width="10.0000mm" height="20.0000mm" viewBox="0.0000 -20.0000 10.0000 20.0000"' in svg
+    assert 'd="M0.0000 -0.0000 L10.0000 -0.0000 L10.0000 -0.0000 L10.0000 -20.0000 "' in svg
+    assert svg.endswith('</svg>\n')
+
+
+@pytest.mark.parametrize('extension', ['.dxf', '.SVG'])
+def test_write_outlines_picks_the_format_from_the_extension(tmp_path, extension):
+    path = tmp_path / f'jitter{extension}'
+    write_outlines(str(path), [OUTLINE], (0.0, 0.0, 1.0, 2.0))
+    text = path.read_text()
+    assert ('LINE' in text) == (extension == '.dxf')
+    assert ('<svg' in text) == (extension == '.SVG')
+
+
+def test_unsupported_extension(tmp_path):
+    path = tmp_path / 'jitter.pdf'
+    with pytest.raises(ValueError, match=r'\.pdf'):
+        write_outlines(str(path), [OUTLINE], (0.0, 0.0, 1.0, 2.0))
+    assert not path.exists()
@@ -0,0 +1,27 @@
+import json
+import instrumentation
+from instrumentation import Instrumentation
+
+
+def _lines(path):
+    with open(path) as log:
+        return [json.loads(line) for line in log]
+
+
+def test_write_appends_a_line_per_run(tmp_path):
+    path = str(tmp_path / 'runs.jsonl')
+    for run in range(3):
+        Instrumentation().write(path, run=run)
+    assert [record['run'] for record in _lines(path)] == [0, 1, 2]
+
+
+def test_log_is_rotated_once_it_is_too_big(tmp_path, monkeypatch):
+    monkeypatch.setattr(instrumentation, 'LOG_MAX_BYTES', 300)
+    path = str(tmp_path / 'runs.jsonl')
+    for run in range(20):
+        Instrumentation().write(path, run=run)
+    current, previous = _lines(path), _lines(path + '.1')
+    assert (tmp_path / 'runs.jsonl').stat().st_size < 300 + len(json.dumps(current[-1])) + 1
+    assert not (tmp_path / 'runs.jsonl.1.1').exists()
+    # Only whole runs are moved aside, the newest ones are kept in order
+    assert [record['run'] for record in previous + current] == list(range(previous[0]['run'], 20))
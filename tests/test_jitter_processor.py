@@ -0,0 +1,119 @@
+import adsk.core
+import adsk.fusion
+import pytest
+import jitter_processor
+from plan_cache import plan_cache
+
+
+class _UI:
+    def __init__(self):
+        self.messages = []
+
+    def messageBox(self, message):
+        self.messages.append(message)
+
+
+def _square(size=30.0):
+    sketch = adsk.fusion.Sketch()
+    lines = sketch.sketchCurves.sketchLines
+    points = [sketch.sketchPoints.add(adsk.core.Point3D.create(x, y, 0))
+              for x, y in ((0, 0), (size, 0), (size, size), (0, size))]
+    return sketch, [lines.addByTwoPoints(points[i], points[(i + 1) % 4]) for i in range(4)]
+
+
+@pytest.fixture(autouse=True)
+def _clear_plan_cache():
+    plan_cache.clear()
+
+
+def test_replay_refuses_stamp_with_profile():
+    sketch, lines = _square()
+    plans = jitter_processor.JitterProcessor(_UI(), lines, 0.5, 1.5, True, seed=1).plan()
+    ui = _UI()
+    processor = jitter_processor.JitterProcessor(ui, lines, 0.5, 1.5, True, seed=1, stamp=True, profile=True)
+    assert not processor.replay(plans)
+    assert ui.messages == ["Stamping can't be combined with jittering a connected profile."]
+    assert all(line.isValid for line in lines)
+
+
+def test_nothing_to_jitter_is_refused():
+    processor = jitter_processor.JitterProcessor(_UI(), [], 0.5, 1.5, True)
+    assert processor.validate().startswith('Select at least one line.')
+    assert not processor.generate()
+
+
+def test_stamp_replays_onto_congruent_curves():
+    sketch, lines = _square()
+    plans = jitter_processor.JitterProcessor(_UI(), lines, 0.5, 1.5, True, seed=1).plan()
+    processor = jitter_processor.JitterProcessor(_UI(), lines, 0.5, 1.5, True, seed=1, stamp=True)
+    assert processor.replay(plans)
+    assert 'Stamped 3 curves' in processor.emission_report
+
+
+def _line(length=300.0):
+    sketch = adsk.fusion.Sketch()
+    lines = sketch.sketchCurves.sketchLines
+    return lines.addByTwoPoints(adsk.core.Point3D.create(0, 0, 0), adsk.core.Point3D.create(length, 0, 0))
+
+
+def test_plan_is_made_again_once_the_line_is_resized():
+    line = _line(30.0)
+    plan = jitter_processor.JitterProcessor(_UI(), line, 0.5, 1.5, True, seed=1).plan()[0]
+    # The stand-in can't drag a point, so move the line's end point directly
+    line.endSketchPoint._geometry = adsk.core.Point3D(15.0, 0, 0)
+    resized = jitter_processor.JitterProcessor(_UI(), line, 0.5, 1.5, True, seed=1).plan()[0]
+    assert resized is not plan
+    assert resized.edge_length == 15.0
+    assert all(cut.end <= 15.0 for cut in resized)
+
+
+@pytest.fixture
+def emission_cost(monkeypatch):
+    # 100 cuts a second, so a 1 s preview budget leaves room for 75 cuts once planning has had its share
+    monkeypatch.setattr(jitter_processor.JitterProcessor, '_emission_costs', {'immediate': (100, 1.0)})
+
+
+def test_preview_cut_down_by_the_budget_is_degraded(emission_cost):
+    line = _line()
+    preview = jitter_processor.JitterProcessor(_UI(), line, 0.5, 1.5, True, seed=1, preview_budget=1.0).plan()
+    assert len(preview[0]) == 75
+    assert jitter_processor.is_degraded(preview)
+    final = jitter_processor.JitterProcessor(_UI(), line, 0.5, 1.5, True, seed=1).plan()
+    assert len(final[0]) > 75
+    assert not jitter_processor.is_degraded(final)
+
+
+def test_user_cap_below_the_budget_is_not_degraded(emission_cost):
+    line = _line()
+    preview = jitter_processor.JitterProcessor(_UI(), line, 0.5, 1.5, True, seed=1, preview_budget=1.0,
+                                               total_cuts=50).plan()
+    assert len(preview[0]) == 50
+    assert not jitter_processor.is_degraded(preview)
+    # The same plan is what OK draws, without planning it again
+    final = jitter_processor.JitterProcessor(_UI(), line, 0.5, 1.5, True, seed=1, total_cuts=50).plan()
+    assert final[0] is preview[0]
+
+
+def test_preview_within_the_budget_is_reused(emission_cost):
+    line = _line(30.0)
+    preview = jitter_processor.JitterProcessor(_UI(), line, 1.0, 3.0, False, seed=1, preview_budget=1.0).plan()
+    assert len(preview[0]) < 75
+    assert not jitter_processor.is_degraded(preview)
+    final = jitter_processor.JitterProcessor(_UI(), line, 1.0, 3.0, False, seed=1).plan()
+    assert final[0] is preview[0]
+
+
+def test_degraded_plans_stay_degraded_in_the_plan_store(emission_cost, tmp_path):
+    from plan_format import PlanStore
+    line = _line()
+    store = PlanStore(str(tmp_path))
+    jitter_processor.JitterProcessor(_UI(), line, 0.5, 1.5, True, seed=1, preview_budget=1.0,
+                                     plan_store=store).plan()
+    plan_cache.clear()
+    preview = jitter_processor.JitterProcessor(_UI(), line, 0.5, 1.5, True, seed=1, preview_budget=1.0,
+                                               plan_store=store).plan()
+    assert jitter_processor.is_degraded(preview)
+    plan_cache.clear()
+    final = jitter_processor.JitterProcessor(_UI(), line, 0.5, 1.5, True, seed=1, plan_store=store).plan()
+    assert not jitter_processor.is_degraded(final)
+    assert len(final[0]) > len(preview[0])
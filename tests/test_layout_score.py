@@ -0,0 +1,40 @@
+import pytest
+from layout_score import score_plan
+from planner import Cut, JitterPlan
+
+
+def _plan(*spans, shapes=None, edge_length=10.0):
+    plan = JitterPlan(edge_length, 1.0, 2.0, True)
+    shapes = shapes or ['rectangle'] * len(spans)
+    plan.cuts.extend(Cut(start, end, shape, 'concave', 0.5) for (start, end), shape in zip(spans, shapes))
+    return plan
+
+
+def test_empty_plan_scores_nothing():
+    assert score_plan(_plan()).total == 0.0
+
+
+def test_evenly_spread_cuts():
+    score = score_plan(_plan((2, 3), (5, 6), (8, 9), edge_length=11.0))
+    assert score.uniformity == pytest.approx(1.0)
+    assert score.coverage == pytest.approx(3 / 11)
+    assert score.spacing == 1.0
+
+
+def test_clustered_cuts_score_lower():
+    even = score_plan(_plan((1, 2), (4, 5), (7, 8)))
+    clustered = score_plan(_plan((1, 2), (2.5, 3.5), (4, 5)))
+    assert clustered.uniformity < even.uniformity
+    assert clustered.spacing == pytest.approx(0.5)
+    assert clustered.total < even.total
+
+
+def test_variety_is_measured_against_the_shapes_there_were():
+    plan = _plan((1, 2), (4, 5), shapes=['rectangle', 'triangle'])
+    assert score_plan(plan).variety == pytest.approx(1.0)
+    assert score_plan(plan, shape_count=4).variety == pytest.approx(0.5)
+
+
+def test_weights_pick_the_metrics():
+    score = score_plan(_plan((1, 2), (4, 5)), weights={'coverage': 1.0})
+    assert score.total == pytest.approx(score.coverage)
@@ -0,0 +1,60 @@
+import threading
+import pytest
+import parallel
+from parallel import PlanJob, candidate_jobs, plan_best_edges, plan_edges
+from planner import SCATTER, ShapeSpec
+
+SHAPES = (ShapeSpec('rectangle', 0.5), ShapeSpec('triangle', 0.5), ShapeSpec('hemi_circle', 0.5))
+
+
+@pytest.fixture(autouse=True)
+def _shutdown():
+    yield
+    parallel.shutdown()
+
+
+def _job(seed=1, **options):
+    return PlanJob(100.0, 0.5, 1.5, True, SHAPES, seed, **options)
+
+
+def test_candidates_share_the_time_budget():
+    jobs = candidate_jobs(_job(time_budget=1.0), 4)
+    assert jobs[0].seed == 1
+    assert len({job.seed for job in jobs}) == 4
+    assert all(job.time_budget == pytest.approx(0.25) for job in jobs)
+    assert all(job.time_budget is None for job in candidate_jobs(_job(), 4))
+
+
+def test_search_is_the_same_on_the_workers():
+    # Enough candidates in all to go to the workers
+    jobs = [_job(placement=SCATTER), _job(seed=2)]
+    serial = plan_best_edges(jobs, 4)
+    pooled = plan_best_edges(jobs, 4, workers=2)
+    assert [plan.cuts for plan in pooled] == [plan.cuts for plan in serial]
+    assert pooled[0].stats['layout_candidates'] == 4
+
+
+def test_small_search_stays_in_this_process(monkeypatch):
+    def no_pool(workers):
+        raise AssertionError('The pool was started.')
+
+    monkeypatch.setattr(parallel, '_get_executor', no_pool)
+    assert len(plan_best_edges([_job()], 4, workers=2)) == 1
+
+
+def test_search_never_does_worse_than_the_first_candidate():
+    from layout_score import score_plan
+    plain = plan_edges([_job(seed=seed) for seed in range(5)])
+    best = plan_best_edges([_job(seed=seed) for seed in range(5)], 6)
+    for plain_plan, best_plan in zip(plain, best):
+        assert score_plan(best_plan, 3).total >= score_plan(plain_plan, 3).total
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_cancelled_search_is_cut_short(workers):
+    cancel = threading.Event()
+    cancel.set()
+    plans = plan_best_edges([_job(), _job(seed=2)], 4, workers=workers, cancel=cancel)
+    assert len(plans) == 2
+    assert all(plan.stats['stopped_by_cancel'] or len(plan) == len(plan_edges([_job(seed=plan_seed)])[0])
+               for plan, plan_seed in zip(plans, (1, 2)))
@@ -0,0 +1,28 @@
+from plan_cache import PlanCache, plan_key
+from planner import ShapeSpec
+
+SHAPES = [ShapeSpec('rectangle', 0.5)]
+
+
+def test_least_recently_used_plan_is_dropped():
+    cache = PlanCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_plan_key_is_hashable_and_tells_plans_apart():
+    key = plan_key('token', 30.0, 1.0, 3.0, True, 7, SHAPES)
+    assert key == plan_key('token', 30.0, 1.0, 3.0, 1, 7, list(SHAPES))
+    assert hash(key) == hash(plan_key('token', 30.0, 1.0, 3.0, True, 7, SHAPES))
+    assert key != plan_key('token', 30.0, 1.0, 3.0, True, 8, SHAPES)
+    assert key == plan_key('token', 30.0004, 1.0, 3.0, True, 7, SHAPES)
+    assert key != plan_key('token', 15.0, 1.0, 3.0, True, 7, SHAPES)
+    assert key != plan_key('token', 30.0, 1.0, 3.0, True, 7, SHAPES, max_cuts=5)
+    assert key != plan_key('token', 30.0, 1.0, 3.0, True, 7, SHAPES, candidates=4)
@@ -0,0 +1,75 @@
+import json
+import struct
+import pytest
+import plan_format
+from planner import Cut, JitterPlan
+
+
+def _plan():
+    plan = JitterPlan(30.0, 0.5, 1.5, True)
+    plan.cuts = [Cut(1.0, 2.0, 'rectangle', 'concave', 0.5, 1), Cut(5.0, 5.75, 'triangle', 'convex', 0.3, 2)]
+    plan.stats.update({'cuts_planned': 2, 'stopped_by_max_cuts': 1, 'degraded_by_preview_budget': 1})
+    return plan
+
+
+def _assert_same(loaded, plan):
+    assert (loaded.edge_length, loaded.min_size, loaded.max_size, loaded.recurse) == \
+        (plan.edge_length, plan.min_size, plan.max_size, plan.recurse)
+    assert loaded.cuts == plan.cuts
+    assert loaded.stats == plan.stats
+
+
+@pytest.mark.parametrize('dumps, loads', [(plan_format.dumps_json, plan_format.loads_json),
+                                          (plan_format.dumps_binary, plan_format.loads_binary)])
+def test_round_trip_keeps_cuts_and_stats(dumps, loads):
+    plans, meta = loads(dumps([_plan(), JitterPlan(10.0, 0.5, 1.5, False)], seed=7))
+    assert meta == {'seed': 7}
+    _assert_same(plans[0], _plan())
+    _assert_same(plans[1], JitterPlan(10.0, 0.5, 1.5, False))
+
+
+def test_version_1_binary_is_still_read():
+    plan = _plan()
+    blobs = [json.dumps({}), json.dumps([['rectangle', 'triangle'], ['concave', 'convex']])]
+    data = plan_format._HEADER.pack(plan_format.BINARY_MAGIC, 1, 1)
+    for blob in blobs:
+        data += struct.pack('<I', len(blob)) + blob.encode('utf-8')
+    data += plan_format._PLAN.pack(30.0, 0.5, 1.5, True, 2)
+    data += plan_format._CUT.pack(1.0, 2.0, 0.5, 0, 0, 1) + plan_format._CUT.pack(5.0, 5.75, 0.3, 1, 1, 2)
+    plans, _ = plan_format.loads_binary(data)
+    assert plans[0].cuts == plan.cuts
+    assert not plans[0].stats
+
+
+def test_newer_versions_and_other_data_are_refused():
+    data = bytearray(plan_format.dumps_binary([_plan()]))
+    struct.pack_into('<H', data, 4, plan_format.FORMAT_VERSION + 1)
+    with pytest.raises(ValueError):
+        plan_format.loads_binary(bytes(data))
+    with pytest.raises(ValueError):
+        plan_format.loads_binary(b'nope')
+    with pytest.raises(ValueError):
+        plan_format.loads_json('[]')
+
+
+def test_plan_store_keeps_stats(tmp_path):
+    store = plan_format.PlanStore(str(tmp_path))
+    key = plan_format.store_key(30.0, 0.5, 1.5, True, 1, ())
+    assert store.get(key) is None
+    store.put(key, _plan())
+    _assert_same(store.get(key), _plan())
+
+
+def test_fit_plan_stretches_within_limits():
+    fitted = plan_format.fit_plan(_plan(), 31.2)
+    assert fitted.cuts[0].start == pytest.approx(1.04)
+    assert fitted.stats == _plan().stats
+    with pytest.raises(ValueError):
+        plan_format.fit_plan(_plan(), 40.0)
+
+
+def test_store_key_only_changes_for_non_default_options():
+    base = plan_format.store_key(30.0, 0.5, 1.5, True, 1, ())
+    assert plan_format.store_key(30.0, 0.5, 1.5, True, 1, (), placement='bisect', candidates=1) == base
+    assert plan_format.store_key(30.0, 0.5, 1.5, True, 1, (), placement='scatter') != base
+    assert plan_format.store_key(30.0, 0.5, 1.5, True, 1, (), candidates=4) != base
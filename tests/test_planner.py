@@ -0,0 +1,94 @@
+import random
+import pytest
+from planner import BISECT, BREADTH_FIRST, MIN_GAP_RATIO, SCATTER, ShapePicker, ShapeSpec, plan_edge, random_size
+
+SHAPES = (ShapeSpec('rectangle', 0.5), ShapeSpec('triangle', 0.5), ShapeSpec('hemi_circle', 0.5))
+
+
+def _plan(seed=7, **kwargs):
+    return plan_edge(30.0, 1.0, 3.0, True, SHAPES, random.Random(seed), **kwargs)
+
+
+@pytest.mark.parametrize('placement', [BISECT, SCATTER])
+def test_same_seed_same_plan(placement):
+    assert _plan(placement=placement).cuts == _plan(placement=placement).cuts
+    assert _plan(placement=placement).cuts != _plan(seed=8, placement=placement).cuts
+
+
+@pytest.mark.parametrize('placement', [BISECT, SCATTER])
+def test_cuts_stay_on_the_edge_without_overlapping(placement):
+    plan = _plan(placement=placement)
+    assert len(plan) > 1
+    assert all(0 <= cut.start < cut.end <= 30.0 for cut in plan)
+    cuts = sorted(plan, key=lambda cut: cut.start)
+    assert all(before.end <= after.start for before, after in zip(cuts, cuts[1:]))
+
+
+def test_max_cuts_stops_the_plan():
+    plan = _plan(max_cuts=3)
+    assert len(plan) == 3
+    assert plan.stats['stopped_by_max_cuts'] == 1
+    assert plan.cuts == _plan().cuts[:3]
+
+
+def test_used_up_time_budget_stops_the_plan():
+    plan = _plan(time_budget=0)
+    assert len(plan) == 0
+    assert plan.stats['stopped_by_time_budget'] == 1
+
+
+def test_max_depth_zero_makes_one_cut():
+    plan = _plan(max_depth=0)
+    assert len(plan) == 1
+    assert plan.cuts[0].depth == 0
+
+
+def test_breadth_first_works_one_depth_at_a_time():
+    depths = [cut.depth for cut in _plan(order=BREADTH_FIRST)]
+    assert depths == sorted(depths)
+
+
+def test_random_size_is_a_tenth_of_max_size_step():
+    rng = random.Random(1)
+    for _ in range(100):
+        size = random_size(1.0, 3.0, rng)
+        assert size / 0.3 == pytest.approx(round(size / 0.3))
+
+
+def test_picker_skips_weightless_shapes():
+    picker = ShapePicker([ShapeSpec('rectangle', 0.5, 0.0), ShapeSpec('triangle', 0.5)])
+    assert {shape.name for shape in picker.pick_many(50, random.Random(1))} == {'triangle'}
+    with pytest.raises(RuntimeError):
+        ShapePicker([ShapeSpec('rectangle', 0.5, 0.0)])
+
+
+@pytest.mark.parametrize('placement', [BISECT, SCATTER])
+def test_cuts_stay_out_of_the_margins(placement):
+    plan = _plan(placement=placement, margins=(4.0, 6.0))
+    assert len(plan)
+    assert all(cut.start >= 4.0 and cut.end <= 24.0 for cut in plan)
+
+
+def test_scattered_cuts_keep_their_least_gap():
+    cuts = sorted(_plan(placement=SCATTER), key=lambda cut: cut.start)
+    for before, after in zip(cuts, cuts[1:]):
+        assert after.start - before.end >= MIN_GAP_RATIO * max(before.width, after.width) - 1e-9
+
+
+class _CancelAfter:
+    """Stands in for an Event that's set after it's been checked a number of times."""
+
+    def __init__(self, checks):
+        self.checks = checks
+
+    def is_set(self):
+        self.checks -= 1
+        return self.checks < 0
+
+
+def test_cancelled_scatter_still_places_the_cuts_drawn():
+    plan = _plan(placement=SCATTER, cancel=_CancelAfter(2))
+    assert plan.stats['stopped_by_cancel'] == 1
+    assert len(plan) == 2
+    # Scattered over the whole edge, rather than packed at its start
+    assert plan.cuts[-1].end > 15.0
@@ -0,0 +1,28 @@
+import itertools
+import random
+import pytest
+from constants import CUT_OUT_TYPES
+from planner import ShapePicker, ShapeSpec
+from sampler import CutSampler
+
+SHAPES = (ShapeSpec('rectangle', 0.5), ShapeSpec('triangle', 0.5))
+
+
+def _sampler(seed=3, **kwargs):
+    return CutSampler(1.0, 3.0, ShapePicker(SHAPES), random.Random(seed), **kwargs)
+
+
+def test_samples_are_within_range_and_quantized():
+    for cut_out_type, shape, size, height in _sampler().draw_block(500):
+        assert cut_out_type in CUT_OUT_TYPES
+        assert shape in SHAPES
+        assert 0.9 - 1e-9 <= size <= 3.0 + 1e-9
+        assert size / 0.3 == pytest.approx(round(size / 0.3))
+        assert 0.1 <= height <= 1.0
+        assert height * 10 == pytest.approx(round(height * 10))
+
+
+def test_block_size_does_not_change_the_first_block():
+    first = _sampler(block_size=8).draw_block(8)
+    assert list(itertools.islice(_sampler(block_size=8), 8)) == first
+    assert list(itertools.islice(_sampler(block_size=8), 8)) != _sampler(seed=4, block_size=8).draw_block(8)
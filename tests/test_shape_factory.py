@@ -0,0 +1,63 @@
+import sys
+import pytest
+import shapes
+from shapes.shape_factory import DEFAULT_WEIGHT, ShapeRegistry
+
+SHAPE_NAMES = ['hemi_circle', 'rectangle', 'triangle']
+
+
+@pytest.fixture
+def registry():
+    return ShapeRegistry()
+
+
+def test_shapes_are_found_without_being_imported(registry):
+    assert sorted(registry.names()) == SHAPE_NAMES
+    assert registry.loaded_names() == []
+    assert registry.weight('rectangle') == DEFAULT_WEIGHT
+
+
+def test_shapes_are_imported_when_used(registry):
+    registry.set_enabled('triangle', False)
+    assert sorted(spec.name for spec in registry.specs()) == ['hemi_circle', 'rectangle']
+    assert 'triangle' not in registry.loaded_names()
+    assert callable(registry.drawers()['triangle'])
+    assert 'triangle' in registry.loaded_names()
+
+
+def test_weights_and_enabled_flags(registry):
+    registry.set_weight('rectangle', 3)
+    registry.set_weight('hemi_circle', 0)
+    registry.set_enabled('triangle', False)
+    assert [(spec.name, spec.weight) for spec in registry.specs()] == [('rectangle', 3)]
+    with pytest.raises(ValueError):
+        registry.set_weight('rectangle', -1)
+    for name in SHAPE_NAMES:
+        registry.set_enabled(name, False)
+    with pytest.raises(RuntimeError):
+        registry.specs()
+
+
+def test_invalidate_keeps_weights_and_enabled_flags(registry):
+    registry.set_weight('rectangle', 3)
+    registry.set_enabled('triangle', False)
+    registry.specs()
+    registry.invalidate()
+    assert registry.loaded_names() == []
+    assert registry.weight('rectangle') == 3
+    assert not registry.is_enabled('triangle')
+
+
+def test_unknown_shape(registry):
+    with pytest.raises(KeyError):
+        registry.drawers()['star']
+
+
+def test_modules_that_are_not_shapes_are_dropped(registry, tmp_path, monkeypatch):
+    (tmp_path / 'helpers.py').write_text('HEIGHT_RATIO = 1\n')
+    monkeypatch.setattr(shapes, '__path__', list(shapes.__path__) + [str(tmp_path)])
+    monkeypatch.delitem(sys.modules, 'shapes.helpers', raising=False)
+    assert 'helpers' in registry.names()
+    assert sorted(spec.name for spec in registry.specs()) == SHAPE_NAMES
+    assert 'helpers' not in registry.names()
+    sys.modules.pop('shapes.helpers', None)
@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+import adsk.core
+import adsk.fusion
+from geometry import EdgeFrame
+from sketch_index import SketchPointIndex
+
+
+def _profile(*loops):
+    # Only what from_sketch() reads of a Profile: the end points of each loop's curves
+    def profile_curve(start, end):
+        ends = (True, adsk.core.Point3D(*start, 0), adsk.core.Point3D(*end, 0))
+        return SimpleNamespace(geometry=SimpleNamespace(evaluator=SimpleNamespace(getEndPoints=lambda: ends)))
+    return SimpleNamespace(profileLoops=[
+        SimpleNamespace(profileCurves=[profile_curve(loop[i], loop[(i + 1) % len(loop)]) for i in range(len(loop))])
+        for loop in loops])
+
+
+def _index(points=(), profiles=()):
+    sketch = adsk.fusion.Sketch()
+    for x, y in points:
+        sketch.sketchPoints.add(adsk.core.Point3D(x, y, 0))
+    sketch.profiles.extend(profiles)
+    return SketchPointIndex.from_sketch(sketch)
+
+
+def _square(x, y, size):
+    return [(x, y), (x + size, y), (x + size, y + size), (x, y + size)]
+
+
+def test_profile_side_is_inside_the_material():
+    index = _index(profiles=[_profile(_square(0, 0, 10))])
+    # The bottom edge, left to right, has the material on its left (+1)
+    assert index.inside_side(EdgeFrame((0, 0, 0), (10, 0, 0))) == 1
+    assert index.inside_side(EdgeFrame((10, 0, 0), (0, 0, 0))) == -1
+
+
+def test_holes_are_outside_the_material():
+    index = _index(profiles=[_profile(_square(0, 0, 10), _square(4, 4, 2))])
+    # The bottom edge of the hole has the material below it, on its right
+    assert index.profile_side(EdgeFrame((4, 4, 0), (6, 4, 0))) == -1
+    assert index.profile_side(EdgeFrame((0, 0, 0), (10, 0, 0))) == 1
+
+
+def test_without_profiles_the_farthest_point_decides():
+    index = _index(points=[(0, 0), (10, 0), (5, -1), (5, 8)])
+    assert index.profile_side(EdgeFrame((0, 0, 0), (10, 0, 0))) == 0
+    assert index.inside_side(EdgeFrame((0, 0, 0), (10, 0, 0))) == 1
+    index.add(5, -20)
+    assert index.inside_side(EdgeFrame((0, 0, 0), (10, 0, 0))) == -1
+
+
+def test_then_the_origin_decides():
+    index = _index(points=[(0, 5), (10, 5)])
+    assert index.inside_side(EdgeFrame((0, 5, 0), (10, 5, 0))) == -1
+    assert index.inside_side(EdgeFrame((10, 5, 0), (0, 5, 0))) == 1
+
+
+def test_line_through_the_origin_cuts_along_the_axis_its_normal_is_closest_to():
+    index = _index()
+    # Normal (0, 1) for a line along +x, and (-1, 0) for a line along +y
+    assert index.inside_side(EdgeFrame((-5, 0, 0), (5, 0, 0))) == 1
+    assert index.inside_side(EdgeFrame((5, 0, 0), (-5, 0, 0))) == -1
+    assert index.inside_side(EdgeFrame((0, -5, 0), (0, 5, 0))) == -1
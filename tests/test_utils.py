@@ -0,0 +1,26 @@
+import adsk.core
+import adsk.fusion
+from adsk.fusion import HorizontalConstraint
+from utils import delete_constraints, draw_polyline
+
+
+def test_delete_constraints_keeps_the_ones_on_the_users_curves():
+    sketch = adsk.fusion.Sketch()
+    constraints = sketch.geometricConstraints
+    # Every constraint is looked at, the line's own ones too
+    first = constraints.count
+    line = sketch.sketchCurves.sketchLines.addByTwoPoints(adsk.core.Point3D.create(0, 0, 0),
+                                                          adsk.core.Point3D.create(30, 0, 0))
+    # A rectangle cut: two vertical sides and a horizontal one, each constrained so
+    jitter = draw_polyline(sketch, [(5, 0, 0), (5, 1, 0), (6, 1, 0), (6, 0, 0)])
+    assert constraints.count == first + 4
+    # The trim constrains what's left of the line onto the cut. Fusion also carries the line's own
+    # constraints over to the pieces, which the stand-in leaves to us.
+    pieces = list(line.trim(adsk.core.Point3D.create(5.5, 0, 0)))
+    for piece in pieces:
+        constraints._add(HorizontalConstraint(piece))
+    assert constraints.count == first + 3 + 2 + 2
+
+    assert delete_constraints(sketch, first, jitter) == 5
+    kept = [constraints.item(i) for i in range(constraints.count)]
+    assert [constraint.line for constraint in kept] == pieces
@@ -1,6 +1,7 @@
 import adsk.core
 import adsk.fusion
-import random
+from typing import NamedTuple
+from planner import random_size
 
 
 def clean_selected_curve(original_curve: adsk.fusion.SketchCurve, new_curve: adsk.fusion.SketchCurve):
@@ -81,23 +82,6 @@ def clean_selected_curve_by_points(original_curve: adsk.fusion.SketchCurve, new_
     # return potential_curves
 
 
-def random_size(min_size: float, max_size: float):
-    """
-    Generate a random size between min_size and max_size, rounded to the nearest 10% increment of min_size.
-
-    Parameters:
-        min_size (float): The minimum size.
-        max_size (float): The maximum size.
-
-    Returns:
-        float: A random size between min_size and max_size, rounded to the nearest increment 
-            where the increment is 10% of min_size.
-    """
-    step = 0.1 * max_size
-    value = random.uniform(min_size, max_size)
-    return round(value / step) * step
-
-
 def calc_center_point(start_point: adsk.core.Point3D, end_point: adsk.core.Point3D):
     """
     Calculate the center point between two points.
@@ -115,3 +99,120 @@ def calc_center_point(start_point: adsk.core.Point3D, end_point: adsk.core.Point
         (start_point.y + end_point.y) / 2,
         (start_point.z + end_point.z) / 2
     )
+
+
+def as_tuple(point: adsk.core.Point3D):
+    """
+    Returns the (x, y, z) coordinates of a point as a plain tuple, for the pure Python modules.
+
+    Parameters:
+        point (Point3D): The point.
+
+    Returns:
+        tuple: The (x, y, z) coordinates of the point.
+    """
+    return (point.x, point.y, point.z)
+
+
+def to_points(coordinates):
+    """
+    Returns the given (x, y, z) coordinates as Point3Ds.
+    """
+    return [adsk.core.Point3D.create(*coordinate) for coordinate in coordinates]
+
+
+def draw_polyline(sketch: adsk.fusion.Sketch, coordinates, start: adsk.fusion.SketchPoint = None):
+    """
+    Draws a chain of lines through the given (x, y, z) coordinates. Each line starts on the end
+    SketchPoint of the line before it, so the chain is connected.
+
+    Parameters:
+        sketch (Sketch): The sketch to draw in.
+        coordinates (sequence): The (x, y, z) coordinates to draw through, at least two.
+        start (SketchPoint): An existing point to start the chain from, in place of the first
+                        coordinate, so it joins on to what was drawn before it.
+
+    Returns:
+        list: The drawn SketchLines, in order.
+    """
+    sketch_lines = sketch.sketchCurves.sketchLines
+    lines = []
+    previous = start if start is not None else adsk.core.Point3D.create(*coordinates[0])
+    for coordinate in coordinates[1:]:
+        line = sketch_lines.addByTwoPoints(previous, adsk.core.Point3D.create(*coordinate))
+        lines.append(line)
+        previous = line.endSketchPoint
+    return lines
+
+
+def nearest_end(curve: adsk.fusion.SketchCurve, point: adsk.core.Point3D):
+    """
+    Returns whichever of the curve's start and end SketchPoints is nearest the given point. Arcs
+    always run counterclockwise, so their end point isn't necessarily the one they were drawn to.
+    """
+    start, end = curve.startSketchPoint, curve.endSketchPoint
+    start_geometry, end_geometry = start.geometry, end.geometry
+    start_distance = (start_geometry.x - point.x) ** 2 + (start_geometry.y - point.y) ** 2
+    end_distance = (end_geometry.x - point.x) ** 2 + (end_geometry.y - point.y) ** 2
+    return start if start_distance < end_distance else end
+
+def profile_lines(profile: adsk.fusion.Profile):
+    """
+    Returns the SketchLines a profile is outlined with, loop by loop. Curves of the outline that
+    aren't straight lines are left out, as they can't be jittered.
+    """
+    lines = []
+    for loop in profile.profileLoops:
+        for profile_curve in loop.profileCurves:
+            line = adsk.fusion.SketchLine.cast(profile_curve.sketchEntity)
+            if line and line not in lines:
+                lines.append(line)
+    return lines
+
+# The properties the different kinds of GeometricConstraint hold the constrained entities in
+CONSTRAINED_ENTITIES = ('line', 'lineOne', 'lineTwo', 'point', 'pointOne', 'pointTwo', 'entity', 'curveOne',
+                        'curveTwo', 'midPointCurve')
+
+def delete_constraints(sketch: adsk.fusion.Sketch, first: int, curves):
+    """
+    Deletes the geometric constraints Fusion added to the given curves, or their end points, from
+    the first'th constraint of the sketch on. Constraints that only hold other geometry, such as
+    the ones a trim carries over from the original curve to what's left of it, are kept.
+
+    Parameters:
+        sketch (Sketch): The sketch the curves are in.
+        first (int): How many constraints the sketch had before the curves were drawn.
+        curves (list): The curves whose constraints to delete.
+
+    Returns:
+        int: The number of constraints deleted.
+    """
+    tokens = set()
+    for curve in curves:
+        tokens.update((curve.entityToken, curve.startSketchPoint.entityToken, curve.endSketchPoint.entityToken))
+    constraints = sketch.geometricConstraints
+    deleted = 0
+    # From the last one back, so deleting doesn't shift the ones still to be looked at
+    for index in range(constraints.count - 1, first - 1, -1):
+        constraint = constraints.item(index)
+        entities = (getattr(constraint, name, None) for name in CONSTRAINED_ENTITIES)
+        if any(entity is not None and entity.entityToken in tokens for entity in entities) and constraint.isDeletable:
+            constraint.deleteMe()
+            deleted += 1
+    return deleted
+
+
+class DrawnShape(NamedTuple):
+    """
+    What a shape module drew for a cut, before the selected curve has been trimmed.
+
+    Attributes:
+        trim_start (Point3D): The point on the selected curve where the cut starts.
+        trim_end (Point3D): The point on the selected curve where the cut ends.
+        curves (list): Every SketchCurve drawn for the shape.
+        helpers (list): The drawn SketchCurves to delete once the selected curve has been trimmed.
+    """
+    trim_start: adsk.core.Point3D
+    trim_end: adsk.core.Point3D
+    curves: list
+    helpers: list